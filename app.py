@@ -1,115 +1,270 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import (Flask, render_template, request, jsonify, redirect, url_for, Response, stream_with_context, g,
+                   send_file)
 import pandas as pd
 import numpy as np
-import joblib
 import json
-import plotly
-import plotly.graph_objs as go
-import plotly.express as px
+import threading
+import time
 from datetime import datetime, timedelta
 import os
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import get_input_stream
+from utils.timeseries_store import TimeSeriesStore
+from utils.downsample import min_points, minmax_indices
+from utils.correlation import CorrelationTable
+from utils.rolling_stats import RollingStats
+from utils.features import load_stock_history
+from utils.indicators import KINDS as INDICATOR_KINDS, IndicatorTable
+from utils.ingest import append_daily_rows
+from utils.export import EXPORT_FORMATS, gzip_stream, stream_export
+from utils.sweep import run_sweep
+from utils.forecast import build_forecast, cached_forecast, parse_horizons
+from utils.uploads import UPLOAD_FORMATS, UploadJobs, check_columns, encode_results, score_csv, spool_upload
+from utils.intervals import DEFAULT_LEVEL
+from utils.bootstrap import Initializer
+from utils.response_cache import ResponseCache, payload_response
+from utils.backtest import load_results as load_backtest_results
+from utils.model_registry import ModelRegistry
+from utils.shared_data import attach_datasets, publish_datasets
+from utils.instrumentation import (PROFILE_HEADER, RequestProfiler, StageTimer, configure_logging,
+                                   get_logger, render_metrics)
 
 
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 app.config['UPLOAD_FOLDER'] = 'data'
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
+# Raw CSV bodies sent to /api/predict-stock/upload are spooled to disk and may exceed MAX_CONTENT_LENGTH
+app.config['UPLOAD_STREAMING_ENABLED'] = os.environ.get('UPLOAD_STREAMING_ENABLED', '1') == '1'
+app.config['UPLOAD_STREAM_MAX_LENGTH'] = int(os.environ.get('UPLOAD_STREAM_MAX_LENGTH', 2 * 1024 ** 3))
+app.config['CACHE_FOLDER'] = os.environ.get('CACHE_FOLDER', 'cache')
+app.config['MODELS_FOLDER'] = os.environ.get('MODELS_FOLDER', 'models')
+app.config['MODEL_POLL_INTERVAL'] = float(os.environ.get('MODEL_POLL_INTERVAL', 10))
+app.config['DATA_POLL_INTERVAL'] = float(os.environ.get('DATA_POLL_INTERVAL', 5))
+# Micro-batching needs concurrent requests in one worker, so it is only on by default with
+# threaded or async gunicorn workers (see gunicorn.conf.py)
+CONCURRENT_WORKERS = (os.environ.get('GUNICORN_WORKER_CLASS', 'sync') != 'sync'
+                      or int(os.environ.get('GUNICORN_THREADS', 1)) > 1)
+app.config['PREDICT_BATCH_WINDOW_MS'] = float(os.environ.get('PREDICT_BATCH_WINDOW_MS', 2 if CONCURRENT_WORKERS else 0))
+app.config['PREDICT_BATCH_MAX'] = int(os.environ.get('PREDICT_BATCH_MAX', 64))
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '0') == '1'
+app.config['PROFILE_FOLDER'] = os.environ.get('PROFILE_FOLDER', 'profiles')
 
+# Default cap on points per series returned by /api/historical-data
+HISTORICAL_MAX_POINTS = 1000
 
+# Rolling windows (in rows) precomputed for /api/correlation-data
+CORRELATION_WINDOWS = (30, 90, 365)
 
-# Global variables to store model and data
-model = None
-scaler = None
-feature_names = None
+# OHLCV history behind the price chart
+STOCK_HISTORY_PATH = 'dataset/goldstock v1.csv'
+
+# Rolling statistics windows (in rows) kept up to date for /api/price-analysis
+ANALYSIS_WINDOWS = (7, 30, 90, 365)
+
+# Bounded cache for the read-only analytics APIs
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_MAX_AGE = 60
+
+
+
+# Global variables to store data
 df_data = None
+store = None
+correlation_table = None
+rolling_stats = None
+stock_history = None
+data_lock = threading.Lock()
+data_checked_at = 0.0
 
+# Technical indicators of the current dataset version, built on first use
+indicator_table = None
+indicator_lock = threading.Lock()
 
+# Set in the gunicorn master by publish_shared_data(); forked workers attach to it
+shared_block_path = None
 
-def load_model_components():
-    """Load the trained model, scaler, and feature names"""
-    global model, scaler, feature_names
-    try:
-        model = joblib.load('models/gold_price_prediction_ridge_regression.pkl')
-        scaler = joblib.load('models/scaler_ridge_regression.pkl')
-        feature_names = joblib.load('models/features_ridge_regression.pkl')
-        print("Model components loaded successfully!")
-        return True
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        return False
+# Keyed on endpoint, query and dataset version, so a reload invalidates every entry
+response_cache = ResponseCache(lambda: store.version if store is not None else None,
+                               max_entries=RESPONSE_CACHE_SIZE, max_age=RESPONSE_CACHE_MAX_AGE)
+
+# Request logs are leveled and rate-limited per call site
+configure_logging(app.config['LOG_LEVEL'])
+logger = get_logger('app')
+
+# cProfile of single requests, on demand via the X-Profile header
+profiler = RequestProfiler(app.config['PROFILE_FOLDER'])
+
+# Upload scoring jobs; status and result files are shared by every worker
+upload_jobs = UploadJobs(os.path.join(app.config['UPLOAD_FOLDER'], 'jobs'))
+
+
+
+def current_indicators():
+    """Return the indicator table of the loaded dataset, rebuilding it when the data changed"""
+    global indicator_table
+    if store is None:
+        return None
+    table = indicator_table
+    if table is None or table.version != store.version:
+        with indicator_lock:
+            table = indicator_table
+            if table is None or table.version != store.version:
+                table = indicator_table = IndicatorTable(*store.arrays('daily'), version=store.version)
+    return table
+
+def latest_ridge_features():
+    """Latest daily prices and indicators, used to vet new model versions and as the sweep base"""
+    table = current_indicators()
+    return table.latest() if table is not None else None
+
+# Every model is served from one versioned set that can be hot-swapped
+# A batch window of 0 turns micro-batching off
+batching = None
+if app.config['PREDICT_BATCH_WINDOW_MS'] > 0:
+    batching = {'max_batch': app.config['PREDICT_BATCH_MAX'], 'max_wait': app.config['PREDICT_BATCH_WINDOW_MS'] / 1000}
+
+registry = ModelRegistry(app.config['MODELS_FOLDER'], poll_interval=app.config['MODEL_POLL_INTERVAL'],
+                         ridge_canary=latest_ridge_features, batching=batching)
+
+def load_models():
+    """Load the published model version and start watching for new ones"""
+    if shared_block_path is not None:
+        registry.feature_table = attach_datasets(shared_block_path, app.config['CACHE_FOLDER'])['feature_table']
+    loaded = registry.load()
+    registry.watch()
+    if loaded:
+        logger.info("Model components loaded successfully")
+    return loaded
 
 def load_data():
     """Load and preprocess the dataset"""
-    global df_data
+    global df_data, store, correlation_table, rolling_stats, stock_history
     try:
-        # Try loading from root directory first, then dataset directory
-        try:
-            df_data = pd.read_csv('Daily.csv')
-        except:
-            df_data = pd.read_csv('dataset/Daily.csv')
+        if shared_block_path is not None:
+            # Read-only views onto the block the master published; nothing is parsed or copied
+            shared = attach_datasets(shared_block_path, app.config['CACHE_FOLDER'])
+            store = shared['store']
+            correlation_table = shared['correlation_table']
+            stock_history = shared['stock_history']
+        else:
+            # Every resolution is parsed once into a binary snapshot, then memory-mapped
+            store = TimeSeriesStore(app.config['CACHE_FOLDER']).load()
             
-        df_data['Date'] = pd.to_datetime(df_data['Date'])
-        df_data = df_data.replace('#N/A', np.nan)
-        
-        # Convert numeric columns
-        for col in df_data.columns[1:]:
-            df_data[col] = pd.to_numeric(df_data[col].astype(str).str.replace(',', ''), errors='coerce')
-        
-        df_data = df_data.ffill().bfill()
-        print("Data loaded successfully!")
+            # Full and rolling correlations are computed once per load
+            correlation_table = CorrelationTable(*store.arrays('daily'), windows=CORRELATION_WINDOWS)
+            stock_history = load_stock_history(STOCK_HISTORY_PATH)
+        df_data = store.frame('daily')
+        rolling_stats = RollingStats(*store.arrays('daily')[1:], windows=ANALYSIS_WINDOWS)
+        response_cache.clear()
+        logger.info("Data loaded successfully")
         return True
     except Exception as e:
-        print(f"Error loading data: {e}")
+        logger.error("Error loading data: %s", e)
         return False
 
-def create_sample_features(base_price=2000):
-    """Create sample features for prediction"""
-    np.random.seed(42)
-    sample_features = {}
-    
-    # Currency features (correlated with gold price)
-    currencies = ['EUR', 'GBP', 'JPY', 'CAD', 'CHF', 'INR', 'CNY', 'AED']
-    for currency in currencies:
-        if currency == 'JPY':
-            sample_features[currency] = base_price * np.random.uniform(140, 160)
-        elif currency == 'INR':
-            sample_features[currency] = base_price * np.random.uniform(80, 85)
-        else:
-            sample_features[currency] = base_price * np.random.uniform(0.7, 1.3)
-    
-    # Date features
-    today = datetime.now()
-    sample_features['Year'] = today.year
-    sample_features['Month'] = today.month
-    sample_features['Day'] = today.day
-    sample_features['DayOfWeek'] = today.weekday()
-    sample_features['Quarter'] = (today.month - 1) // 3 + 1
-    
-    # Lagged features
-    for lag in [1, 3, 7, 14, 30]:
-        sample_features[f'USD_lag_{lag}'] = base_price * np.random.uniform(0.98, 1.02)
-    
-    # Moving averages
-    for window in [3, 7, 14, 30]:
-        sample_features[f'USD_MA_{window}'] = base_price * np.random.uniform(0.99, 1.01)
-    
-    # Additional features
-    sample_features['USD_pct_change'] = np.random.uniform(-0.02, 0.02)
-    sample_features['USD_price_change'] = np.random.uniform(-20, 20)
-    sample_features['USD_volatility_7'] = np.random.uniform(10, 50)
-    sample_features['USD_volatility_30'] = np.random.uniform(15, 60)
-    sample_features['USD_RSI'] = np.random.uniform(30, 70)
+def publish_shared_data():
+    """Load every dataset once and publish it as a shared block for forked workers
     
-    return sample_features
+    Called from the gunicorn master before it forks (see gunicorn.conf.py).
+    The master keeps no copy of its own afterwards; workers load by
+    attaching to the block.
+    """
+    global shared_block_path, df_data, store, correlation_table, rolling_stats, stock_history
+    if not load_data():
+        return None
+    shared_block_path = publish_datasets(app.config['CACHE_FOLDER'], store, correlation_table, stock_history)
+    df_data = store = correlation_table = rolling_stats = stock_history = None
+    logger.info("Published shared data block %s", shared_block_path)
+    return shared_block_path
+
+def refresh_data():
+    """Apply rows appended to Daily.csv since the last load; returns the count"""
+    global df_data, correlation_table, rolling_stats, data_checked_at
+    with data_lock:
+        data_checked_at = time.monotonic()
+        start = store.refresh()
+        if start is None:
+            return 0
+        
+        dates, values, columns = store.arrays('daily')
+        if start == 0:
+            correlation_table = CorrelationTable(dates, values, columns, windows=CORRELATION_WINDOWS)
+            rolling_stats = RollingStats(values, columns, windows=ANALYSIS_WINDOWS)
+        else:
+            correlation_table.extend(dates[start:], values[start:])
+            rolling_stats.extend(values[start:])
+        df_data = store.frame('daily')
+        response_cache.clear()
+        logger.info("Data refreshed with %d new rows", len(dates) - start)
+        return len(dates) - start
+
+# Components are loaded concurrently in a thread pool
+initializer = Initializer(imports=('sklearn.linear_model', 'sklearn.preprocessing', 'utils.visualizer'))
+initializer.register('models', load_models)
+initializer.register('data', load_data)
 
 # Initialize components when the app starts
 def initialize_app():
     """Initialize model and data components"""
-    print("Initializing application...")
-    load_model_components()
-    load_data()
-    print("Application initialized successfully!")
+    logger.info("Initializing application...")
+    initializer.start()
+    initializer.wait()
+    logger.info("Application initialized successfully")
+
+def create_app():
+    """Application factory: start loading components in the background"""
+    initializer.start()
+    return app
+
+@app.before_request
+def ensure_initialized():
+    """Start background loading when the server imported ``app`` directly"""
+    initializer.start()
+
+@app.before_request
+def poll_data():
+    """Pick up rows another process appended, at most once per poll interval"""
+    if store is None or time.monotonic() - data_checked_at < app.config['DATA_POLL_INTERVAL']:
+        return
+    try:
+        refresh_data()
+    except Exception as e:
+        logger.error("Error refreshing data: %s", e)
+
+@app.before_request
+def start_profile():
+    """Profile this request when profiling is enabled and the client asks for it"""
+    if app.config['PROFILING_ENABLED'] and request.headers.get(PROFILE_HEADER):
+        g.profiler = profiler.start()
+
+@app.after_request
+def finish_profile(response):
+    """Save the request's profile and name the file in the response"""
+    active = g.pop('profiler', None)
+    if active is not None:
+        response.headers['X-Profile-File'] = profiler.stop(active, request.endpoint or 'unknown')
+    return response
+
+@app.teardown_request
+def discard_profile(exc):
+    """Release the profiler when the request failed before after_request ran"""
+    active = g.pop('profiler', None)
+    if active is not None:
+        profiler.stop(active, request.endpoint or 'unknown')
+
+def backtest_summary(model_key='ridge_regression'):
+    """Return the cached walk-forward metrics for a model, or None"""
+    try:
+        results = load_backtest_results()
+    except Exception as e:
+        logger.warning("Error reading backtest results: %s", e)
+        return None
+    if not results or model_key not in results.get('models', {}):
+        return None
+    return dict(results['models'][model_key]['summary'], created=results['created'])
 
 # Routes
 @app.route('/')
@@ -138,6 +293,17 @@ def about():
         'training_samples': 9277,
         'test_samples': 2319
     }
+    
+    # Prefer metrics measured by the walk-forward backtest when available
+    measured = backtest_summary()
+    if measured:
+        model_info.update({
+            'r2_score': round(measured['r2'], 4),
+            'rmse': round(measured['rmse'], 2),
+            'mae': round(measured['mae'], 2),
+            'training_samples': measured['training_samples'],
+            'test_samples': measured['test_samples']
+        })
     return render_template('about.html', model_info=model_info)
 
 @app.route('/visualization')
@@ -184,128 +350,403 @@ def model_info():
             'Volatility Measures'
         ]
     }
+    
+    # Prefer metrics measured by the walk-forward backtest when available
+    measured = backtest_summary()
+    if measured:
+        model_info.update({
+            'r2_score': f"{measured['r2'] * 100:.2f}%",
+            'rmse': round(measured['rmse'], 2),
+            'mae': round(measured['mae'], 2),
+            'training_samples': measured['training_samples'],
+            'test_samples': measured['test_samples'],
+            'mape': f"{measured['mape']:.2f}%",
+            'last_updated': measured['created'][:10]
+        })
     return render_template('model_info.html', model_info=model_info)
 
 # API Routes
 @app.route('/api/predict', methods=['POST'])
 def predict():
     """API endpoint for gold price prediction"""
-    if model is None:
+    # One read of the active version keeps the request consistent across a swap
+    models = registry.active
+    if models is None:
         return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
     
     try:
-        # Get input data
-        input_data = request.get_json()
-        
-        if not input_data:
-            # Use sample features if no input provided
-            features = create_sample_features()
+        level = models.ridge_intervals.check_level(request.args.get('level', DEFAULT_LEVEL))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with StageTimer('predict') as timer:
+            # Get input data
+            with timer.stage('parse'):
+                input_data = request.get_json()
+            
+            # Missing features are filled from the latest real prices and indicators
+            with timer.stage('features'):
+                features = dict(input_data or {})
+                missing = [feature for feature in models.ridge_features if feature not in features]
+                if missing:
+                    latest = latest_ridge_features()
+                    if latest is None:
+                        return jsonify({'error': 'Historical data is currently loading. Please try again in a few moments.'}), 503
+                    unknown = [feature for feature in missing if feature not in latest]
+                    if unknown:
+                        return jsonify({'error': f"Missing features: {', '.join(unknown)}"}), 400
+                    features.update({feature: latest[feature] for feature in missing})
+            
+            # Make prediction with a single dot product
+            with timer.stage('predict'):
+                prediction = models.predict_ridge(features)
+                
+                # Prediction interval from the backtest's conformal quantiles
+                lower, upper = models.ridge_intervals.bounds(prediction, level)
+            
+            with timer.stage('serialize'):
+                return jsonify({
+                    'prediction': round(prediction, 2),
+                    'confidence_lower': round(lower, 2),
+                    'confidence_upper': round(upper, 2),
+                    'confidence_level': level,
+                    'interval_method': models.ridge_intervals.method,
+                    'model': 'Ridge Regression',
+                    'model_version': models.version,
+                    'timestamp': datetime.now().isoformat()
+                })
+    
+    except Exception as e:
+        logger.error("Prediction error: %s", e)
+        return jsonify({'error': 'An error occurred while making the prediction. Please try again.'}), 500
+
+@app.route('/api/predict/sweep', methods=['POST'])
+def predict_sweep():
+    """Score a grid of what-if scenarios in one vectorized pass
+    
+    Body: ``axes``, a list of ``{name, values | start/stop/num | start/stop/step,
+    mode}`` where ``name`` is a feature (or ``USD`` for every USD lag and
+    moving average) and ``mode`` is set, scale or shift; an optional
+    ``base`` feature dict, defaulting to the latest daily row; and optional
+    ``noise`` ``{volatility, samples, apply_to, seed}`` for Monte Carlo shocks.
+    Results are flat arrays in C order over ``shape``.
+    """
+    models = registry.active
+    if models is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    
+    spec = request.get_json(silent=True)
+    if not isinstance(spec, dict) or not isinstance(spec.get('axes'), list):
+        return jsonify({'error': 'Provide a JSON object with an axes list'}), 400
+    if not all(isinstance(spec.get(key) or {}, dict) for key in ('base', 'noise')):
+        return jsonify({'error': 'Invalid sweep: base and noise must be JSON objects'}), 400
+    
+    base = latest_ridge_features()
+    if base is None:
+        return jsonify({'error': 'Historical data is currently loading. Please try again in a few moments.'}), 503
+    base.update(spec.get('base') or {})
+    noise = spec.get('noise')
+    try:
+        result = run_sweep(models.ridge_kernel, base, spec['axes'], noise)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid sweep: {e}'}), 400
+    
+    axes = [{'name': axis['name'], 'mode': axis.get('mode', 'set'), 'values': values.tolist()}
+            for axis, values in zip(spec['axes'], result['axes'])]
+    if noise:
+        axes.append({'name': 'volatility', 'mode': 'noise', 'values': result['axes'][-1].tolist()})
+    response = {
+        'axes': axes,
+        'shape': list(result['shape']),
+        'count': int(np.prod(result['shape'])),
+        'model': 'Ridge Regression',
+        'model_version': models.version
+    }
+    for key in ('predictions', 'mean', 'std', 'p05', 'p95'):
+        if key in result:
+            response[key] = np.round(result[key].ravel(), 2).tolist()
+    if noise:
+        response['samples'] = result['samples']
+    return jsonify(response)
+
+@app.route('/api/forecast', methods=['GET', 'POST'])
+def forecast():
+    """Recursive 1-90 day forecast paths from the latest daily data
+    
+    GET takes ``horizon`` (one or more comma-separated days, default 30),
+    ``currencies`` (default all) and ``fx`` (e.g. ``EUR:1.02,GBP:0.98``) for
+    a single scenario. POST takes the same as JSON, with ``scenarios``, a
+    list of ``{name, fx}``, scored together in one vectorized run. Results
+    are cached per dataset and model version.
+    """
+    models = registry.active
+    if models is None or store is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    
+    dates, values, columns = store.arrays('daily')
+    try:
+        if request.method == 'POST':
+            spec = request.get_json(silent=True)
+            if not isinstance(spec, dict):
+                return jsonify({'error': 'Provide a JSON object'}), 400
+            scenarios = spec.get('scenarios') or [{'name': 'base'}]
+            currencies = spec.get('currencies') or columns
+            horizon = spec.get('horizon', 30)
         else:
-            features = input_data
-        
-        # Create DataFrame with required features
-        feature_df = pd.DataFrame([features])
+            fx = {}
+            for item in filter(None, request.args.get('fx', '').split(',')):
+                currency, factor = item.split(':')
+                fx[currency.strip().upper()] = float(factor)
+            scenarios = [{'name': 'base', 'fx': fx}]
+            currencies = [c.strip().upper() for c in request.args.get('currencies', '').split(',') if c.strip()] or columns
+            horizon = request.args.get('horizon', '30')
         
-        # Ensure all required features are present
-        for feature in feature_names:
-            if feature not in feature_df.columns:
-                # Fill missing features with sample values
-                if 'USD' in feature:
-                    feature_df[feature] = features.get('USD', 2000) * np.random.uniform(0.99, 1.01)
-                else:
-                    feature_df[feature] = np.random.uniform(100, 1000)
+        horizons = parse_horizons(horizon)
+        unknown = [c for c in currencies if c not in columns]
+        if unknown:
+            return jsonify({'error': f"Unknown currencies: {', '.join(unknown)}"}), 400
+        if not all(isinstance(scenario, dict) for scenario in scenarios):
+            return jsonify({'error': 'Each scenario must be an object'}), 400
         
-        # Select only required features
-        feature_df = feature_df[feature_names]
-        
-        # Make prediction
-        prediction = model.predict(feature_df)[0]
-        
-        # Calculate confidence interval (approximate)
-        confidence = prediction * 0.02  # 2% confidence interval
-        
-        return jsonify({
-            'prediction': round(prediction, 2),
-            'confidence_lower': round(prediction - confidence, 2),
-            'confidence_upper': round(prediction + confidence, 2),
-            'model': 'Ridge Regression',
-            'timestamp': datetime.now().isoformat()
-        })
+        key = (store.version, models.version, json.dumps([horizons, currencies, scenarios], sort_keys=True))
+        result = cached_forecast(key, lambda: build_forecast(
+            models.ridge_kernel, dates, values, columns, horizons, scenarios, currencies))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid forecast request: {e}'}), 400
     
-    except Exception as e:
-        print(f"Prediction error: {e}")
-        return jsonify({'error': 'An error occurred while making the prediction. Please try again.'}), 500
+    return jsonify(dict(result, model='Ridge Regression', model_version=models.version,
+                        data_version=store.version))
 
 @app.route('/api/historical-data')
+@response_cache.cached
 def get_historical_data():
-    """API endpoint for historical gold price data"""
+    """API endpoint for historical gold price data
+    
+    Query parameters: ``start``/``end`` (YYYY-MM-DD, inclusive), ``currencies``
+    (comma-separated, default USD), ``resolution`` (default daily) and
+    ``max_points``. Without a date window the last 365 rows are returned.
+    """
     if df_data is None:
         return jsonify({'error': 'Historical data is currently loading. Please refresh the page in a few moments.'}), 503
     
     try:
-        # Get last 365 days of data
-        recent_data = df_data.tail(365).copy()
+        resolution = request.args.get('resolution', 'daily')
+        currencies = [c.strip().upper() for c in request.args.get('currencies', 'USD').split(',') if c.strip()]
+        start = request.args.get('start')
+        end = request.args.get('end')
+        max_points = request.args.get('max_points', HISTORICAL_MAX_POINTS, type=int)
+        
+        if not currencies or max_points is None:
+            return jsonify({'error': 'Invalid currencies or max_points parameter.'}), 400
+        if max_points < min_points(len(currencies)):
+            return jsonify({'error': f'max_points must be at least {min_points(len(currencies))} '
+                                     f'for {len(currencies)} currencies.'}), 400
+        
+        try:
+            dates, values = store.get_many(resolution, currencies, start, end)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+        
+        # Keep the previous default of the last 365 rows when no window is given
+        if not start and not end:
+            dates, values = dates[-365:], values[-365:]
+        
+        # Shape-preserving min/max bucketing for long windows
+        total_points = len(dates)
+        keep = minmax_indices(values, max_points)
+        dates, values = dates[keep], values[keep]
+        
+        # Volume is not part of the dataset; the mock series is kept for the dashboard
+        # but drawn from a fixed seed so identical requests return identical payloads
+        volume = np.random.default_rng(0).integers(1000, 5000, len(dates))
         
         # Prepare data for charts
         chart_data = {
-            'dates': recent_data['Date'].dt.strftime('%Y-%m-%d').tolist(),
-            'prices': recent_data['USD'].tolist(),
-            'volume': np.random.randint(1000, 5000, len(recent_data)).tolist()  # Mock volume data
+            'dates': np.datetime_as_string(dates, unit='D').tolist(),
+            'prices': values[:, 0].tolist(),
+            'series': {currency: values[:, i].tolist() for i, currency in enumerate(currencies)},
+            'volume': volume.tolist(),  # Mock volume data
+            'resolution': resolution,
+            'total_points': total_points,
+            'downsampled': len(dates) < total_points
         }
         
         return jsonify(chart_data)
     
     except Exception as e:
-        print(f"Historical data error: {e}")
+        logger.error("Historical data error: %s", e)
         return jsonify({'error': 'An error occurred while fetching historical data. Please refresh the page.'}), 500
 
+@app.route('/api/export')
+def export_data():
+    """Stream any date range and column subset of a resolution
+    
+    Query parameters: ``format`` (ndjson, csv or arrow; default ndjson),
+    ``resolution`` (default daily), ``currencies`` (comma-separated, default
+    all) and ``start``/``end`` (inclusive). The body is gzip-encoded on the
+    fly when the client accepts it.
+    """
+    if store is None:
+        return jsonify({'error': 'Historical data is currently loading. Please refresh the page in a few moments.'}), 503
+    
+    fmt = request.args.get('format', 'ndjson')
+    resolution = request.args.get('resolution', 'daily')
+    try:
+        dates, values, columns = store.arrays(resolution)
+        currencies = [c.strip().upper() for c in request.args.get('currencies', '').split(',') if c.strip()] or columns
+        unknown = [c for c in currencies if c not in columns]
+        if unknown:
+            raise KeyError(f"Unknown currency: {', '.join(unknown)}")
+        lo, hi = store.bounds(resolution, request.args.get('start'), request.args.get('end'))
+        body = stream_export(dates, values, currencies, [columns.index(c) for c in currencies], lo, hi, fmt)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid query parameter: {e.args[0]}'}), 400
+    
+    headers = {'Content-Disposition': f'attachment; filename=gold-{resolution}.{fmt}', 'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        body = gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(body), mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
 @app.route('/api/price-analysis')
+@response_cache.cached
 def price_analysis():
-    """API endpoint for price analysis data"""
-    if df_data is None:
+    """API endpoint for price analysis data
+    
+    Query parameters: ``currency`` (default USD) and ``windows``, a
+    comma-separated list of window lengths in rows (default 7,30,90,365).
+    Every statistic is read from the incrementally maintained rolling
+    windows, so the cost does not depend on the window length.
+    """
+    if rolling_stats is None:
         return jsonify({'error': 'Price analysis data is currently loading. Please refresh the page in a few moments.'}), 503
     
+    currency = request.args.get('currency', 'USD')
+    windows = request.args.get('windows')
     try:
-        recent_data = df_data.tail(30)  # Last 30 days
-        
+        windows = [int(w) for w in windows.split(',') if w] if windows else list(ANALYSIS_WINDOWS)
+    except ValueError:
+        return jsonify({'error': 'windows must be a comma-separated list of integers'}), 400
+    try:
+        windows = sorted({rolling_stats.check_window(w) for w in windows})
+        rolling_stats.column_index(currency)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': e.args[0]}), 400
+    
+    try:
+        month = rolling_stats.stats(currency, 30)
         analysis = {
-            'current_price': float(recent_data['USD'].iloc[-1]),
-            'price_change_24h': float(recent_data['USD'].iloc[-1] - recent_data['USD'].iloc[-2]),
-            'price_change_7d': float(recent_data['USD'].iloc[-1] - recent_data['USD'].iloc[-7]),
-            'price_change_30d': float(recent_data['USD'].iloc[-1] - recent_data['USD'].iloc[0]),
-            'volatility': float(recent_data['USD'].std()),
-            'avg_price_30d': float(recent_data['USD'].mean()),
-            'min_price_30d': float(recent_data['USD'].min()),
-            'max_price_30d': float(recent_data['USD'].max())
+            'currency': currency,
+            'current_price': rolling_stats.latest(currency),
+            'price_change_24h': rolling_stats.latest(currency) - rolling_stats.latest(currency, 1),
+            'price_change_7d': rolling_stats.stats(currency, 7)['change'],
+            'price_change_30d': month['change'],
+            'volatility': month['std'],
+            'avg_price_30d': month['mean'],
+            'min_price_30d': month['min'],
+            'max_price_30d': month['max'],
+            'windows': {str(w): rolling_stats.stats(currency, w) for w in windows}
         }
         
         return jsonify(analysis)
     
     except Exception as e:
-        print(f"Price analysis error: {e}")
+        logger.error("Price analysis error: %s", e)
         return jsonify({'error': 'An error occurred while analyzing price data. Please refresh the page.'}), 500
 
+@app.route('/api/indicators')
+@response_cache.cached
+def indicators():
+    """Technical indicator series for one currency
+    
+    Query parameters: ``currency`` (default USD), ``indicators``
+    (comma-separated kinds such as RSI, MA_20, EMA_12, volatility_30,
+    BB_upper, MACD; default all) and ``start``/``end`` (default the last
+    365 rows). ``latest`` holds each indicator's value on the last row.
+    """
+    table = current_indicators()
+    if table is None:
+        return jsonify({'error': 'Indicator data is currently loading. Please refresh the page in a few moments.'}), 503
+    
+    currency = request.args.get('currency', 'USD')
+    kinds = [k.strip() for k in request.args.get('indicators', '').split(',') if k.strip()] or list(INDICATOR_KINDS)
+    unknown = [k for k in kinds if k not in INDICATOR_KINDS]
+    if currency not in table.columns:
+        return jsonify({'error': f"Unknown currency: {currency}"}), 400
+    if unknown:
+        return jsonify({'error': f"Unknown indicators: {', '.join(unknown)}"}), 400
+    
+    start, end = request.args.get('start'), request.args.get('end')
+    try:
+        lo, hi = store.bounds('daily', start, end)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid query parameter: {e.args[0]}'}), 400
+    if start is None and end is None:
+        lo = max(0, hi - 365)
+    dates = store.dates('daily')[lo:hi]
+    latest = table.latest()
+    return jsonify({
+        'currency': currency,
+        'dates': np.datetime_as_string(dates, unit='D').tolist(),
+        'indicators': {k: [None if np.isnan(x) else round(x, 6) for x in table.get(currency, k, lo, hi).tolist()]
+                       for k in kinds},
+        'latest': {k: None if np.isnan(latest[f'{currency}_{k}']) else latest[f'{currency}_{k}'] for k in kinds},
+        'data_version': table.version
+    })
+
 @app.route('/api/correlation-data')
+@response_cache.cached
 def correlation_data():
-    """API endpoint for currency correlation data"""
-    if df_data is None:
+    """API endpoint for currency correlation data
+    
+    Query parameters: ``base`` (default USD), ``currencies`` (comma-separated),
+    ``window`` (one of CORRELATION_WINDOWS; omit for full history) and ``view``:
+    ``pairs`` (default) returns {currency: correlation with base}, ``matrix``
+    returns the full matrix and ``rolling`` returns the rolling series of
+    ``base`` against the single ``currency`` parameter.
+    """
+    if correlation_table is None:
         return jsonify({'error': 'Correlation data is currently loading. Please refresh the page in a few moments.'}), 503
     
     try:
-        # Calculate correlations with USD
-        currency_cols = ['EUR', 'GBP', 'JPY', 'CAD', 'CHF', 'INR', 'CNY', 'AED']
-        available_currencies = [col for col in currency_cols if col in df_data.columns]
+        view = request.args.get('view', 'pairs')
+        base = request.args.get('base', 'USD').upper()
+        window = request.args.get('window', type=int)
+        currencies = request.args.get('currencies')
+        currencies = [c.strip().upper() for c in currencies.split(',') if c.strip()] if currencies else None
         
-        correlations = {}
-        for currency in available_currencies:
-            corr = df_data[['USD', currency]].corr().iloc[0, 1]
-            if not np.isnan(corr):
-                correlations[currency] = float(corr)
+        try:
+            if view == 'matrix':
+                currencies = currencies or correlation_table.columns
+                matrix = correlation_table.matrix(currencies, window)
+                matrix = np.where(np.isnan(matrix), None, np.round(matrix, 6))
+                return jsonify({'currencies': currencies, 'window': window, 'matrix': matrix.tolist()})
+            
+            if view == 'rolling':
+                currency = request.args.get('currency', 'EUR').upper()
+                dates, values = correlation_table.rolling(base, currency, window or CORRELATION_WINDOWS[0])
+                values = np.where(np.isnan(values), None, np.round(values.astype(np.float64), 6))
+                return jsonify({
+                    'base': base,
+                    'currency': currency,
+                    'window': window or CORRELATION_WINDOWS[0],
+                    'dates': np.datetime_as_string(dates, unit='D').tolist(),
+                    'values': values.tolist()
+                })
+            
+            # Default view keeps the dashboard's {currency: correlation} shape
+            currency_cols = currencies or ['EUR', 'GBP', 'JPY', 'CAD', 'CHF', 'INR', 'CNY', 'AED']
+            available_currencies = [col for col in currency_cols if col in correlation_table.columns]
+            pairs = correlation_table.against(base, available_currencies, window)
+            correlations = {currency: corr for currency, corr in pairs.items() if not np.isnan(corr)}
+        except KeyError as e:
+            return jsonify({'error': f'Invalid query parameter: {e}'}), 400
         
         return jsonify(correlations)
     
     except Exception as e:
-        print(f"Correlation data error: {e}")
+        logger.error("Correlation data error: %s", e)
         return jsonify({'error': 'An error occurred while calculating correlations. Please refresh the page.'}), 500
 
 
@@ -313,30 +754,18 @@ def correlation_data():
 
 
 
-# Add at top with imports:
-from utils.predictor import GoldStockPredictor
-
-# Initialize after app creation:
-predictor = GoldStockPredictor()
-
-
-
-
 @app.route('/prediction-stock', methods=['GET', 'POST'])
 def prediction_stock():
     """Prediction page"""
-    print("=" * 50)
-    print(f"REQUEST METHOD: {request.method}")
-    print(f"FORM DATA: {dict(request.form)}")
-    print(f"REQUEST ARGS: {dict(request.args)}")
-    print("=" * 50)
-    
-    print("Available features:", predictor.feature_names)
+    logger.debug("%s /prediction-stock form=%s args=%s", request.method, dict(request.form), dict(request.args))
+
+    models = registry.active
+    if models is None:
+        return render_template('stock_prediction.html',
+                             error='Model is currently loading. Please try again in a few moments.',
+                             show_result=False)
     
     if request.method == 'POST':
-        print("✓ POST request detected!")
-        print("Form data:", dict(request.form))
-        
         try:
             # Get form data
             data = {
@@ -346,21 +775,19 @@ def prediction_stock():
                 'Volume': float(request.form.get('volume')),
                 'Date': request.form.get('date')
             }
-            print("Parsed data:", data)
-            
             # Make prediction
-            result = predictor.predict(data)
+            result = models.predictor.predict(data)
+            result['model_version'] = models.version
             
             return render_template('stock_prediction.html', 
                                  prediction_result=result,
                                  show_result=True)
         except Exception as e:
-            print(f"ERROR: {e}")
+            logger.warning("Stock prediction form error: %s", e)
             return render_template('stock_prediction.html', 
                                  error=str(e),
                                  show_result=False)
     
-    print("✗ GET request - showing form")
     return render_template('stock_prediction.html', show_result=False)
 
     
@@ -368,13 +795,248 @@ def prediction_stock():
 @app.route('/api/predict-stock', methods=['POST'])
 def api_predict_stock():
     """API endpoint for predictions"""
+    models = registry.active
+    if models is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    
+    try:
+        level = models.predictor.intervals.check_level(request.args.get('level', DEFAULT_LEVEL))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with StageTimer('api_predict_stock') as timer:
+            with timer.stage('parse'):
+                data = request.get_json()
+            
+            # Feature, scale and predict stages are timed inside the predictor
+            result = models.predictor.predict(data, level)
+            result['model_version'] = models.version
+            
+            with timer.stage('serialize'):
+                return jsonify(result)
+    except Exception as e:
+        logger.warning("Stock prediction error: %s", e)
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/predict-stock/batch', methods=['POST'])
+def api_predict_stock_batch():
+    """API endpoint for batch predictions from a JSON array or an uploaded CSV"""
+    models = registry.active
+    if models is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    
     try:
-        data = request.get_json()
-        result = predictor.predict(data)
+        level = models.predictor.intervals.check_level(request.args.get('level', DEFAULT_LEVEL))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        if 'file' in request.files:
+            rows = pd.read_csv(request.files['file'])
+        else:
+            rows = request.get_json()
+            if isinstance(rows, dict):
+                rows = rows.get('rows')
+        
+        if rows is None or len(rows) == 0:
+            return jsonify({'error': 'Provide a JSON array of rows or a CSV file upload'}), 400
+        
+        result = models.predictor.predict_batch(rows, level)
+        result['model_version'] = models.version
+        if result['status'] == 'error':
+            return jsonify(result), 400
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/predict-stock/upload', methods=['POST'])
+def api_predict_stock_upload():
+    """Score a large OHLCV CSV in chunks
+    
+    Send the file as the raw request body (``Content-Type: text/csv``) or as
+    a multipart ``file`` field. Query parameters: ``mode`` (``stream``, the
+    default, returns predictions as each chunk is scored; ``job`` returns a
+    job ID to poll), ``format`` (csv or ndjson) and ``level``. The upload is
+    spooled to disk first, so neither mode holds the file in memory. Raw
+    bodies may exceed MAX_CONTENT_LENGTH when UPLOAD_STREAMING_ENABLED is set.
+    """
+    models = registry.active
+    if models is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    
+    mode = request.args.get('mode', 'stream')
+    fmt = request.args.get('format', 'csv')
+    if mode not in ('stream', 'job') or fmt not in UPLOAD_FORMATS:
+        return jsonify({'error': 'mode must be stream or job and format csv or ndjson'}), 400
+    try:
+        level = models.predictor.intervals.check_level(request.args.get('level', DEFAULT_LEVEL))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'uploads')
+    if request.mimetype == 'multipart/form-data':
+        if 'file' not in request.files:
+            return jsonify({'error': 'Provide the CSV as a file field or as the request body'}), 400
+        filename = secure_filename(request.files['file'].filename or '')
+        path = spool_upload(request.files['file'].stream, upload_dir)
+    else:
+        # Read the WSGI input directly so the app-wide MAX_CONTENT_LENGTH does not apply
+        limit = app.config['UPLOAD_STREAM_MAX_LENGTH'] if app.config['UPLOAD_STREAMING_ENABLED'] \
+            else app.config['MAX_CONTENT_LENGTH']
+        filename = None
+        path = spool_upload(get_input_stream(request.environ, max_content_length=limit), upload_dir)
+    
+    try:
+        check_columns(path)
+    except ValueError as e:
+        os.remove(path)
+        return jsonify({'error': str(e)}), 400
+    
+    if mode == 'job':
+        job_id = upload_jobs.submit(models.predictor, path, level, fmt, filename=filename,
+                                    model_version=models.version)
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('upload_job_status', job_id=job_id)
+        }), 202
+    
+    # The first chunk is parsed here, so a malformed file still gets a 400
+    try:
+        frames = score_csv(models.predictor, path, level)
+    except ValueError as e:
+        os.remove(path)
+        return jsonify({'error': f'Could not parse the file: {e}'}), 400
+    
+    headers = {'Content-Disposition': f'attachment; filename=predictions.{fmt}', 'X-Model-Version': models.version}
+    response = Response(stream_with_context(encode_results(frames, fmt)),
+                        mimetype=UPLOAD_FORMATS[fmt], headers=headers)
+    # Runs even when the client disconnects before the first chunk
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+@app.route('/api/predict-stock/upload/<job_id>')
+def upload_job_status(job_id):
+    """Progress of an upload job, with a result link once it is done"""
+    status = upload_jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    if status['status'] == 'done':
+        status['result_url'] = url_for('upload_job_result', job_id=job_id)
+    return jsonify(status)
+
+@app.route('/api/predict-stock/upload/<job_id>/result')
+def upload_job_result(job_id):
+    """Download the predictions of a finished upload job"""
+    path = upload_jobs.result_path(job_id)
+    if path is None:
+        return jsonify({'error': f'No finished job: {job_id}'}), 404
+    fmt = path.rsplit('.', 1)[1]
+    return send_file(os.path.abspath(path), mimetype=UPLOAD_FORMATS[fmt], as_attachment=True,
+                     download_name=f'predictions-{job_id}.{fmt}')
+
+@app.route('/api/charts/<name>')
+def chart(name):
+    """Plotly figure JSON, rendered once per input and served pre-compressed
+    
+    ``price_chart`` is the stock price candlestick, optionally limited to
+    ``start``/``end``; the model comparison charts take ``target`` (ridge or
+    stock) and read the comparison table saved with the active model version.
+    """
+    from utils.visualizer import render_comparison_charts, render_price_chart
+    
+    if name == 'price_chart':
+        if stock_history is None:
+            return jsonify({'error': 'Data is currently loading. Please try again in a few moments.'}), 503
+        try:
+            start, end = (pd.Timestamp(request.args[key]).strftime('%Y-%m-%d') if request.args.get(key) else None
+                          for key in ('start', 'end'))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+        # The data version changes whenever the datasets are reloaded, so the frame is never hashed
+        payload = render_price_chart(stock_history, store.version, start, end)
+        return payload_response(payload, max_age=RESPONSE_CACHE_MAX_AGE)
+    
+    models = registry.active
+    if models is None:
+        return jsonify({'error': 'Model is currently loading. Please try again in a few moments.'}), 503
+    target = request.args.get('target', 'ridge')
+    if target not in ('ridge', 'stock'):
+        return jsonify({'error': 'target must be ridge or stock'}), 400
+    path = os.path.join(models.path, f'model_comparison_{target}.csv')
+    if not os.path.exists(path):
+        return jsonify({'error': f'No model comparison saved for model version {models.version}'}), 404
+    
+    charts = render_comparison_charts(pd.read_csv(path))
+    if name not in charts:
+        return jsonify({'error': f"Unknown chart: {name}"}), 404
+    return payload_response(charts[name], max_age=RESPONSE_CACHE_MAX_AGE)
+
+@app.route('/api/ingest', methods=['POST'])
+def ingest():
+    """Append new daily prices and apply them without a reload"""
+    if store is None:
+        return jsonify({'error': 'Data is currently loading. Please try again in a few moments.'}), 503
+    
+    rows = request.get_json(silent=True)
+    if isinstance(rows, dict):
+        rows = rows.get('rows')
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': 'Provide a JSON array of rows with a Date and currency prices'}), 400
+    
+    try:
+        appended = append_daily_rows(rows, store.sources['daily'], app.config['CACHE_FOLDER'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    refresh_data()
+    
+    return jsonify({
+        'status': 'success',
+        'appended': appended,
+        'rows': len(df_data),
+        'last_date': df_data['Date'].iloc[-1].strftime('%Y-%m-%d'),
+        'data_version': store.version
+    })
+
+# Model registry
+@app.route('/api/models')
+def model_versions():
+    """Active and previous model versions held in memory"""
+    return jsonify(registry.status())
+
+@app.route('/api/models/rollback', methods=['POST'])
+def rollback_model():
+    """Swap back to the previous model version held in memory"""
+    try:
+        previous = registry.version
+        model_set = registry.rollback()
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'status': 'success', 'rolled_back_from': previous, 'model_version': model_set.version})
+
+# Health checks
+@app.route('/healthz')
+def healthz():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 200 only once every component has loaded"""
+    ready = initializer.ready
+    body = {
+        'ready': ready,
+        'uptime_seconds': round(time.time() - initializer.started_at, 3) if initializer.started else 0,
+        'components': initializer.status()
+    }
+    return jsonify(body), 200 if ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Stage timing histograms of this worker in the Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 
 
 
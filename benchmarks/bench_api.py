@@ -0,0 +1,205 @@
+"""
+Benchmark suite for the Flask API hot paths
+
+Run from the repository root:
+
+    python -m benchmarks.bench_api                    # compare with the saved baseline
+    python -m benchmarks.bench_api --save-baseline    # record a new baseline
+    python -m benchmarks.bench_api --only predict --iterations 500
+
+Exits with status 1 when any case's p95 latency regresses by more than
+``--threshold`` relative to the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(func, iterations, warmup):
+    """Time ``func`` and return latency percentiles and throughput"""
+    for _ in range(warmup):
+        func()
+
+    timings = np.empty(iterations)
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(timings * 1000, [50, 95, 99])
+    return {
+        'iterations': iterations,
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'throughput_per_s': round(iterations / elapsed, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def sample_model_comparison():
+    """A model comparison frame shaped like the training notebook's output"""
+    rng = np.random.default_rng(42)
+    names = ['Linear Regression', 'Ridge Regression', 'Lasso Regression', 'ElasticNet',
+             'Decision Tree', 'Random Forest', 'Gradient Boosting', 'AdaBoost',
+             'Support Vector Regressor', 'K-Nearest Neighbors']
+    test_r2 = np.sort(rng.uniform(0.90, 0.9999, len(names)))[::-1]
+    return pd.DataFrame({
+        'Model': names,
+        'Train_R2': np.minimum(test_r2 + rng.uniform(0, 0.01, len(names)), 1.0),
+        'Test_R2': test_r2,
+        'Train_RMSE': rng.uniform(1, 20, len(names)),
+        'Test_RMSE': rng.uniform(2, 40, len(names)),
+        'Train_MAE': rng.uniform(1, 15, len(names)),
+        'Test_MAE': rng.uniform(2, 30, len(names)),
+        'CV_Score_Mean': test_r2 - rng.uniform(0, 0.02, len(names)),
+        'CV_Score_Std': rng.uniform(0.001, 0.02, len(names))
+    })
+
+
+def build_cases(app_module):
+    """Return {name: (callable, default iterations)} for every benchmarked path"""
+    from utils.visualizer import clear_chart_cache, create_visualizations
+
+    client = app_module.app.test_client()
+    df = app_module.df_data
+    usd = df['USD'].to_numpy()
+
+    # A realistic Ridge input built from the latest rows of the daily data
+    ridge_payload = {col: float(df[col].iloc[-1]) for col in df.columns[1:]}
+    for lag in [1, 3, 7, 14, 30]:
+        ridge_payload[f'USD_lag_{lag}'] = float(usd[-1 - lag])
+    for window in [3, 7, 14, 30]:
+        ridge_payload[f'USD_MA_{window}'] = float(usd[-window:].mean())
+
+    stock_payload = {'Open': 2027.4, 'High': 2041.9, 'Low': 2022.2, 'Volume': 166078.0, 'Date': '2024-01-19'}
+    comparison = sample_model_comparison()
+
+    def get(url, clear_cache=False):
+        def call():
+            if clear_cache:
+                app_module.response_cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return call
+
+    def post(url, payload):
+        def call():
+            response = client.post(url, json=payload)
+            assert response.status_code == 200, (url, response.status_code)
+        return call
+
+    return {
+        'api_predict': (post('/api/predict', ridge_payload), 500),
+        'api_predict_stock': (post('/api/predict-stock', stock_payload), 500),
+        'api_historical_data': (get('/api/historical-data', clear_cache=True), 200),
+        'api_historical_data_window': (
+            get('/api/historical-data?start=1980-01-01&currencies=USD,EUR,GBP&max_points=1000', clear_cache=True), 100),
+        'api_historical_data_cached': (get('/api/historical-data'), 500),
+        'api_price_analysis': (get('/api/price-analysis', clear_cache=True), 500),
+        'api_correlation_data': (get('/api/correlation-data', clear_cache=True), 500),
+        'load_data': (app_module.load_data, 10),
+        'predictor_predict': (lambda: app_module.registry.active.predictor.predict(stock_payload), 1000),
+        'api_chart_price': (get('/api/charts/price_chart'), 500),
+        'create_visualizations': (lambda: create_visualizations(comparison), 200),
+        'create_visualizations_cold': (lambda: (clear_chart_cache(), create_visualizations(comparison)), 20)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return the cases whose p95 regressed beyond the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('cases', {}).get(name)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + threshold)
+        if current['p95_ms'] > limit:
+            regressions.append((name, previous['p95_ms'], current['p95_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Gold Price Predictor hot paths')
+    parser.add_argument('--iterations', type=int, help='override the per-case iteration count')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed calls before each case')
+    parser.add_argument('--only', help='run only cases whose name contains this string')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed fractional p95 slowdown before failing (default 0.25)')
+    parser.add_argument('--output', help='also write the results JSON to this path')
+    args = parser.parse_args(argv)
+
+    import app as app_module
+
+    with app_module.app.app_context():
+        app_module.initialize_app()
+    if not app_module.initializer.ready:
+        print(f"Application failed to initialize: {app_module.initializer.status()}")
+        return 2
+
+    cases = build_cases(app_module)
+    results = {}
+    print(f"{'case':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'rss MB':>10}")
+    for name, (func, iterations) in cases.items():
+        if args.only and args.only not in name:
+            continue
+        stats = measure(func, args.iterations or iterations, args.warmup)
+        results[name] = stats
+        print(f"{name:<30}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+              f"{stats['throughput_per_s']:>12.1f}{stats['peak_rss_mb']:>10.1f}")
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: p95 {before:.3f} ms -> {after:.3f} ms")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} of baseline p95")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+gunicorn settings for multi-worker deployments
+
+    gunicorn -c gunicorn.conf.py
+
+The master loads every dataset once and publishes it as a read-only block
+in the cache folder before forking. Workers map that block instead of
+parsing the CSVs, so the price data is held once in memory however many
+workers run. Models are small and still load in each worker.
+"""
+
+import os
+
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8080')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+# Threaded (gthread) or async workers let the app micro-batch concurrent predictions;
+# the app reads the same variables to pick its default batch window
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+preload_app = True
+
+
+def on_starting(server):
+    """Publish the shared data block in the master, before any worker exists"""
+    import app
+    app.publish_shared_data()
+
+
+def post_fork(server, worker):
+    """Start loading in the worker; the loader threads do not survive fork"""
+    import app
+    app.initializer.start()
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cache import parse_price_csv
+from utils.training import TARGETS
+
+
+@pytest.fixture(scope='session')
+def daily():
+    """The shipped daily price history"""
+    frame = parse_price_csv('Daily.csv')
+    frame['Date'] = frame['Date'].astype('datetime64[ns]')
+    return frame
+
+
+@pytest.fixture
+def walk():
+    """A (dates, frame) random walk of four price columns"""
+    rng = np.random.default_rng(7)
+    values = 1000 + rng.normal(size=(800, 4)).cumsum(axis=0)
+    dates = pd.bdate_range('2020-01-01', periods=len(values)).to_numpy().astype('datetime64[ns]')
+    return dates, pd.DataFrame(values, columns=['USD', 'EUR', 'GBP', 'INR'])
+
+
+@pytest.fixture
+def legacy_models(tmp_path):
+    """A models folder holding the shipped artifacts at their fixed paths"""
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    for spec in TARGETS.values():
+        for key in ('model', 'scaler', 'features'):
+            shutil.copy(os.path.join('models', spec[key]), models_dir / spec[key])
+    return str(models_dir)
+
+
+def _shipped_results(target):
+    spec = TARGETS[target]
+    if spec['features'].endswith('.txt'):
+        with open(os.path.join('models', spec['features'])) as f:
+            features = [line.strip() for line in f]
+    else:
+        features = joblib.load(os.path.join('models', spec['features']))
+    artifacts = {'model': joblib.load(os.path.join('models', spec['model'])),
+                 'scaler': joblib.load(os.path.join('models', spec['scaler'])), 'features': features}
+    return artifacts, pd.DataFrame({'Model': ['shipped']}), {'model_name': 'shipped'}
+
+
+@pytest.fixture
+def shipped_results():
+    """Build training results that reuse a shipped model, to publish without a search"""
+    return _shipped_results
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The app module with its models and data loaded"""
+    import app
+    app.initializer.start()
+    app.initializer.wait()
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+
+from utils.backtest import backtest, regression_metrics, stock_dataset, walk_forward_splits
+from utils.features import CLOSE_FEATURES
+
+
+def test_metrics_match_sklearn():
+    rng = np.random.default_rng(3)
+    y_true = 1500 + rng.normal(0, 50, 400)
+    y_pred = y_true + rng.normal(0, 5, 400)
+    metrics = regression_metrics(y_true, y_pred)
+    assert metrics['rmse'] == pytest.approx(np.sqrt(mean_squared_error(y_true, y_pred)))
+    assert metrics['mae'] == pytest.approx(mean_absolute_error(y_true, y_pred))
+    assert metrics['mape'] == pytest.approx(mean_absolute_percentage_error(y_true, y_pred) * 100)
+    assert metrics['r2'] == pytest.approx(r2_score(y_true, y_pred))
+
+
+def test_walk_forward_splits_expand_to_the_end():
+    splits = list(walk_forward_splits(1000, 4))
+    assert splits == [(200, 400), (400, 600), (600, 800), (800, 1000)]
+
+
+def test_stock_features_do_not_use_the_days_close():
+    with open('models/feature_names.txt') as f:
+        feature_names = [line.strip() for line in f]
+    X, y, _ = stock_dataset(feature_names=feature_names)
+    for name in CLOSE_FEATURES:
+        assert not X[:, feature_names.index(name)].any()
+
+    # With the target out of the features the model cannot be exact
+    result, residuals = backtest('Linear Regression', ('linear', {}, True), X, y,
+                                 np.arange(len(y)).astype('datetime64[D]'), n_splits=3, max_workers=1)
+    assert result['summary']['rmse'] > 1
+    assert min(result['intervals']['quantiles']) > 1e-4
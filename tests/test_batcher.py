@@ -0,0 +1,53 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.batcher import MicroBatcher
+
+WEIGHTS = np.array([0.5, -1.0, 2.0])
+
+
+def test_lone_row_is_scored_without_waiting_for_the_window():
+    batcher = MicroBatcher(lambda X: X @ WEIGHTS, 'lone', max_wait=1.0)
+    started = time.perf_counter()
+    assert batcher.submit([1.0, 2.0, 3.0]) == pytest.approx(4.5)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_concurrent_rows_coalesce_and_match_direct_scoring():
+    gate = threading.Event()
+    batch_sizes = []
+
+    def score(X):
+        batch_sizes.append(len(X))
+        gate.wait(5)
+        return X @ WEIGHTS
+
+    batcher = MicroBatcher(score, 'coalesce', max_batch=64, max_wait=0.05)
+    rows = np.random.default_rng(2).normal(size=(20, 3))
+    with ThreadPoolExecutor(max_workers=len(rows)) as pool:
+        # The first row holds the scoring thread while the rest queue up behind it
+        first = pool.submit(batcher.submit, rows[0])
+        while not batch_sizes:
+            time.sleep(0.001)
+        rest = [pool.submit(batcher.submit, row) for row in rows[1:]]
+        while batcher._queue.qsize() < len(rest):
+            time.sleep(0.001)
+        gate.set()
+        results = [first.result()] + [future.result() for future in rest]
+
+    np.testing.assert_allclose(results, rows @ WEIGHTS)
+    assert batch_sizes == [1, len(rows) - 1]
+
+
+def test_scoring_errors_reach_every_caller():
+    def score(X):
+        raise ValueError('bad batch')
+
+    batcher = MicroBatcher(score, 'errors')
+    with pytest.raises(ValueError, match='bad batch'):
+        batcher.submit([1.0, 2.0, 3.0])
+    assert batcher._pending == 0
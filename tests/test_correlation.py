@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from utils.correlation import CorrelationTable
+
+
+def test_full_matrix_matches_pandas(daily):
+    frame = daily.drop(columns='Date')
+    table = CorrelationTable(daily['Date'].to_numpy(), frame.to_numpy(), frame.columns, windows=(30,))
+    np.testing.assert_allclose(table.matrix(), frame.corr().to_numpy(), atol=1e-10)
+
+
+@pytest.mark.parametrize('window', [30, 90])
+def test_rolling_matches_pandas(walk, window):
+    dates, frame = walk
+    table = CorrelationTable(dates, frame.to_numpy(), frame.columns, windows=(window,))
+    rolled_dates, series = table.rolling('USD', 'EUR', window)
+    expected = frame['USD'].rolling(window).corr(frame['EUR']).to_numpy()[window - 1:]
+    np.testing.assert_array_equal(rolled_dates, dates[window - 1:])
+    np.testing.assert_allclose(series, expected, atol=1e-5)
+    np.testing.assert_allclose(table.matrix(window=window),
+                               frame.iloc[-window:].corr().to_numpy(), atol=1e-5)
+
+
+def test_extend_matches_a_single_build(walk):
+    dates, frame = walk
+    values = frame.to_numpy().copy()
+    whole = CorrelationTable(dates, values, frame.columns, windows=(30, 90))
+    grown = CorrelationTable(dates[:500], values[:500], frame.columns, windows=(30, 90))
+    grown.extend(dates[500:520], values[500:520]).extend(dates[520:], values[520:])
+    np.testing.assert_allclose(grown.matrix(), whole.matrix(), atol=1e-12)
+    for window in (30, 90):
+        np.testing.assert_allclose(grown.rolling('GBP', 'INR', window)[1],
+                                   whole.rolling('GBP', 'INR', window)[1], atol=1e-6)
+
+
+def test_flat_window_is_nan(walk):
+    dates, frame = walk
+    values = frame.to_numpy().copy()
+    values[300:400, 1] = values[299, 1]
+    table = CorrelationTable(dates, values, frame.columns, windows=(30,))
+    series = table.rolling('USD', 'EUR', 30)[1]
+    assert np.isnan(series[330 - 29:400 - 29]).all()
+    assert np.isfinite(series[:300 - 29]).all()
+
+
+def test_unknown_currency_and_window(walk):
+    dates, frame = walk
+    table = CorrelationTable(dates, frame.to_numpy(), frame.columns, windows=(30,))
+    with pytest.raises(KeyError):
+        table.against('USD', ['XXX'])
+    with pytest.raises(KeyError):
+        table.matrix(window=90)
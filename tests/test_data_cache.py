@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_cache
+from utils.data_cache import load_price_frame, load_snapshot, parse_price_csv
+
+HEADER = 'Date,USD,EUR\n'
+ROWS = ['01/02/2020,"1,520.5",1350.1\n', '01/03/2020,1530.0,#N/A\n', '01/06/2020,1541.25,1370.0\n']
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'prices.csv'
+    path.write_text(HEADER + ''.join(ROWS))
+    return str(path)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Paths passed to build_snapshot, which only runs on a full rebuild"""
+    calls = []
+    build = data_cache.build_snapshot
+
+    def counting(csv_path, cache_dir):
+        calls.append(csv_path)
+        return build(csv_path, cache_dir)
+
+    monkeypatch.setattr(data_cache, 'build_snapshot', counting)
+    return calls
+
+
+def assert_matches_csv(csv_path, cache_dir):
+    frame = load_price_frame(csv_path, cache_dir, mmap=False)
+    expected = parse_price_csv(csv_path)
+    expected['Date'] = expected['Date'].astype('datetime64[ns]')
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_snapshot_matches_the_parsed_csv(csv_path, tmp_path, builds):
+    dates, values, meta = load_snapshot(csv_path, str(tmp_path / 'cache'))
+    assert meta['columns'] == ['USD', 'EUR'] and meta['rows'] == 3
+    assert isinstance(values, np.memmap) and values.flags.f_contiguous
+    assert values[0, 0] == 1520.5 and values[1, 1] == 1350.1
+    assert_matches_csv(csv_path, str(tmp_path / 'cache'))
+    assert len(builds) == 1
+
+
+def test_unchanged_and_touched_files_are_not_rebuilt(csv_path, tmp_path, builds):
+    cache = str(tmp_path / 'cache')
+    load_snapshot(csv_path, cache)
+    load_snapshot(csv_path, cache)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    _, _, meta = load_snapshot(csv_path, cache)
+    assert len(builds) == 1
+    assert meta['mtime_ns'] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_same_size_rewrite_is_rebuilt(csv_path, tmp_path, builds):
+    cache = str(tmp_path / 'cache')
+    load_snapshot(csv_path, cache)
+    with open(csv_path, 'w') as f:
+        f.write(HEADER + ''.join(ROWS).replace('1530.0', '1531.0'))
+    _, values, _ = load_snapshot(csv_path, cache)
+    assert len(builds) == 2 and values[1, 0] == 1531.0
+
+
+def test_appended_rows_extend_the_snapshot(csv_path, tmp_path, builds):
+    cache = str(tmp_path / 'cache')
+    load_snapshot(csv_path, cache)
+    with open(csv_path, 'a') as f:
+        f.write('01/07/2020,1550.0,#N/A\n01/08/2020,"1,560.0",1380.5\n')
+    _, values, meta = load_snapshot(csv_path, cache)
+    assert len(builds) == 1 and meta['rows'] == 5
+    # The gap is forward-filled from the last snapshot row, as a full parse would fill it
+    assert_matches_csv(csv_path, cache)
+
+
+@pytest.mark.parametrize('change', ['rewrite_prefix', 'older_date'])
+def test_invalid_appends_fall_back_to_a_rebuild(csv_path, tmp_path, builds, change):
+    cache = str(tmp_path / 'cache')
+    load_snapshot(csv_path, cache)
+    if change == 'rewrite_prefix':
+        text = HEADER + ''.join(ROWS).replace('1350.1', '1350.2') + '01/07/2020,1550.0,1375.0\n'
+    else:
+        text = HEADER + ''.join(ROWS) + '01/01/2020,1500.0,1340.0\n'
+    with open(csv_path, 'w') as f:
+        f.write(text)
+    if change == 'older_date':
+        meta = data_cache._read_meta(data_cache.snapshot_paths(csv_path, cache)[0])
+        with pytest.raises(ValueError):
+            data_cache.append_snapshot(csv_path, cache, meta)
+    load_snapshot(csv_path, cache)
+    assert len(builds) == 2
+    assert_matches_csv(csv_path, cache)
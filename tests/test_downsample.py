@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsample import min_points, minmax_indices
+
+
+def reference_indices(values, max_points):
+    """Bucket extremes computed with pandas groupby"""
+    frame = pd.DataFrame(values)
+    n, n_series = frame.shape
+    buckets = (max_points - 2) // (2 * n_series)
+    interior = frame.iloc[1:-1]
+    size = -(-len(interior) // buckets)
+    groups = interior.groupby(np.arange(len(interior)) // size)
+    picked = set(groups.idxmin().to_numpy().ravel()) | set(groups.idxmax().to_numpy().ravel())
+    return np.array(sorted(picked | {0, n - 1}))
+
+
+@pytest.mark.parametrize('n_series', [1, 3])
+@pytest.mark.parametrize('max_points', [10, 101, 1000])
+def test_matches_pandas_bucket_extremes(n_series, max_points):
+    values = np.random.default_rng(1).normal(size=(5000, n_series)).cumsum(axis=0)
+    keep = minmax_indices(values, max_points)
+    np.testing.assert_array_equal(keep, reference_indices(values, max_points))
+    assert len(keep) <= max_points
+
+
+def test_short_series_is_returned_whole():
+    np.testing.assert_array_equal(minmax_indices(np.arange(5.0), 10), np.arange(5))
+
+
+def test_nan_rows_are_never_picked_as_extremes():
+    values = np.random.default_rng(2).normal(size=(1000, 2))
+    values[100:200, 0] = np.nan
+    keep = minmax_indices(values, 50)
+    np.testing.assert_array_equal(keep, reference_indices(values, 50))
+    assert len(keep) <= 50
+
+
+def test_max_points_below_one_bucket_is_rejected():
+    values = np.zeros((100, 4))
+    assert min_points(4) == 10
+    with pytest.raises(ValueError):
+        minmax_indices(values, 9)
+    assert len(minmax_indices(values, 10)) <= 10
@@ -0,0 +1,75 @@
+import gzip
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.export import gzip_stream, stream_export
+
+
+def exported(walk, fmt, lo=0, hi=None, cols=(0, 2), chunk_rows=64):
+    dates, frame = walk
+    hi = len(dates) if hi is None else hi
+    columns = [frame.columns[i] for i in cols]
+    blocks = list(stream_export(dates, frame.to_numpy(), columns, list(cols), lo, hi, fmt, chunk_rows))
+    expected = frame.iloc[lo:hi, list(cols)].reset_index(drop=True)
+    expected.insert(0, 'Date', pd.to_datetime(dates[lo:hi]).strftime('%Y-%m-%d'))
+    return blocks, expected
+
+
+def test_csv_matches_the_frame(walk):
+    blocks, expected = exported(walk, 'csv', 10, 500)
+    assert len(blocks) == 1 + -(-490 // 64)
+    result = pd.read_csv(io.BytesIO(b''.join(blocks)))
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9)
+
+
+def test_ndjson_matches_the_frame(walk):
+    blocks, expected = exported(walk, 'ndjson', 100, 300)
+    result = pd.read_json(io.BytesIO(b''.join(blocks)), lines=True, convert_dates=False)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9)
+
+
+def test_arrow_matches_the_frame(walk):
+    pyarrow = pytest.importorskip('pyarrow')
+    blocks, expected = exported(walk, 'arrow', 0, 200)
+    table = pyarrow.ipc.open_stream(io.BytesIO(b''.join(blocks))).read_all()
+    result = table.to_pandas()
+    result['Date'] = pd.to_datetime(result['Date']).dt.strftime('%Y-%m-%d')
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_empty_window_and_bad_format(walk):
+    blocks, _ = exported(walk, 'csv', 50, 50)
+    assert b''.join(blocks) == b'Date,USD,GBP\n'
+    with pytest.raises(ValueError):
+        exported(walk, 'xml')
+
+
+def test_gzip_stream_is_one_member():
+    blocks = [bytes([i]) * 1000 for i in range(50)]
+    compressed = list(gzip_stream(iter(blocks)))
+    assert gzip.decompress(b''.join(compressed)) == b''.join(blocks)
+    assert zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(b''.join(compressed)) == b''.join(blocks)
+
+
+def test_route_exports_the_date_window_gzipped(client, app_module):
+    store = app_module.store
+    dates, values, columns = store.arrays('daily')
+    response = client.get('/api/export?format=csv&currencies=usd,eur&start=2020-01-01&end=2020-03-31',
+                          headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200 and response.headers['Content-Encoding'] == 'gzip'
+    result = pd.read_csv(io.BytesIO(gzip.decompress(response.get_data())))
+
+    day = pd.to_datetime(np.asarray(dates).view('datetime64[ns]'))
+    inside = (day >= '2020-01-01') & (day <= '2020-03-31')
+    assert result['Date'].tolist() == day[inside].strftime('%Y-%m-%d').tolist()
+    np.testing.assert_allclose(result['USD'], np.asarray(values)[inside, columns.index('USD')], rtol=1e-9)
+
+
+def test_route_rejects_bad_parameters(client):
+    assert client.get('/api/export?start=bad').status_code == 400
+    assert client.get('/api/export?currencies=XYZ').status_code == 400
+    assert client.get('/api/export?format=xml').status_code == 400
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import Ridge
+
+from utils import forecast
+from utils.features import moving_average, ridge_feature_matrix
+from utils.forecast import (FORECAST_MAX_HORIZON, FORECAST_MAX_SCENARIOS, ForecastPlan, ForecastState,
+                            build_forecast, parse_horizons, run_forecast, scenario_shifts)
+from utils.kernel import LinearKernel
+
+FEATURES = ['EUR', 'USD_lag_1', 'GBP', 'USD_lag_3', 'USD_MA_3', 'USD_lag_7', 'USD_MA_7']
+
+
+@pytest.fixture
+def history(walk):
+    dates, frame = walk
+    return dates.view(np.int64), frame.to_numpy(), list(frame.columns)
+
+
+@pytest.fixture
+def fitted(history):
+    dates, values, columns = history
+    X, y, _ = ridge_feature_matrix(dates, values, columns, FEATURES)
+    model = Ridge(alpha=1.0).fit(pd.DataFrame(X, columns=FEATURES), y)
+    return model, LinearKernel.from_estimator(model, FEATURES)
+
+
+def naive_forecast(kernel, values, columns, horizon, shift):
+    """Score each step from a growing list of USD prices"""
+    usd = list(values[:, columns.index('USD')])
+    rates = values[-1] / values[-1, columns.index('USD')] * shift
+    for _ in range(horizon):
+        features = {col: rates[i] * usd[-1] for i, col in enumerate(columns)}
+        for name in kernel.feature_names:
+            if name.startswith('USD_lag_'):
+                features[name] = usd[-int(name[len('USD_lag_'):])]
+            elif name.startswith('USD_MA_'):
+                features[name] = np.mean(usd[-int(name[len('USD_MA_'):]):])
+        usd.append(float(kernel.predict(kernel.vector(features))))
+    return np.array(usd[-horizon:])
+
+
+def test_first_step_matches_a_direct_ridge_prediction(history, fitted):
+    dates, values, columns = history
+    model, kernel = fitted
+    usd = values[:, columns.index('USD')]
+    # The next day's inputs: today's prices, USD lags counted from tomorrow, and trailing averages to today
+    row = {'EUR': values[-1, 1], 'GBP': values[-1, 2], 'USD_lag_1': usd[-1], 'USD_lag_3': usd[-3],
+           'USD_lag_7': usd[-7], 'USD_MA_3': moving_average(usd, 3)[-1], 'USD_MA_7': moving_average(usd, 7)[-1]}
+    expected = model.predict(pd.DataFrame([row], columns=FEATURES))[0]
+
+    plan = ForecastPlan(FEATURES, columns)
+    paths, _ = run_forecast(kernel, ForecastState(dates, values, columns, plan.history), 1, np.ones((1, 4)), plan)
+    assert paths[0, 0] == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize('horizon', [1, 7, 30, FORECAST_MAX_HORIZON])
+def test_ring_buffer_matches_a_naive_recursion(history, horizon):
+    dates, values, columns = history
+    # Weights summing to about one keep long horizons from blowing up
+    kernel = LinearKernel([0.1, 0.3, -0.05, 0.2, 0.25, 0.1, 0.1], 2.0, FEATURES)
+    shifts = np.array([[1, 1, 1, 1], [1, 1.1, 0.9, 1], [1, 0.5, 2.0, 1]], dtype=float)
+    plan = ForecastPlan(FEATURES, columns)
+    state = ForecastState(dates, values, columns, plan.history)
+    assert plan.history == 7 and len(state.history) == 7
+
+    paths, rates = run_forecast(kernel, state, horizon, shifts, plan)
+    assert paths.shape == (3, horizon)
+    for s, shift in enumerate(shifts):
+        np.testing.assert_allclose(paths[s], naive_forecast(kernel, values, columns, horizon, shift), rtol=1e-10)
+        np.testing.assert_allclose(rates[s], values[-1] / values[-1, 0] * shift)
+
+
+def test_too_little_history_is_rejected(history):
+    dates, values, columns = history
+    with pytest.raises(ValueError):
+        ForecastState(dates[:5], values[:5], columns, 7)
+    with pytest.raises(ValueError):
+        ForecastPlan(['USD_volatility'], columns)
+
+
+@pytest.mark.parametrize('scenarios', [
+    [],
+    [{}] * (FORECAST_MAX_SCENARIOS + 1),
+    [{'fx': {'USD': 1.1}}],
+    [{'fx': {'XYZ': 1.1}}],
+    [{'fx': {'EUR': 0}}],
+    [{'fx': {'EUR': 'nan'}}],
+    [{'fx': {'EUR': 'abc'}}]
+])
+def test_invalid_scenarios_are_rejected(scenarios):
+    with pytest.raises(ValueError):
+        scenario_shifts(scenarios, ['USD', 'EUR'])
+
+
+def test_scenario_shifts():
+    shifts = scenario_shifts([{}, {'fx': {'EUR': 1.5}}, {'fx': None}], ['USD', 'EUR', 'GBP'])
+    np.testing.assert_array_equal(shifts, [[1, 1, 1], [1, 1.5, 1], [1, 1, 1]])
+
+
+@pytest.mark.parametrize('value, horizons', [(5, [5]), ('30,1,7,7', [1, 7, 30]), ([90, 2], [2, 90])])
+def test_parse_horizons(value, horizons):
+    assert parse_horizons(value) == horizons
+
+
+@pytest.mark.parametrize('value', [0, FORECAST_MAX_HORIZON + 1, '', 'a', []])
+def test_invalid_horizons_are_rejected(value):
+    with pytest.raises(ValueError):
+        parse_horizons(value)
+
+
+def test_build_forecast_reports_each_scenario(history, fitted):
+    dates, values, columns = history
+    _, kernel = fitted
+    scenarios = [{'name': 'base'}, {'fx': {'EUR': 1.2}}]
+    result = build_forecast(kernel, dates, values, columns, [1, 5], scenarios, ['USD', 'EUR'])
+
+    assert result['last_date'] == str(pd.Timestamp(dates[-1]).date())
+    assert result['dates'] == [str(d.date()) for d in pd.bdate_range(pd.Timestamp(dates[-1]), periods=6)[1:]]
+    base, shifted = result['scenarios']
+    assert (base['name'], shifted['name'], shifted['fx']) == ('base', 'scenario_1', {'EUR': 1.2})
+    for scenario, factor in ((base, 1.0), (shifted, 1.2)):
+        paths = scenario['paths']
+        assert len(paths['USD']) == 5
+        assert scenario['at_horizon']['5'] == {'USD': paths['USD'][4], 'EUR': paths['EUR'][4]}
+        rate = values[-1, 1] / values[-1, 0] * factor
+        np.testing.assert_allclose(paths['EUR'], np.array(paths['USD']) * rate, atol=0.02)
+    # EUR is an input of the model, so shifting it moves the USD path too
+    assert shifted['paths']['USD'] != base['paths']['USD']
+
+
+def test_cached_forecast_builds_once(monkeypatch):
+    monkeypatch.setattr(forecast, '_cache', forecast.OrderedDict())
+    monkeypatch.setattr(forecast, 'FORECAST_CACHE_SIZE', 2)
+    calls = []
+
+    def build(key):
+        return lambda: calls.append(key) or {'key': key}
+
+    assert forecast.cached_forecast('a', build('a')) == {'key': 'a'}
+    assert forecast.cached_forecast('a', build('a')) == {'key': 'a'}
+    forecast.cached_forecast('b', build('b'))
+    forecast.cached_forecast('c', build('c'))
+    forecast.cached_forecast('a', build('a'))
+    assert calls == ['a', 'b', 'c', 'a']
+
+
+def test_forecast_route(client):
+    response = client.get('/api/forecast?horizon=1,3&currencies=USD,EUR')
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['horizons'] == [1, 3] and len(result['dates']) == 3
+    assert client.get('/api/forecast?horizon=0').status_code == 400
+    assert client.post('/api/forecast', json={'scenarios': [{'fx': {'USD': 2}}]}).status_code == 400
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from utils import indicators
+from utils.indicators import KINDS, IndicatorTable
+
+
+def reference(frame, kind):
+    """The training notebook's pandas definition of each indicator kind"""
+    name, _, arg = kind.rpartition('_')
+    if name == 'lag':
+        return frame.shift(int(arg))
+    if name == 'MA':
+        return frame.rolling(int(arg)).mean()
+    if name == 'EMA':
+        return frame.ewm(span=int(arg), adjust=False).mean()
+    if name == 'volatility':
+        return frame.rolling(int(arg)).std()
+    if kind == 'pct_change':
+        return frame.pct_change()
+    if kind == 'price_change':
+        return frame.diff()
+    if kind == 'RSI':
+        delta = frame.diff()
+        gain = delta.where(delta > 0, 0).rolling(14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+        return 100 - 100 / (1 + gain / loss)
+    if kind in ('BB_upper', 'BB_lower'):
+        sign = 1 if kind == 'BB_upper' else -1
+        return frame.rolling(20).mean() + sign * 2 * frame.rolling(20).std()
+    line = frame.ewm(span=12, adjust=False).mean() - frame.ewm(span=26, adjust=False).mean()
+    signal = line.ewm(span=9, adjust=False).mean()
+    return {'MACD': line, 'MACD_signal': signal, 'MACD_hist': line - signal}[kind]
+
+
+@pytest.fixture
+def prices(walk):
+    dates, frame = walk
+    # One column at VND scale, where naive rolling variance formulas lose precision
+    frame = frame.assign(VND=frame['USD'] * 1e4)
+    return dates, frame
+
+
+@pytest.mark.parametrize('kind', sorted(KINDS))
+def test_kinds_match_pandas(prices, kind):
+    dates, frame = prices
+    table = IndicatorTable(dates, frame.to_numpy(), frame.columns)
+    expected = reference(frame, kind).to_numpy()
+    np.testing.assert_allclose(table.series(kind), expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_latest_is_the_last_row_of_every_series(prices):
+    dates, frame = prices
+    table = IndicatorTable(dates, frame.to_numpy(), frame.columns)
+    latest = table.latest()
+    for kind in ('MA_7', 'RSI', 'EMA_26', 'volatility_30'):
+        for col in frame.columns:
+            assert latest[f'{col}_{kind}'] == pytest.approx(table.get(col, kind)[-1], rel=1e-12)
+
+
+def test_unknown_names_raise_key_error(prices):
+    dates, frame = prices
+    table = IndicatorTable(dates, frame.to_numpy(), frame.columns)
+    with pytest.raises(KeyError):
+        table.get('XYZ', 'RSI')
+    with pytest.raises(KeyError):
+        table.series('MA_5')
+
+
+def test_each_kind_is_computed_once(prices, monkeypatch):
+    dates, frame = prices
+    calls = []
+    counting = {kind: (lambda v, kind=kind, compute=compute: calls.append(kind) or compute(v))
+                for kind, compute in KINDS.items()}
+    monkeypatch.setattr(indicators, 'KINDS', counting)
+    table = IndicatorTable(dates, frame.to_numpy(), frame.columns)
+    assert sorted(calls) == sorted(KINDS)
+    assert table.series('MACD') is table.series('MACD')
+    table.get('USD', 'RSI')
+    assert len(calls) == len(KINDS)
@@ -0,0 +1,58 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from utils.ingest import append_daily_rows
+from utils.timeseries_store import RESOLUTIONS, TimeSeriesStore
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copy('Daily.csv', tmp_path / 'Daily.csv')
+    return tmp_path
+
+
+def load_store(data_dir, cache_name):
+    return TimeSeriesStore(str(data_dir / cache_name), data_dirs=(str(data_dir),)).load()
+
+
+def test_appended_rows_match_a_fresh_load(data_dir):
+    store = load_store(data_dir, 'cache')
+    before = len(store.dates('daily'))
+    version = store.version
+    rows = [
+        {'Date': '2023-07-24', 'USD': 1962.3, 'EUR': 1765.1},
+        {'Date': '2023-07-25', 'USD': 1958.0, 'EUR': 1770.4, 'VND': 46500000.5},
+        {'Date': '2023-08-01', 'USD': 1944.8}
+    ]
+    assert append_daily_rows(rows, str(data_dir / 'Daily.csv'), str(data_dir / 'cache')) == 3
+
+    assert store.refresh() == before
+    assert store.refresh() is None
+    # The appended snapshot chains its digest, so only the change of version is comparable
+    assert store.version != version
+    fresh = load_store(data_dir, 'fresh-cache')
+    for resolution in RESOLUTIONS:
+        np.testing.assert_array_equal(store.dates(resolution), fresh.dates(resolution))
+        np.testing.assert_array_equal(store.arrays(resolution)[1], fresh.arrays(resolution)[1])
+
+    # Missing prices are forward-filled from the previous row
+    usd, eur = store.get('daily', 'USD')[1], store.get('daily', 'EUR')[1]
+    assert usd[-1] == 1944.8 and eur[-1] == 1770.4
+
+
+@pytest.mark.parametrize('rows', [
+    [],
+    [{'USD': 1}],
+    [{'Date': '2023-07-21', 'USD': 1}],
+    [{'Date': '2023-07-25', 'USD': 1}, {'Date': '2023-07-24', 'USD': 1}],
+    [{'Date': '2023-07-24', 'XXX': 1}],
+    [{'Date': 'not a date', 'USD': 1}]
+])
+def test_invalid_rows_are_rejected_and_nothing_is_written(data_dir, rows):
+    path = data_dir / 'Daily.csv'
+    original = path.read_bytes()
+    with pytest.raises(ValueError):
+        append_daily_rows(rows, str(path))
+    assert path.read_bytes() == original
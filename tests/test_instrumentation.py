@@ -0,0 +1,92 @@
+import logging
+import os
+
+import pytest
+
+from utils import instrumentation
+from utils.instrumentation import Histogram, RateLimitFilter, RequestProfiler, StageTimer
+
+
+def test_histogram_renders_cumulative_buckets():
+    metric = Histogram('test_seconds', 'Test timings', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        metric.observe(value, 'a')
+    metric.observe(0.2, 'b')
+    lines = metric.render()
+    assert lines[:2] == ['# HELP test_seconds Test timings', '# TYPE test_seconds histogram']
+    assert 'test_seconds_bucket{op="a",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{op="a",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{op="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{op="a"} 3.65' in lines
+    assert 'test_seconds_count{op="a"} 4' in lines
+    assert 'test_seconds_count{op="b"} 1' in lines
+
+
+def test_registered_histograms_are_exported(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_registry', {})
+    metric = instrumentation.histogram('test_total_seconds', 'Totals')
+    assert instrumentation.histogram('test_total_seconds', 'Totals') is metric
+    metric.observe(0.001)
+    text = instrumentation.render_metrics()
+    assert text.endswith('\n')
+    assert 'test_total_seconds_bucket{le="0.001"} 1' in text.splitlines()
+    assert 'test_total_seconds_count 1' in text.splitlines()
+
+
+def test_stage_timer_records_stages_and_total():
+    metric = Histogram('test_stage_seconds', 'Stages', ('operation', 'stage'))
+    with StageTimer('predict', metric) as timer:
+        with timer.stage('parse'):
+            pass
+        for _ in range(2):
+            with timer.stage('model'):
+                pass
+    assert set(timer.stages) == {'parse', 'model', 'total'}
+    assert timer.stages['total'] >= timer.stages['parse'] + timer.stages['model']
+    lines = metric.render()
+    assert 'test_stage_seconds_count{operation="predict",stage="model"} 2' in lines
+    assert 'test_stage_seconds_count{operation="predict",stage="total"} 1' in lines
+
+
+def test_stage_timer_records_failed_blocks():
+    metric = Histogram('test_failed_seconds', 'Stages', ('operation', 'stage'))
+    with pytest.raises(RuntimeError):
+        with StageTimer('predict', metric) as timer:
+            with timer.stage('model'):
+                raise RuntimeError('boom')
+    assert set(timer.stages) == {'model', 'total'}
+
+
+def test_rate_limit_filter_suppresses_bursts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(instrumentation.time, 'monotonic', lambda: now[0])
+    rate_filter = RateLimitFilter(period=10.0, burst=2)
+
+    def record(lineno=1):
+        return logging.LogRecord('gold.test', logging.ERROR, 'app.py', lineno, 'failed %s', ('x',), None)
+
+    assert [rate_filter.filter(record()) for _ in range(5)] == [True, True, False, False, False]
+    # Another call site has its own budget
+    assert rate_filter.filter(record(lineno=2))
+
+    now[0] += 10.0
+    passed = record()
+    assert rate_filter.filter(passed)
+    assert passed.getMessage() == 'failed x (3 similar messages suppressed)'
+    assert rate_filter.filter(record()) and not rate_filter.filter(record())
+
+
+def test_profiler_runs_one_request_at_a_time(tmp_path):
+    profiler = RequestProfiler(str(tmp_path / 'profiles'))
+    running = profiler.start()
+    assert running is not None
+    assert profiler.start() is None
+    name = profiler.stop(running, 'predict')
+    assert os.path.exists(tmp_path / 'profiles' / name) and '-predict-' in name
+    profiler.stop(profiler.start(), 'again')
+
+
+def test_metrics_route(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    assert '# TYPE gold_stage_duration_seconds histogram' in response.get_data(as_text=True)
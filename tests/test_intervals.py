@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from utils.intervals import INTERVAL_LEVELS, IntervalTable, conformal_quantiles, interval_table, load_interval_table
+from utils.model_registry import ModelRegistry
+from utils.training import train_target, write_version
+
+
+@pytest.mark.parametrize('n, levels, ranks', [
+    # ceil((n + 1) a) worked out by hand; 100 * 0.07 is 7.000000000000001 in floating point
+    (19, INTERVAL_LEVELS, [10, 16, 18, 19, 19]),
+    (99, (0.07, 0.5, 0.9, 0.99), [7, 50, 90, 99]),
+    (200, INTERVAL_LEVELS, [101, 161, 181, 191, 199])
+])
+def test_quantiles_are_the_conformal_order_statistics(n, levels, ranks):
+    rng = np.random.default_rng(11)
+    # Distinct scores k / 1000 for k = 1..n, shuffled; the k-th smallest is k / 1000
+    y_pred = np.full(n, 1000.0)
+    y_true = y_pred + rng.permutation(np.arange(1, n + 1))
+    np.testing.assert_allclose(conformal_quantiles(y_true, y_pred, levels), np.array(ranks) / 1000)
+
+
+def test_bounds_cover_fresh_exchangeable_errors():
+    rng = np.random.default_rng(12)
+    calibration = 1 + rng.normal(0, 0.01, 2000)
+    table = IntervalTable(INTERVAL_LEVELS, conformal_quantiles(calibration * 100, np.full(2000, 100.0)))
+    fresh = 100 * (1 + rng.normal(0, 0.01, 20000))
+    for level in INTERVAL_LEVELS:
+        lower, upper = table.bounds(np.full(len(fresh), 100.0), level)
+        assert np.mean((fresh >= lower) & (fresh <= upper)) == pytest.approx(level, abs=0.02)
+
+
+def test_degenerate_calibration_falls_back_to_fixed_band():
+    entry = IntervalTable(INTERVAL_LEVELS, [5e-16] * len(INTERVAL_LEVELS)).to_dict()
+    table = interval_table(entry)
+    assert table.method == 'fixed'
+    lower, upper = table.bounds(100.0)
+    assert (lower, upper) == pytest.approx((98.0, 102.0))
+
+
+def test_invalid_level_is_rejected():
+    with pytest.raises(ValueError):
+        IntervalTable.fixed().check_level(0.7)
+
+
+def test_each_version_serves_its_own_intervals(legacy_models):
+    manifest = write_version({'stock': train_target('stock', n_splits=3, n_jobs=1)}, legacy_models,
+                             version='v1', publish=False)
+    registry = ModelRegistry(legacy_models)
+    assert registry.load(), registry.last_error
+    models = registry.active
+
+    stored = manifest['targets']['stock']['intervals']
+    assert models.predictor.intervals.quantiles.tolist() == stored['quantiles']
+    assert not models.predictor.intervals.degenerate
+    # The carried Ridge model keeps the calibration of the legacy artifacts
+    assert models.ridge_intervals.to_dict() == load_interval_table('ridge_regression').to_dict()
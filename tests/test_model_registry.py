@@ -0,0 +1,59 @@
+import json
+import os
+
+import joblib
+import pytest
+
+from utils.model_registry import LEGACY_VERSION, ModelRegistry
+from utils.training import TARGETS, write_version
+
+
+def test_legacy_files_load_without_a_manifest(legacy_models):
+    registry = ModelRegistry(legacy_models)
+    assert registry.load()
+    assert registry.version == LEGACY_VERSION
+    assert not registry.refresh()
+
+
+def test_new_version_is_swapped_in_and_rolled_back(legacy_models, shipped_results):
+    models_dir = legacy_models
+    registry = ModelRegistry(models_dir)
+    registry.load()
+    write_version({'ridge': shipped_results('ridge')}, models_dir, version='v1', publish=False)
+    assert registry.refresh()
+    assert registry.version == 'v1'
+    assert [m.version for m in registry.previous] == [LEGACY_VERSION]
+
+    assert registry.rollback().version == LEGACY_VERSION
+    assert registry.version == LEGACY_VERSION
+    # The manifest has not changed, so the next poll keeps the rollback
+    assert not registry.refresh()
+    with pytest.raises(LookupError):
+        registry.rollback()
+
+
+def test_version_failing_the_canary_is_not_served(legacy_models, shipped_results):
+    models_dir = legacy_models
+    registry = ModelRegistry(models_dir)
+    registry.load()
+    artifacts, comparison, summary = shipped_results('stock')
+    artifacts['model'].intercept_ = artifacts['model'].intercept_ + 5000
+    write_version({'stock': (artifacts, comparison, summary)}, models_dir, version='bad', publish=False)
+    assert not registry.refresh()
+    assert registry.version == LEGACY_VERSION
+    assert 'canary' in registry.last_error
+
+
+def test_altered_artifact_fails_the_checksum(legacy_models, shipped_results):
+    models_dir = legacy_models
+    manifest = write_version({'ridge': shipped_results('ridge')}, models_dir, version='v1', publish=False)
+    path = os.path.join(models_dir, manifest['path'], TARGETS['ridge']['model'])
+    model = joblib.load(path)
+    model.alpha = model.alpha * 2
+    os.remove(path)
+    joblib.dump(model, path)
+    registry = ModelRegistry(models_dir)
+    assert not registry.load()
+    assert 'Checksum mismatch' in registry.last_error
+    with open(os.path.join(models_dir, 'manifest.json')) as f:
+        assert json.load(f)['version'] == 'v1'
@@ -0,0 +1,21 @@
+import pytest
+
+ROWS = [{'Date': '2023-07-20', 'Open': 1970.0, 'High': 1985.0, 'Low': 1965.0, 'Volume': 150000},
+        {'Date': '2023-07-21', 'Open': 1980.0, 'High': 1990.0, 'Low': 1960.0, 'Volume': 120000}]
+
+
+@pytest.mark.parametrize('path, body', [('/api/predict-stock', ROWS[0]), ('/api/predict-stock/batch', ROWS)])
+@pytest.mark.parametrize('level', ['abc', '0.7'])
+def test_unsupported_level_is_400(client, path, body, level):
+    response = client.post(f'{path}?level={level}', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('level must be one of')
+
+
+def test_batch_matches_single_predictions(client):
+    batch = client.post('/api/predict-stock/batch?level=0.9', json=ROWS).get_json()
+    assert batch['succeeded'] == len(ROWS)
+    for row, scored in zip(ROWS, batch['predictions']):
+        single = client.post('/api/predict-stock?level=0.9', json=row).get_json()
+        assert scored['predicted_price'] == pytest.approx(single['predicted_price'], abs=0.01)
+        assert scored['lower'] == pytest.approx(single['prediction_interval']['lower'], abs=0.01)
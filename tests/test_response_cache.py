@@ -0,0 +1,74 @@
+import pytest
+from flask import Flask, jsonify, request
+
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cached_app():
+    state = {'version': 'v1', 'calls': 0}
+    cache = ResponseCache(lambda: state['version'], max_entries=2)
+    app = Flask(__name__)
+
+    @app.route('/value')
+    @cache.cached
+    def value():
+        state['calls'] += 1
+        if request.args.get('fail'):
+            return jsonify({'error': 'bad'}), 400
+        return jsonify({'version': state['version'], 'q': request.args.get('q'), 'calls': state['calls']})
+
+    return app.test_client(), cache, state
+
+
+def test_repeat_requests_are_served_from_the_cache(cached_app):
+    client, cache, state = cached_app
+    first = client.get('/value?q=1&r=2')
+    second = client.get('/value?r=2&q=1')
+    assert first.get_data() == second.get_data() and state['calls'] == 1
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert first.headers['Cache-Control'] == 'public, max-age=60'
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+
+def test_matching_etag_is_304(cached_app):
+    client, _, _ = cached_app
+    etag = client.get('/value').headers['ETag']
+    response = client.get('/value', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.get_data() == b''
+    assert client.get('/value', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_new_version_misses_and_changes_the_etag(cached_app):
+    client, cache, state = cached_app
+    old = client.get('/value')
+    state['version'] = 'v2'
+    new = client.get('/value', headers={'If-None-Match': old.headers['ETag']})
+    assert new.status_code == 200 and new.get_json()['version'] == 'v2'
+    assert new.headers['ETag'] != old.headers['ETag'] and state['calls'] == 2
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+    client.get('/value')
+    assert state['calls'] == 3
+
+
+def test_errors_and_unversioned_data_are_not_cached(cached_app):
+    client, cache, state = cached_app
+    assert client.get('/value?fail=1').status_code == 400
+    assert client.get('/value?fail=1').status_code == 400
+    state['version'] = None
+    client.get('/value')
+    client.get('/value')
+    assert state['calls'] == 4 and cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cached_app):
+    client, _, state = cached_app
+    for q in ('a', 'b', 'a', 'c'):
+        client.get(f'/value?q={q}')
+    assert state['calls'] == 3
+    client.get('/value?q=a')
+    assert state['calls'] == 3
+    client.get('/value?q=b')
+    assert state['calls'] == 4
@@ -0,0 +1,52 @@
+import pytest
+
+from utils.rolling_stats import RollingStats
+
+
+def expected_stats(frame, currency, window):
+    series = frame[currency].iloc[-window:]
+    return {
+        'count': len(series),
+        'mean': series.mean(),
+        'std': series.std(),
+        'min': series.min(),
+        'max': series.max(),
+        'change': series.iloc[-1] - series.iloc[0],
+        'change_pct': (series.iloc[-1] - series.iloc[0]) / series.iloc[0] * 100
+    }
+
+
+def assert_stats_match(stats, frame):
+    for currency in frame.columns:
+        for window in (7, 30, 90):
+            actual = stats.stats(currency, window)
+            for key, value in expected_stats(frame, currency, window).items():
+                assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9 * frame[currency].abs().max())
+
+
+def test_matches_pandas_on_daily_prices(daily):
+    frame = daily.drop(columns='Date')
+    stats = RollingStats(frame.to_numpy(), frame.columns, windows=(7, 30, 90))
+    assert_stats_match(stats, frame)
+
+
+def test_extend_matches_pandas_after_many_appends(walk):
+    _, frame = walk
+    # VND-scale prices, where a plain sum of squares would cancel
+    frame = frame * 1e4
+    stats = RollingStats(frame.iloc[:300].to_numpy(), frame.columns, windows=(7, 30, 90))
+    for start in range(300, len(frame), 37):
+        stats.extend(frame.iloc[start:start + 37].to_numpy())
+    assert stats.rows == len(frame)
+    assert_stats_match(stats, frame)
+
+
+def test_windows_built_on_demand_and_limits(walk):
+    _, frame = walk
+    stats = RollingStats(frame.to_numpy(), frame.columns, windows=(7,), max_window=400)
+    assert stats.stats('EUR', 250)['mean'] == pytest.approx(frame['EUR'].iloc[-250:].mean())
+    assert stats.latest('GBP', age=2) == frame['GBP'].iloc[-3]
+    with pytest.raises(ValueError):
+        stats.stats('EUR', 401)
+    with pytest.raises(KeyError):
+        stats.stats('XXX', 7)
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.correlation import CorrelationTable
+from utils.features import StockFeatureTable, load_stock_history
+from utils.shared_data import ColumnBlock, attach_datasets, publish_datasets, write_block
+from utils.timeseries_store import RESOLUTIONS, TimeSeriesStore
+
+WINDOWS = (5, 20)
+
+
+def write_daily(path, dates, mode='w'):
+    rng = np.random.default_rng(len(dates))
+    prices = 1500 + rng.normal(size=(len(dates), 2)).cumsum(axis=0)
+    with open(path, mode) as f:
+        if mode == 'w':
+            f.write('Date,USD,EUR\n')
+        f.writelines(f'{d.month}/{d.day}/{d.year},{usd:.2f},{eur:.2f}\n' for d, (usd, eur) in zip(dates, prices))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    write_daily(data_dir / 'Daily.csv', pd.bdate_range('2020-01-01', periods=120))
+    store = TimeSeriesStore(str(tmp_path / 'cache'), data_dirs=(str(data_dir),)).load()
+    correlation_table = CorrelationTable(*store.arrays('daily'), windows=WINDOWS)
+    stock_history = load_stock_history('dataset/goldstock v1.csv')
+    return data_dir, store, correlation_table, stock_history
+
+
+def test_block_round_trips_arrays_and_meta(tmp_path):
+    arrays = {
+        'c': np.arange(12, dtype=np.float64).reshape(3, 4),
+        'f': np.asfortranarray(np.arange(6, dtype=np.int64).reshape(2, 3)),
+        'dates': pd.bdate_range('2021-01-01', periods=5).to_numpy(),
+        'empty': np.empty((0, 3))
+    }
+    block = ColumnBlock(write_block(str(tmp_path / 'test.blk'), arrays, {'version': 'v1'}))
+    assert block.meta == {'version': 'v1'} and 'f' in block and 'missing' not in block
+    for name, array in arrays.items():
+        view = block[name]
+        np.testing.assert_array_equal(view, array)
+        assert view.dtype == array.dtype and not view.flags.writeable
+    assert block['f'].flags.f_contiguous
+
+
+def test_not_a_block_is_rejected(tmp_path):
+    path = tmp_path / 'other.blk'
+    path.write_bytes(b'NOTABLOCK' + bytes(64))
+    with pytest.raises(ValueError):
+        ColumnBlock(str(path))
+
+
+def test_attached_datasets_match_the_published_ones(datasets, tmp_path):
+    _, store, correlation_table, stock_history = datasets
+    cache_dir = str(tmp_path / 'cache')
+    path = publish_datasets(cache_dir, store, correlation_table, stock_history)
+    shared = attach_datasets(path, cache_dir)
+
+    attached = shared['store']
+    assert attached.version == store.version and attached.resolutions == store.resolutions
+    for resolution in RESOLUTIONS:
+        dates, values, columns = attached.arrays(resolution)
+        assert columns == store.currencies(resolution) and not values.flags.writeable
+        np.testing.assert_array_equal(dates, store.arrays(resolution)[0])
+        np.testing.assert_array_equal(values, store.arrays(resolution)[1])
+    for window in (None,) + WINDOWS:
+        np.testing.assert_array_equal(shared['correlation_table'].matrix(window=window),
+                                      correlation_table.matrix(window=window))
+    pd.testing.assert_frame_equal(shared['stock_history'], stock_history)
+    dates = stock_history['Date'].iloc[[0, 10, -1]] + pd.Timedelta(days=1)
+    np.testing.assert_array_equal(shared['feature_table'].lookup(dates),
+                                  StockFeatureTable(stock_history).lookup(dates))
+
+
+def test_publishing_a_new_version_removes_the_old_block(datasets, tmp_path):
+    data_dir, store, correlation_table, stock_history = datasets
+    cache_dir = str(tmp_path / 'cache')
+    old = publish_datasets(cache_dir, store, correlation_table, stock_history)
+    write_daily(data_dir / 'Daily.csv', pd.bdate_range('2020-01-01', periods=130))
+    assert store.refresh() == 0
+    new = publish_datasets(cache_dir, store, correlation_table, stock_history)
+    assert new != old and os.listdir(os.path.dirname(new)) == [os.path.basename(new)]
+
+
+def test_attached_data_refreshes_without_touching_the_block(datasets, tmp_path):
+    data_dir, store, correlation_table, stock_history = datasets
+    cache_dir = str(tmp_path / 'cache')
+    path = publish_datasets(cache_dir, store, correlation_table, stock_history)
+    shared = attach_datasets(path, cache_dir)
+    attached, table = shared['store'], shared['correlation_table']
+
+    write_daily(data_dir / 'Daily.csv', pd.bdate_range('2020-01-01', periods=135)[120:], mode='a')
+    start = attached.refresh()
+    assert start == 120
+    dates, values, _ = attached.arrays('daily')
+    table.extend(dates[start:], values[start:])
+
+    fresh = TimeSeriesStore(str(tmp_path / 'fresh'), data_dirs=(str(data_dir),)).load()
+    for resolution in RESOLUTIONS:
+        np.testing.assert_array_equal(attached.arrays(resolution)[1], fresh.arrays(resolution)[1])
+    expected = CorrelationTable(*fresh.arrays('daily'), windows=WINDOWS)
+    for window in (None,) + WINDOWS:
+        np.testing.assert_allclose(table.matrix(window=window), expected.matrix(window=window), atol=1e-9)
+    # The published block still holds the data it was written with
+    np.testing.assert_array_equal(attach_datasets(path, cache_dir)['store'].arrays('daily')[1],
+                                  store.arrays('daily')[1])
@@ -0,0 +1,93 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from utils.kernel import LinearKernel
+from utils.sweep import MAX_SWEEP_ROWS, axis_values, expand_grid, run_sweep
+
+FEATURES = ['USD_Lag1', 'USD_Lag2', 'USD_MA7', 'EUR']
+
+
+@pytest.fixture
+def kernel():
+    return LinearKernel([0.5, 0.3, 0.2, -1.0], 4.0, FEATURES)
+
+
+@pytest.mark.parametrize('spec', [
+    {'start': 0, 'stop': 1, 'step': 0.1},
+    {'start': 0, 'stop': 1, 'step': 0.3},
+    {'start': -2.5, 'stop': 7, 'step': 0.25},
+    {'start': 3, 'stop': 3}
+])
+def test_step_axis_matches_arange(spec):
+    step = spec.get('step', 1)
+    np.testing.assert_array_equal(axis_values(spec), np.arange(spec['start'], spec['stop'] + step / 2, step))
+
+
+def test_num_axis_matches_linspace():
+    np.testing.assert_array_equal(axis_values({'start': 1, 'stop': 2, 'num': 7}), np.linspace(1, 2, 7))
+
+
+@pytest.mark.parametrize('spec', [
+    {'start': 0, 'stop': 1e9, 'step': 0.001},
+    {'start': 0, 'stop': 1, 'num': MAX_SWEEP_ROWS + 1},
+    {'start': 0, 'stop': 1, 'num': 0},
+    {'start': 5, 'stop': 1, 'step': 1},
+    {'start': 0, 'stop': 1, 'step': 0},
+    {'start': 0, 'stop': float('inf'), 'step': 1},
+    {'values': []}
+])
+def test_bad_axis_is_rejected_before_allocating(spec):
+    with pytest.raises(ValueError):
+        axis_values(spec)
+
+
+def test_grid_matches_itertools_product(kernel):
+    base = np.array([10.0, 20.0, 30.0, 40.0])
+    axes = [{'name': 'USD', 'values': [1.0, 2.0], 'mode': 'scale'},
+            {'name': 'EUR', 'values': [-1.0, 0.0, 1.0], 'mode': 'shift'},
+            {'name': 'USD_Lag2', 'values': [5.0], 'mode': 'set'}]
+    X, _ = expand_grid(base, FEATURES, axes)
+
+    expected = []
+    for usd, eur, lag2 in itertools.product([1.0, 2.0], [-1.0, 0.0, 1.0], [5.0]):
+        row = base.copy()
+        row[:3] *= usd
+        row[3] += eur
+        row[1] = lag2
+        expected.append(row)
+    np.testing.assert_allclose(X.reshape(-1, len(FEATURES)), expected)
+
+
+def test_sweep_predictions_match_row_by_row(kernel):
+    base = dict(zip(FEATURES, [10.0, 20.0, 30.0, 40.0]))
+    axes = [{'name': 'EUR', 'start': 0, 'stop': 2, 'num': 5}]
+    result = run_sweep(kernel, base, axes)
+    expected = [kernel.predict(kernel.vector(dict(base, EUR=v))) for v in np.linspace(0, 2, 5)]
+    np.testing.assert_allclose(result['predictions'], expected)
+
+
+def test_noise_rows_are_bounded(kernel):
+    base = dict(zip(FEATURES, [10.0, 20.0, 30.0, 40.0]))
+    axes = [{'name': 'EUR', 'start': 0, 'stop': 1, 'num': 1000}]
+    with pytest.raises(ValueError):
+        run_sweep(kernel, base, axes, noise={'samples': MAX_SWEEP_ROWS})
+
+
+@pytest.mark.parametrize('body', [
+    {'axes': [{'name': 'USD', 'values': [1.0]}], 'base': [1, 2]},
+    {'axes': [{'name': 'USD', 'values': [1.0]}], 'noise': 0.1},
+    {'axes': [{'name': 'USD', 'start': 0, 'stop': 1e9, 'step': 0.001}]},
+    {'axes': 'USD'}
+])
+def test_route_rejects_invalid_specs(client, body):
+    response = client.post('/api/predict/sweep', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_route_scores_a_grid(client):
+    response = client.post('/api/predict/sweep', json={'axes': [{'name': 'USD', 'values': [0.9, 1.0, 1.1],
+                                                                  'mode': 'scale'}]})
+    assert response.status_code == 200
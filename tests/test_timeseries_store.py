@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.timeseries_store import RESOLUTIONS, TimeSeriesStore
+
+DATES = pd.bdate_range('2020-01-01', periods=260)
+PANDAS_PERIODS = {'week': 'W-FRI', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+
+def write_daily(path, dates, scale=1.0, mode='w'):
+    rows = [f'{d.month}/{d.day}/{d.year},{(1500 + i) * scale:.1f},{(1300 + 2 * i) * scale:.1f}\n'
+            for i, d in enumerate(dates, start=DATES.get_loc(dates[0]))]
+    with open(path, mode) as f:
+        if mode == 'w':
+            f.write('Date,USD,EUR\n')
+        f.writelines(rows)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'data'
+    path.mkdir()
+    return path
+
+
+def open_store(data_dir, cache_dir):
+    return TimeSeriesStore(str(cache_dir), data_dirs=(str(data_dir),)).load()
+
+
+def assert_same_store(store, expected):
+    assert store.resolutions == expected.resolutions
+    for resolution in RESOLUTIONS:
+        dates, values, columns = store.arrays(resolution)
+        expected_dates, expected_values, expected_columns = expected.arrays(resolution)
+        assert columns == expected_columns
+        np.testing.assert_array_equal(dates, expected_dates)
+        np.testing.assert_allclose(values, expected_values, rtol=1e-12)
+
+
+def test_derived_resolutions_match_pandas(data_dir, tmp_path):
+    write_daily(data_dir / 'Daily.csv', DATES)
+    store = open_store(data_dir, tmp_path / 'cache')
+    daily = store.frame('daily')
+    assert store.sources['monthly_avg'] == 'derived'
+    for resolution, (_, period, how) in RESOLUTIONS.items():
+        if period is None:
+            continue
+        groups = daily.groupby(daily['Date'].dt.to_period(PANDAS_PERIODS[period]))
+        expected = groups.agg({'Date': 'last', 'USD': how, 'EUR': how}).reset_index(drop=True)
+        pd.testing.assert_frame_equal(store.frame(resolution), expected, check_dtype=False)
+
+
+def test_append_refresh_matches_a_fresh_load(data_dir, tmp_path):
+    write_daily(data_dir / 'Daily.csv', DATES[:200])
+    # A coarser file that ends early keeps its own rows and is extended from daily data
+    (data_dir / 'Monthly_EoP.csv').write_text('Date,USD,EUR\n1/31/2020,1.0,2.0\n2/28/2020,3.0,4.0\n')
+    store = open_store(data_dir, tmp_path / 'cache')
+
+    write_daily(data_dir / 'Daily.csv', DATES[200:], mode='a')
+    assert store.refresh() == 200
+    assert store.refresh() is None
+    assert_same_store(store, open_store(data_dir, tmp_path / 'fresh'))
+    assert store.get('monthly_eop', 'USD', end='2020-02-28')[1].tolist() == [1.0, 3.0]
+
+
+def test_rewrite_reloads_and_rederives_everything(data_dir, tmp_path):
+    write_daily(data_dir / 'Daily.csv', DATES[:200])
+    store = open_store(data_dir, tmp_path / 'cache')
+    old_version = store.version
+
+    write_daily(data_dir / 'Daily.csv', DATES[:200], scale=2.0)
+    # Same dates, new values: only the reload notices, an append would keep the stale periods
+    assert store.refresh() == 0
+    fresh = open_store(data_dir, tmp_path / 'fresh')
+    assert_same_store(store, fresh)
+    assert store.version == fresh.version != old_version
+
+
+def test_window_lookup(data_dir, tmp_path):
+    write_daily(data_dir / 'Daily.csv', DATES)
+    store = open_store(data_dir, tmp_path / 'cache')
+    lo, hi = store.bounds('daily', '2020-01-04', '2020-01-10')
+    assert (lo, hi) == (3, 8)
+    dates, values = store.get('daily', 'EUR', '2020-01-04', '2020-01-10')
+    assert list(dates) == list(DATES[3:8].values)
+    assert values.tolist() == [1306.0, 1308.0, 1310.0, 1312.0, 1314.0]
+    assert store.bounds('daily', '2021-06-01', '2021-01-01') == (len(DATES), len(DATES))
+    with pytest.raises(KeyError):
+        store.get('daily', 'XYZ')
+    with pytest.raises(KeyError):
+        store.get('hourly', 'USD')
@@ -0,0 +1,62 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from utils.features import CLOSE_FEATURES
+from utils.model_registry import ModelRegistry
+from utils.training import TARGETS, search_models, train_target, write_version
+
+
+def test_candidates_are_ranked_by_cross_validation_not_the_holdout():
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(300, 6))
+    y = X @ rng.normal(size=6) + rng.normal(0, 0.5, 300)
+    # A holdout unrelated to the features must not change the ranking
+    X_test, y_test = rng.normal(size=(60, 6)), rng.normal(size=60)
+    _, comparison = search_models(X, y, X_test, y_test, n_splits=3, n_jobs=1)
+    _, shuffled = search_models(X, y, X_test, rng.permutation(y_test), n_splits=3, n_jobs=1)
+    assert comparison['CV_Score_Mean'].is_monotonic_decreasing
+    assert list(comparison['Model']) == list(shuffled['Model'])
+
+
+def test_stock_target_is_trained_without_close_features():
+    artifacts, comparison, summary = train_target('stock', n_splits=3, n_jobs=1)
+    assert not set(CLOSE_FEATURES) & set(summary['feature_names'])
+    assert summary['model_name'] == comparison.iloc[0]['Model']
+    assert summary['cv_r2'] == comparison['CV_Score_Mean'].max()
+    assert summary['test_rmse'] > 1
+
+
+def test_single_target_versions_load_on_their_own(legacy_models, shipped_results):
+    models_dir = legacy_models
+
+    # Only the stock model is retrained; the Ridge model comes from the legacy files
+    first = write_version({'stock': train_target('stock', n_splits=3, n_jobs=1)}, models_dir, version='v1',
+                          publish=False)
+    assert first['targets']['ridge']['carried_from'] == 'legacy'
+    registry = ModelRegistry(models_dir)
+    assert registry.load(), registry.last_error
+    assert registry.version == 'v1'
+
+    # Then only the Ridge model; the stock model comes from v1
+    second = write_version({'ridge': shipped_results('ridge')}, models_dir, version='v2', publish=False)
+    assert second['targets']['stock']['carried_from'] == 'v1'
+    assert second['targets']['stock']['files'] == first['targets']['stock']['files']
+    assert ModelRegistry(models_dir).load()
+    assert registry.refresh() and registry.version == 'v2'
+
+
+def test_carry_over_needs_the_current_artifacts(legacy_models, shipped_results):
+    models_dir = legacy_models
+    os.remove(os.path.join(models_dir, TARGETS['ridge']['model']))
+    with pytest.raises(FileNotFoundError):
+        write_version({'stock': shipped_results('stock')}, models_dir, version='v1', publish=False)
+
+
+def test_ridge_features_come_from_the_given_models_dir(tmp_path):
+    features = ['EUR', 'GBP', 'USD_lag_1', 'USD_MA_7']
+    joblib.dump(features, tmp_path / TARGETS['ridge']['features'])
+    _, _, summary = train_target('ridge', n_splits=3, n_jobs=1, models_dir=str(tmp_path))
+    assert summary['feature_names'] == features
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from utils.uploads import UploadJobs, encode_results, score_csv, spool_upload
+
+HEADER = 'Date,Open,High,Low,Volume\n'
+ROWS = [f'2023-01-{day:02d},{1800 + day},{1810 + day},{1790 + day},1000\n' for day in range(2, 22)]
+
+
+@pytest.fixture
+def upload_dir(app_module, tmp_path, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, 'upload_jobs', UploadJobs(str(tmp_path / 'jobs')))
+    return tmp_path
+
+
+def spooled(folder, text):
+    return spool_upload(io.BytesIO(text.encode()), str(folder), block_size=16)
+
+
+def test_chunked_scoring_matches_one_batch(app_module, tmp_path):
+    predictor = app_module.registry.active.predictor
+    path = spooled(tmp_path, HEADER + ''.join(ROWS))
+    with open(path) as f:
+        assert f.read() == HEADER + ''.join(ROWS)
+
+    frames = list(score_csv(predictor, path, 0.95, chunk_rows=6))
+    assert [len(frame) for frame in frames] == [6, 6, 6, 2]
+    result = pd.concat(frames, ignore_index=True)
+    expected = predictor.score_frame(pd.read_csv(path), 0.95)
+    assert result['row'].tolist() == list(range(len(ROWS)))
+    pd.testing.assert_frame_equal(result.drop(columns=['row', 'Date']), expected)
+
+
+def test_malformed_later_chunk_ends_with_an_error_row(app_module, tmp_path):
+    # The C parser only reports a ragged row once it tokenizes that part of a large file
+    rows = ROWS * 1000
+    rows.insert(15000, '2023-01-06,1800,1810,1790,1000,5,6\n')
+    path = spooled(tmp_path, HEADER + ''.join(rows))
+    frames = list(score_csv(app_module.registry.active.predictor, path, 0.95))
+    records = [json.loads(line) for line in b''.join(encode_results(frames[-1:], 'ndjson')).decode().splitlines()]
+    assert len(frames) == 2 and (frames[0]['status'] == 'success').all()
+    assert records == [{'row': 10000, 'Date': None, 'status': 'error', 'predicted_price': None, 'lower': None,
+                        'upper': None, 'error': records[0]['error']}]
+    assert 'Could not parse' in records[0]['error']
+
+
+def test_stream_rejects_a_malformed_file_before_streaming(client, upload_dir):
+    body = HEADER + ROWS[0] + '2023-01-06,1800,1810,1790,1000,5,6\n'
+    response = client.post('/api/predict-stock/upload', data=body, content_type='text/csv')
+    assert response.status_code == 400
+    assert 'Could not parse' in response.get_json()['error']
+    assert os.listdir(upload_dir / 'uploads') == []
+
+
+def test_stream_returns_csv_predictions(client, upload_dir):
+    response = client.post('/api/predict-stock/upload', data=HEADER + ''.join(ROWS), content_type='text/csv')
+    assert response.status_code == 200
+    result = pd.read_csv(io.BytesIO(response.get_data()))
+    assert len(result) == len(ROWS) and (result['status'] == 'success').all()
+
+
+def test_bad_level_is_rejected(client, upload_dir):
+    response = client.post('/api/predict-stock/upload?level=abc', data=HEADER + ROWS[0], content_type='text/csv')
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('level must be one of')
+
+
+def test_job_round_trip(client, upload_dir):
+    response = client.post('/api/predict-stock/upload?mode=job&format=ndjson', data=HEADER + ''.join(ROWS),
+                           content_type='text/csv')
+    assert response.status_code == 202
+    status_url = response.get_json()['status_url']
+
+    deadline = time.monotonic() + 10
+    status = client.get(status_url).get_json()
+    while status['status'] in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(0.01)
+        status = client.get(status_url).get_json()
+    assert status['status'] == 'done'
+    assert (status['rows'], status['succeeded'], status['failed']) == (len(ROWS), len(ROWS), 0)
+
+    lines = client.get(status['result_url']).get_data().decode().splitlines()
+    assert len(lines) == len(ROWS)
+    assert client.get('/api/predict-stock/upload/' + '0' * 32).status_code == 404
+
+
+def test_raw_body_over_the_cap_is_413(client, upload_dir, app_module, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_STREAM_MAX_LENGTH', 64)
+    response = client.post('/api/predict-stock/upload', data=HEADER + ''.join(ROWS), content_type='text/csv')
+    assert response.status_code == 413
+    assert not (upload_dir / 'uploads').exists() or os.listdir(upload_dir / 'uploads') == []
+
+
+def test_prune_removes_expired_job_files(tmp_path):
+    jobs = UploadJobs(str(tmp_path), ttl=60)
+    old, fresh = tmp_path / f'{"a" * 32}.json', tmp_path / f'{"b" * 32}.json'
+    old.write_text('{}')
+    fresh.write_text('{}')
+    os.utime(old, (time.time() - 120,) * 2)
+    jobs.prune()
+    assert not old.exists() and fresh.exists()
@@ -0,0 +1,68 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from utils import visualizer
+from utils.response_cache import payload_response
+
+
+@pytest.fixture
+def history():
+    dates = pd.bdate_range('2021-01-01', periods=40)
+    prices = pd.Series(range(40), dtype=float) + 100
+    visualizer.clear_chart_cache()
+    yield pd.DataFrame({'Date': dates, 'Open': prices, 'High': prices + 1, 'Low': prices - 1, 'Close': prices})
+    visualizer.clear_chart_cache()
+
+
+def test_price_chart_window_matches_filtered_frame(history):
+    payload = visualizer.render_price_chart(history, 'v1', '2021-01-11', '2021-01-22')
+    dates = json.loads(payload.body)['data'][0]['x']
+    expected = history[(history['Date'] >= '2021-01-11') & (history['Date'] <= '2021-01-22')]['Date']
+    assert [pd.Timestamp(d) for d in dates] == list(expected)
+
+
+def test_versioned_price_chart_skips_frame_hash(history, monkeypatch):
+    first = visualizer.render_price_chart(history, 'v1')
+
+    def fail(df):
+        raise AssertionError('frame hashed on a versioned request')
+
+    monkeypatch.setattr(visualizer, 'frame_digest', fail)
+    assert visualizer.render_price_chart(history, 'v1') is first
+    assert visualizer.render_price_chart(history, 'v2') is not first
+
+
+def test_payload_response_negotiates_encoding(history):
+    payload = visualizer.render_price_chart(history, 'v1')
+    app = Flask(__name__)
+    cases = [('identity', None, payload.body), ('gzip', 'gzip', payload.gzip)]
+    if payload.brotli is not None:
+        cases.append(('gzip, br', 'br', payload.brotli))
+    for accept, encoding, body in cases:
+        with app.test_request_context(headers={'Accept-Encoding': accept}):
+            response = payload_response(payload)
+            assert response.headers.get('Content-Encoding') == encoding
+            assert response.get_data() == body
+    assert gzip.decompress(payload.gzip) == payload.body
+
+
+def test_brotli_copy_round_trips(history):
+    brotli = pytest.importorskip('brotli')
+    payload = visualizer.render_price_chart(history, 'v1')
+    assert brotli.decompress(payload.brotli) == payload.body
+
+
+def test_orjson_path_matches_the_plotly_encoder(history, monkeypatch):
+    pytest.importorskip('orjson')
+    figure = visualizer.build_price_figure(history)['price_chart']
+    fast = json.loads(visualizer.figure_json(figure))
+    monkeypatch.setattr(visualizer, 'orjson', None)
+    slow = json.loads(visualizer.figure_json(figure))
+    # The encoders write the same timestamps with different sub-second precision
+    for trace in fast['data'] + slow['data']:
+        trace['x'] = pd.to_datetime(trace['x']).tolist()
+    assert fast == slow
@@ -3,6 +3,13 @@ Utility modules for Gold Stock Prediction
 """
 
 from .predictor import GoldStockPredictor
-from .visualizer import create_visualizations, create_price_visualization
 
-__all__ = ['GoldStockPredictor', 'create_visualizations', 'create_price_visualization']
\ No newline at end of file
+__all__ = ['GoldStockPredictor', 'create_visualizations', 'create_price_visualization']
+
+
+def __getattr__(name):
+    # Plotly is only imported once a visualization is actually requested
+    if name in ('create_visualizations', 'create_price_visualization'):
+        from . import visualizer
+        return getattr(visualizer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,207 @@
+"""
+Vectorized walk-forward backtesting of the shipped models
+
+Run from the repository root to refresh models/backtest_results.json:
+
+    python -m utils.backtest --splits 5
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from .features import add_stock_features, load_stock_history, ridge_feature_matrix
+from .instrumentation import configure_logging, get_logger
+from .intervals import INTERVAL_LEVELS, conformal_quantiles
+
+RESULTS_PATH = 'models/backtest_results.json'
+
+_results_cache = {}
+
+logger = get_logger('backtest')
+
+
+def regression_metrics(y_true, y_pred):
+    """Return RMSE, MAE, MAPE (%) and R² for one block of predictions"""
+    errors = y_pred - y_true
+    ss_res = float(np.sum(errors ** 2))
+    ss_tot = float(np.sum((y_true - y_true.mean()) ** 2))
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mape': float(np.mean(np.abs(errors / y_true)) * 100),
+        'r2': 1 - ss_res / ss_tot if ss_tot > 0 else float('nan')
+    }
+
+
+def walk_forward_splits(n_rows, n_splits):
+    """Yield expanding-window (train_end, test_end) row bounds"""
+    block = n_rows // (n_splits + 1)
+    for i in range(1, n_splits + 1):
+        test_end = n_rows if i == n_splits else (i + 1) * block
+        yield i * block, test_end
+
+
+def make_estimator(spec):
+    """Build an unfitted estimator from a (kind, params, scaled) spec"""
+    from sklearn.linear_model import Lasso, LinearRegression, Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    kind, params, scaled = spec
+    model = {'ridge': Ridge, 'lasso': Lasso, 'linear': LinearRegression}[kind](**params)
+    return make_pipeline(StandardScaler(), model) if scaled else model
+
+
+def _run_split(args):
+    """Fit a fresh estimator on one split and score its test block"""
+    spec, X, y, train_end, test_end = args
+    model = make_estimator(spec)
+    model.fit(X[:train_end], y[:train_end])
+    predictions = model.predict(X[train_end:test_end])
+    y_test = y[train_end:test_end]
+
+    result = regression_metrics(y_test, predictions)
+    result.update({'training_samples': int(train_end), 'test_samples': int(test_end - train_end)})
+    return result, y_test, predictions
+
+
+def backtest(name, spec, X, y, dates, n_splits=5, max_workers=None):
+    """Walk-forward backtest of one estimator spec, one process per split"""
+    bounds = list(walk_forward_splits(len(y), n_splits))
+    jobs = [(spec, X, y, train_end, test_end) for train_end, test_end in bounds]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = list(executor.map(_run_split, jobs))
+
+    splits = []
+    for (train_end, test_end), (metrics, _, _) in zip(bounds, outcomes):
+        metrics['test_start'] = str(np.datetime_as_string(dates[train_end], unit='D'))
+        metrics['test_end'] = str(np.datetime_as_string(dates[test_end - 1], unit='D'))
+        splits.append(metrics)
+
+    # Summary metrics pool every out-of-sample prediction across the splits
+    y_test = np.concatenate([y_block for _, y_block, _ in outcomes])
+    predictions = np.concatenate([p_block for _, _, p_block in outcomes])
+    residuals = y_test - predictions
+    summary = regression_metrics(y_test, predictions)
+    summary.update({
+        'training_samples': splits[-1]['training_samples'],
+        'test_samples': splits[-1]['test_samples']
+    })
+
+    # Intervals are calibrated on the last split, the one closest to the deployed model
+    _, y_last, predictions_last = outcomes[-1]
+    intervals = {
+        'method': 'split_conformal_relative',
+        'levels': list(INTERVAL_LEVELS),
+        'quantiles': conformal_quantiles(y_last, predictions_last).tolist(),
+        'samples': int(len(y_last)),
+        'calibration_start': splits[-1]['test_start']
+    }
+    return {'model': name, 'summary': summary, 'splits': splits, 'intervals': intervals}, residuals
+
+
+def ridge_dataset(cache_dir='cache', feature_names=None):
+    """Ridge features and USD target from the daily data"""
+    from .timeseries_store import TimeSeriesStore
+
+    if feature_names is None:
+        feature_names = joblib.load('models/features_ridge_regression.pkl')
+    dates, values, columns = TimeSeriesStore(cache_dir).load().arrays('daily')
+    X, y, dates = ridge_feature_matrix(dates, values, columns, feature_names)
+    return X, y, np.asarray(dates).view('datetime64[ns]')
+
+
+def stock_dataset(history_path='dataset/goldstock v1.csv', feature_names=None):
+    """Stock-model features and Close target from the OHLCV history
+
+    Features are built as serving builds them, without the day's Close, so
+    the Close-derived columns cannot leak the target into a fit or a score.
+    """
+    if feature_names is None:
+        with open('models/feature_names.txt', 'r') as f:
+            feature_names = [line.strip() for line in f.readlines()]
+    data = add_stock_features(load_stock_history(history_path), close_known=False).dropna()
+    X = data[feature_names].to_numpy(dtype=np.float64)
+    y = data['Close'].to_numpy(dtype=np.float64)
+    return X, y, data['Date'].to_numpy(dtype='datetime64[ns]')
+
+
+def estimator_spec(model, scaled):
+    """Return the (kind, params, scaled) spec matching a fitted estimator"""
+    kind = {'Ridge': 'ridge', 'Lasso': 'lasso'}.get(type(model).__name__, 'linear')
+    params = {} if kind == 'linear' else {'alpha': float(model.alpha)}
+    if kind == 'lasso':
+        params['max_iter'] = int(model.max_iter)
+    return kind, params, scaled
+
+
+def run_backtests(n_splits=5, max_workers=None, cache_dir='cache'):
+    """Backtest both shipped model configurations over their full history"""
+    ridge = joblib.load('models/gold_price_prediction_ridge_regression.pkl')
+
+    results = {}
+    residuals = {}
+    datasets = {
+        # The Ridge model is trained on raw features; the stock model behind a scaler
+        'ridge_regression': ('Ridge Regression', estimator_spec(ridge, False), ridge_dataset(cache_dir)),
+        'linear_regression': ('Linear Regression', ('linear', {}, True), stock_dataset())
+    }
+    for key, (name, spec, (X, y, dates)) in datasets.items():
+        logger.info("Backtesting %s over %d rows in %d walk-forward splits...", name, len(y), n_splits)
+        results[key], residuals[key] = backtest(name, spec, X, y, dates, n_splits, max_workers)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'n_splits': n_splits,
+        'models': results
+    }, residuals
+
+
+def save_results(results, path=RESULTS_PATH):
+    """Write backtest results atomically"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_results(path=RESULTS_PATH):
+    """Return the saved backtest results, re-reading only when the file changes"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _results_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r') as f:
+        results = json.load(f)
+    _results_cache[path] = (mtime, results)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the shipped models')
+    parser.add_argument('--splits', type=int, default=5, help='number of walk-forward splits')
+    parser.add_argument('--workers', type=int, help='process pool size (default: all cores)')
+    parser.add_argument('--output', default=RESULTS_PATH, help='results JSON path')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    results, _ = run_backtests(args.splits, args.workers)
+    save_results(results, args.output)
+    for model in results['models'].values():
+        s = model['summary']
+        print(f"{model['model']}: RMSE {s['rmse']:.2f}  MAE {s['mae']:.2f}  MAPE {s['mape']:.3f}%  R² {s['r2']:.4f}")
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Micro-batching of concurrent single-row predictions
+
+Requests that arrive within a short window are stacked into one matrix and
+scored with a single call, then each caller gets its own row back.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .instrumentation import histogram
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.002
+
+# Seconds a caller waits for its result before giving up
+RESULT_TIMEOUT = 10.0
+
+# The scoring thread exits after this long without work and restarts on demand
+IDLE_TIMEOUT = 30.0
+
+BATCH_SIZE = histogram('gold_batch_size', 'Rows scored per micro-batch', ('batcher',),
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+QUEUE_WAIT = histogram('gold_batch_queue_wait_seconds', 'Time a row waited in the micro-batch queue',
+                       ('batcher',))
+
+
+class MicroBatcher:
+    """Coalesce single feature vectors into matrix calls of ``score``
+
+    ``score`` takes a (rows, features) matrix and returns one prediction
+    per row. A background thread takes the first queued row and, while
+    other submitted rows are still outstanding, keeps collecting until
+    ``max_wait`` seconds have passed since it arrived or ``max_batch`` rows
+    are waiting; then it scores them together. A lone row is scored at
+    once, so a worker serving one request at a time never waits.
+    """
+
+    def __init__(self, score, name, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+        if max_batch < 1 or max_wait < 0:
+            raise ValueError('max_batch must be at least 1 and max_wait non-negative')
+        self.score = score
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        # Rows submitted whose results have not been delivered yet
+        self._pending = 0
+
+    def _enqueue(self, vector):
+        future = Future()
+        with self._lock:
+            self._pending += 1
+            self._queue.put((np.asarray(vector, dtype=np.float64), future, time.perf_counter()))
+            # Started lazily so a forked worker gets its own thread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f'batcher-{self.name}', daemon=True)
+                self._thread.start()
+        return future
+
+    def submit(self, vector, timeout=RESULT_TIMEOUT):
+        """Score one feature vector, waiting for the batch it lands in"""
+        return self._enqueue(vector).result(timeout)
+
+    def _collect(self):
+        """Return the next batch, or None once the thread has been idle too long"""
+        try:
+            first = self._queue.get(timeout=IDLE_TIMEOUT)
+        except queue.Empty:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        # Waiting only pays off while rows other than the collected ones are outstanding
+        while len(batch) < self.max_batch and self._pending > len(batch):
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                with self._lock:
+                    # A row queued while timing out must not be stranded
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            started = time.perf_counter()
+            for _, _, queued in batch:
+                QUEUE_WAIT.observe(started - queued, self.name)
+            BATCH_SIZE.observe(len(batch), self.name)
+            try:
+                predictions = np.asarray(self.score(np.vstack([vector for vector, _, _ in batch])))
+            except Exception as e:
+                self._resolve(batch, error=e)
+                continue
+            self._resolve(batch, predictions.tolist())
+
+    def _resolve(self, batch, predictions=None, error=None):
+        with self._lock:
+            self._pending -= len(batch)
+        for i, (_, future, _) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(predictions[i])
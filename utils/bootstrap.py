@@ -0,0 +1,92 @@
+"""
+Concurrent start-up of the application's models and datasets
+"""
+
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrumentation import get_logger
+
+logger = get_logger('bootstrap')
+
+
+class Initializer:
+    """Loads named components in a thread pool and tracks their readiness
+
+    Each component is a callable; returning False or raising marks it as
+    failed. Modules listed in ``imports`` are imported once in the
+    background before the loaders fan out, because unpickling models in
+    parallel threads would otherwise race on the same package imports.
+    ``start`` is idempotent, so it can be called from the app factory and
+    again lazily from a request hook.
+    """
+
+    def __init__(self, imports=(), max_workers=4):
+        self.imports = tuple(imports)
+        self.max_workers = max_workers
+        self._loaders = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self.started_at = None
+
+    def register(self, name, loader):
+        """Add a component loader"""
+        self._loaders[name] = loader
+        self._status[name] = {'status': 'pending', 'seconds': None, 'error': None}
+
+    def start(self):
+        """Begin loading every registered component in the background"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._load_all, name='init', daemon=True)
+            self._thread.start()
+            return True
+
+    def _load_all(self):
+        try:
+            if self.imports:
+                self._status['imports'] = {'status': 'loading', 'seconds': None, 'error': None}
+                self._run('imports', lambda: [importlib.import_module(m) for m in self.imports])
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='init') as executor:
+                list(executor.map(lambda item: self._run(*item), self._loaders.items()))
+        finally:
+            self._done.set()
+
+    def _run(self, name, loader):
+        self._status[name]['status'] = 'loading'
+        started = time.perf_counter()
+        try:
+            ok = loader() is not False
+            error = None if ok else 'loader reported failure'
+        except Exception as e:
+            ok, error = False, str(e)
+        self._status[name].update({
+            'status': 'ready' if ok else 'failed',
+            'seconds': round(time.perf_counter() - started, 4),
+            'error': error
+        })
+        logger.info("Component '%s' %s in %ss", name, self._status[name]['status'], self._status[name]['seconds'])
+
+    def wait(self, timeout=None):
+        """Block until every component has finished loading"""
+        self._done.wait(timeout)
+        return self.ready
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    @property
+    def ready(self):
+        return self._done.is_set() and all(s['status'] == 'ready' for s in self._status.values())
+
+    def status(self):
+        """Return a snapshot of per-component status and load timings"""
+        return {name: dict(status) for name, status in self._status.items()}
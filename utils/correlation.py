@@ -0,0 +1,196 @@
+"""
+Precomputed full-history and rolling correlations between currency columns
+"""
+
+import numpy as np
+
+DEFAULT_WINDOWS = (30, 90, 365)
+
+# Windows whose sum of squared deviations falls below this fraction of the
+# column's total are treated as flat (forward-filled) and reported as NaN
+FLAT_TOLERANCE = 1e-12
+
+
+class CorrelationTable:
+    """Pairwise correlations derived from one pass of cumulative sums
+
+    Columns are centred, then cumulative sums of every column and of every
+    upper-triangle pairwise product are taken once. The full-history matrix
+    comes from the final row of those sums and each rolling window from the
+    difference of two rows, so no per-pair ``.corr()`` call is ever made.
+    Only the last ``max(windows)`` rows of the sums are kept, which lets
+    ``extend`` add new rows in time proportional to their number.
+    """
+
+    def __init__(self, dates, values, columns, windows=DEFAULT_WINDOWS):
+        self._setup(columns, windows)
+        k = len(self.columns)
+
+        # Correlations are shift-invariant, so the centring offset stays
+        # fixed once chosen and later rows are centred on the same means
+        values = np.asarray(values, dtype=np.float64)
+        self._offset = values.mean(axis=0)
+
+        # Leading zero row so window sums are a plain difference of two rows
+        self._n = 0
+        self._sums = np.zeros((1, k))
+        self._products = np.zeros((1, len(self._left)))
+        self._dates = np.empty(0, dtype='datetime64[ns]')
+        self._rolling = {w: np.empty((0, len(self._left)), dtype=np.float32) for w in self.windows if w >= 2}
+        self._rolling_size = dict.fromkeys(self._rolling, 0)
+        self._dates_size = 0
+        self.extend(dates, values)
+
+    def _setup(self, columns, windows):
+        self.columns = list(columns)
+        self.windows = tuple(int(w) for w in windows)
+        self._col_index = {col: i for i, col in enumerate(self.columns)}
+
+        k = len(self.columns)
+        self._left, self._right = np.triu_indices(k)
+        self._pair_index = {}
+        for p, (i, j) in enumerate(zip(self._left, self._right)):
+            self._pair_index[(i, j)] = p
+            self._pair_index[(j, i)] = p
+        self._diag = np.array([self._pair_index[(i, i)] for i in range(k)])
+
+    def to_block(self, prefix='correlation'):
+        """Return (arrays, meta) holding the table's state, for a shared data block"""
+        arrays = {
+            f'{prefix}/offset': self._offset,
+            f'{prefix}/sums': self._sums,
+            f'{prefix}/products': self._products,
+            f'{prefix}/full': self._full,
+            f'{prefix}/dates': self._dates[:self._dates_size]
+        }
+        for w, size in self._rolling_size.items():
+            arrays[f'{prefix}/rolling/{w}'] = self._rolling[w][:size]
+        return arrays, {'columns': self.columns, 'windows': list(self.windows), 'n': self._n}
+
+    @classmethod
+    def from_block(cls, block, prefix='correlation'):
+        """Rebuild a table whose arrays are read-only views into a shared block
+
+        The views are never written: ``extend`` copies a buffer into a
+        private one the first time it grows it.
+        """
+        meta = block.meta[prefix]
+        table = cls.__new__(cls)
+        table._setup(meta['columns'], meta['windows'])
+        table._offset = block[f'{prefix}/offset']
+        table._sums = block[f'{prefix}/sums']
+        table._products = block[f'{prefix}/products']
+        table._full = block[f'{prefix}/full']
+        table._dates = block[f'{prefix}/dates']
+        table._dates_size = len(table._dates)
+        table._rolling = {w: block[f'{prefix}/rolling/{w}'] for w in table.windows if w >= 2}
+        table._rolling_size = {w: len(rolled) for w, rolled in table._rolling.items()}
+        table._n = meta['n']
+        return table
+
+    def _correlate(self, sx, sxy, n, tolerance):
+        left, right, diag = self._left, self._right, self._diag
+        cov = sxy - sx[..., left] * sx[..., right] / n
+        var = cov[..., diag]
+        var = np.where(var > tolerance, var, np.nan)
+        with np.errstate(invalid='ignore'):
+            return cov / np.sqrt(var[..., left] * var[..., right])
+
+    @staticmethod
+    def _append(buffer, size, rows):
+        """Append rows into a buffer with geometric growth; returns (buffer, size)"""
+        needed = size + len(rows)
+        if needed > len(buffer):
+            grown = np.empty((max(needed, 2 * len(buffer)),) + buffer.shape[1:], dtype=buffer.dtype)
+            grown[:size] = buffer[:size]
+            buffer = grown
+        buffer[size:needed] = rows
+        return buffer, needed
+
+    def extend(self, dates, values):
+        """Add rows after the last one, updating every correlation"""
+        x = np.asarray(values, dtype=np.float64) - self._offset
+        m = len(x)
+        if m == 0:
+            return self
+        left, right = self._left, self._right
+
+        sums = np.empty((len(self._sums) + m, x.shape[1]))
+        sums[:len(self._sums)] = self._sums
+        np.cumsum(x, axis=0, out=sums[len(self._sums):])
+        sums[len(self._sums):] += self._sums[-1]
+        products = np.empty((len(self._products) + m, len(left)))
+        products[:len(self._products)] = self._products
+        np.cumsum(x[:, left] * x[:, right], axis=0, out=products[len(self._products):])
+        products[len(self._products):] += self._products[-1]
+
+        n = self._n + m
+        tolerance = FLAT_TOLERANCE * np.abs(products[-1, self._diag])
+        full = self._correlate(sums[-1], products[-1], n, tolerance)
+        k = len(self.columns)
+        matrix = np.empty((k, k))
+        matrix[left, right] = full
+        matrix[right, left] = full
+
+        # Rolling windows ending at each new row; sums[0] is row self._n - (len(sums) - m - 1)
+        base = self._n - (len(self._sums) - 1)
+        for w in self._rolling:
+            first = max(w, self._n + 1)
+            if first > n:
+                continue
+            ends = np.arange(first, n + 1) - base
+            rolled = self._correlate(sums[ends] - sums[ends - w], products[ends] - products[ends - w], w, tolerance)
+            self._rolling[w], self._rolling_size[w] = self._append(
+                self._rolling[w], self._rolling_size[w], rolled.astype(np.float32))
+
+        self._dates, self._dates_size = self._append(
+            self._dates, self._dates_size, np.asarray(dates).view('datetime64[ns]'))
+        keep = max(self._rolling, default=0) + 1
+        self._sums = sums[-keep:].copy()
+        self._products = products[-keep:].copy()
+        self._n = n
+        self._full = matrix
+        return self
+
+    def _index(self, currency):
+        try:
+            return self._col_index[currency]
+        except KeyError:
+            raise KeyError(f"Unknown currency: {currency}") from None
+
+    def _check_window(self, window):
+        available = [w for w, size in self._rolling_size.items() if size]
+        if window not in available:
+            raise KeyError(f"Window must be one of {sorted(available)}")
+        return window
+
+    def _latest(self, window):
+        return self._rolling[window][self._rolling_size[window] - 1]
+
+    def matrix(self, currencies=None, window=None):
+        """Return the correlation matrix, full-history or latest rolling window"""
+        currencies = currencies or self.columns
+        idx = [self._index(c) for c in currencies]
+        if window is None:
+            return self._full[np.ix_(idx, idx)]
+
+        latest = self._latest(self._check_window(window))
+        pairs = [[self._pair_index[(i, j)] for j in idx] for i in idx]
+        return latest[np.array(pairs)].astype(np.float64)
+
+    def against(self, base, currencies, window=None):
+        """Return {currency: correlation with base} for the given currencies"""
+        b = self._index(base)
+        if window is None:
+            row = self._full[b]
+            return {c: float(row[self._index(c)]) for c in currencies}
+
+        latest = self._latest(self._check_window(window))
+        return {c: float(latest[self._pair_index[(b, self._index(c))]]) for c in currencies}
+
+    def rolling(self, base, currency, window):
+        """Return (dates, correlations) of one pair over a rolling window"""
+        window = self._check_window(window)
+        series = self._rolling[window][:self._rolling_size[window]]
+        p = self._pair_index[(self._index(base), self._index(currency))]
+        return self._dates[window - 1:self._dates_size], series[:, p]
@@ -0,0 +1,222 @@
+"""
+Binary columnar snapshots of the gold price CSV files
+"""
+
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import get_logger
+
+SNAPSHOT_FORMAT = 2
+DATE_FORMAT = '%m/%d/%Y'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Bytes before the recorded end of the CSV that must be unchanged for new
+# bytes after it to be treated as an append
+TAIL_BYTES = 4096
+
+logger = get_logger('data_cache')
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tail_digest(path, size):
+    """Return the SHA-256 hex digest of the TAIL_BYTES ending at ``size``"""
+    start = max(0, size - TAIL_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(size - start)).hexdigest()
+
+
+def _type_columns(df):
+    df['Date'] = pd.to_datetime(df['Date'], format=DATE_FORMAT)
+
+    # Any column the fast path could not type gets the tolerant conversion
+    for col in df.columns[1:]:
+        if df[col].dtype != np.float64:
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+    return df
+
+
+def parse_price_csv(path):
+    """Parse a price CSV into a Date column followed by float64 columns"""
+    df = _type_columns(pd.read_csv(path, na_values=['#N/A'], thousands=','))
+    return df.ffill().bfill()
+
+
+def parse_price_rows(data, columns):
+    """Parse header-less CSV bytes appended to a price file, without filling"""
+    df = pd.read_csv(io.BytesIO(data), header=None, names=['Date'] + list(columns),
+                     na_values=['#N/A'], thousands=',')
+    return _type_columns(df)
+
+
+def snapshot_paths(csv_path, cache_dir):
+    """Return the (meta, dates, values) file paths of a CSV's snapshot"""
+    source = os.path.abspath(csv_path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha1(source.encode('utf-8')).hexdigest()[:10]
+    base = os.path.join(cache_dir, f'{stem}-{key}')
+    return base + '.meta.json', base + '.dates.npy', base + '.values.npy'
+
+
+def _atomic_save(path, array):
+    """Write an .npy file so readers never observe a partial array"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_write_json(path, payload):
+    """Write a JSON file atomically"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _read_meta(meta_path):
+    """Read snapshot metadata, returning None if it is missing or unreadable"""
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return meta
+
+
+def build_snapshot(csv_path, cache_dir):
+    """Parse a CSV and write its typed snapshot, returning the metadata"""
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, dates_path, values_path = snapshot_paths(csv_path, cache_dir)
+
+    stat = os.stat(csv_path)
+    df = parse_price_csv(csv_path)
+    columns = list(df.columns[1:])
+
+    # Column-major layout keeps every currency series contiguous on disk
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    values = np.asfortranarray(df[columns].to_numpy(dtype=np.float64))
+
+    _atomic_save(dates_path, dates)
+    _atomic_save(values_path, values)
+
+    # Metadata is written last so its presence marks a complete snapshot
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'source': os.path.abspath(csv_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_digest(csv_path),
+        'tail_sha256': tail_digest(csv_path, stat.st_size),
+        'columns': columns,
+        'rows': int(len(dates))
+    }
+    _atomic_write_json(meta_path, meta)
+    logger.info("Built data snapshot for %s (%d rows)", csv_path, len(dates))
+    return meta
+
+
+def append_snapshot(csv_path, cache_dir, meta):
+    """Extend a snapshot with the rows appended to its CSV since it was built
+
+    Only the new bytes are parsed, and missing values are forward-filled
+    from the last snapshot row. ``sha256`` becomes a chained digest of the
+    previous digest and the appended bytes. Raises ValueError when the new
+    rows do not continue the existing dates.
+    """
+    meta_path, dates_path, values_path = snapshot_paths(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+    with open(csv_path, 'rb') as f:
+        f.seek(meta['size'])
+        data = f.read(stat.st_size - meta['size'])
+
+    columns = meta['columns']
+    rows = parse_price_rows(data, columns)
+    old_dates = np.load(dates_path)
+    old_values = np.load(values_path)
+    new_dates = rows['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    if rows['Date'].isna().any() or np.any(np.diff(np.concatenate((old_dates[-1:], new_dates))) <= 0):
+        raise ValueError('Appended rows must have increasing dates after the last row')
+
+    # Forward-fill the new rows only, seeded with the last (already filled) row
+    tail = pd.DataFrame(np.vstack([old_values[-1:], rows[columns].to_numpy(dtype=np.float64)]))
+    new_values = tail.ffill().to_numpy()[1:]
+
+    dates = np.concatenate((old_dates, new_dates))
+    values = np.asfortranarray(np.vstack([old_values, new_values]))
+    _atomic_save(dates_path, dates)
+    _atomic_save(values_path, values)
+
+    meta = dict(meta, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                sha256=hashlib.sha256((meta['sha256'] + hashlib.sha256(data).hexdigest()).encode('utf-8')).hexdigest(),
+                tail_sha256=tail_digest(csv_path, stat.st_size), rows=int(len(dates)))
+    _atomic_write_json(meta_path, meta)
+    logger.info("Appended %d rows to the data snapshot for %s", len(new_dates), csv_path)
+    return meta
+
+
+def ensure_snapshot(csv_path, cache_dir):
+    """Return up-to-date snapshot metadata for a CSV, rebuilding it if stale"""
+    meta_path = snapshot_paths(csv_path, cache_dir)[0]
+    meta = _read_meta(meta_path)
+    if meta is None:
+        return build_snapshot(csv_path, cache_dir)
+
+    stat = os.stat(csv_path)
+    if meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+        return meta
+
+    # A touched but unchanged file only needs its recorded mtime refreshed
+    if meta['size'] == stat.st_size and meta['sha256'] == file_digest(csv_path):
+        meta['mtime_ns'] = stat.st_mtime_ns
+        _atomic_write_json(meta_path, meta)
+        return meta
+
+    # Rows appended after an unchanged prefix are parsed on their own
+    if stat.st_size > meta['size'] and meta['tail_sha256'] == tail_digest(csv_path, meta['size']):
+        try:
+            return append_snapshot(csv_path, cache_dir, meta)
+        except ValueError as e:
+            logger.warning("Rebuilding data snapshot for %s: %s", csv_path, e)
+
+    return build_snapshot(csv_path, cache_dir)
+
+
+def load_snapshot(csv_path, cache_dir, mmap=True):
+    """Return (dates, values, meta) for a CSV via its snapshot
+
+    ``dates`` is an int64 array of nanosecond timestamps and ``values`` a
+    column-major float64 matrix whose columns are listed in
+    ``meta['columns']``. With ``mmap`` the arrays are read-only memory maps,
+    so every worker process shares the same page cache.
+    """
+    meta = ensure_snapshot(csv_path, cache_dir)
+    _, dates_path, values_path = snapshot_paths(csv_path, cache_dir)
+    mmap_mode = 'r' if mmap else None
+    dates = np.load(dates_path, mmap_mode=mmap_mode)
+    values = np.load(values_path, mmap_mode=mmap_mode)
+    return dates, values, meta
+
+
+def load_price_frame(csv_path, cache_dir, mmap=True):
+    """Load a price CSV as a DataFrame, going through the binary snapshot"""
+    dates, values, meta = load_snapshot(csv_path, cache_dir, mmap=mmap)
+    df = pd.DataFrame(values, columns=meta['columns'], copy=False)
+    df.insert(0, 'Date', pd.to_datetime(np.asarray(dates), unit='ns'))
+    return df
@@ -0,0 +1,52 @@
+"""
+Shape-preserving downsampling for chart series
+"""
+
+import numpy as np
+
+
+def min_points(n_series):
+    """Smallest ``max_points`` that fits one bucket of ``n_series`` series"""
+    return 2 * n_series + 2
+
+
+def minmax_indices(values, max_points):
+    """Return sorted row indices that keep each bucket's extremes
+
+    ``values`` is a 1-D series or a 2-D (rows, series) matrix. The rows are
+    split into equal buckets and the argmin/argmax of every series in every
+    bucket is kept, together with the first and last rows, so peaks and
+    troughs survive while the result never exceeds ``max_points`` rows.
+    That needs room for one bucket, so ``max_points`` below
+    ``min_points(n_series)`` raises ValueError.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n, n_series = values.shape
+    if max_points < min_points(n_series):
+        raise ValueError(f"max_points must be at least {min_points(n_series)} for {n_series} series")
+    if n <= max_points or n <= 2:
+        return np.arange(n)
+
+    # Two extremes per series per bucket, plus both endpoints
+    buckets = (max_points - 2) // (2 * n_series)
+    interior = values[1:-1]
+    m = len(interior)
+    size = -(-m // buckets)
+    buckets = -(-m // size)
+    pad = buckets * size - m
+
+    low = np.where(np.isnan(interior), np.inf, interior)
+    high = np.where(np.isnan(interior), -np.inf, interior)
+    if pad:
+        low = np.concatenate((low, np.full((pad, n_series), np.inf)))
+        high = np.concatenate((high, np.full((pad, n_series), -np.inf)))
+
+    offsets = (np.arange(buckets) * size)[:, None]
+    mins = low.reshape(buckets, size, n_series).argmin(axis=1) + offsets
+    maxs = high.reshape(buckets, size, n_series).argmax(axis=1) + offsets
+
+    picked = np.concatenate((mins.ravel(), maxs.ravel())) + 1
+    picked = picked[picked <= m]
+    return np.unique(np.concatenate(([0], picked, [n - 1])))
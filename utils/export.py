@@ -0,0 +1,92 @@
+"""
+Streaming export of the price history as NDJSON, CSV or Arrow IPC
+
+Rows are encoded in fixed-size chunks straight from the store's column
+buffers, so memory use does not grow with the size of the export.
+"""
+
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - in requirements.txt; without it format=arrow returns 400
+    pyarrow = None
+
+# Rows encoded per chunk
+EXPORT_CHUNK_ROWS = 4096
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+
+def iter_chunks(dates, values, cols, lo, hi, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield (datetime64 dates, values) blocks of at most ``chunk_rows`` rows"""
+    for start in range(lo, hi, chunk_rows):
+        end = min(start + chunk_rows, hi)
+        yield (np.asarray(dates[start:end]).view('datetime64[ns]'),
+               np.asarray(values[start:end])[:, cols])
+
+
+def _frame(chunk_dates, chunk_values, columns):
+    df = pd.DataFrame(chunk_values, columns=columns, copy=False)
+    df.insert(0, 'Date', np.datetime_as_string(chunk_dates, unit='D'))
+    return df
+
+
+def encode_csv(chunks, columns):
+    """Yield CSV bytes: a header, then one block per chunk"""
+    yield (','.join(['Date'] + columns) + '\n').encode('utf-8')
+    for chunk_dates, chunk_values in chunks:
+        yield _frame(chunk_dates, chunk_values, columns).to_csv(
+            header=False, index=False, float_format='%.10g', lineterminator='\n').encode('utf-8')
+
+
+def encode_ndjson(chunks, columns):
+    """Yield newline-delimited JSON bytes, one object per row"""
+    for chunk_dates, chunk_values in chunks:
+        text = _frame(chunk_dates, chunk_values, columns).to_json(orient='records', lines=True, double_precision=10)
+        yield (text if text.endswith('\n') else text + '\n').encode('utf-8')
+
+
+def encode_arrow(chunks, columns):
+    """Yield an Arrow IPC stream, one record batch per chunk"""
+    schema = pyarrow.schema([('Date', pyarrow.date32())] + [(col, pyarrow.float64()) for col in columns])
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for chunk_dates, chunk_values in chunks:
+            arrays = [pyarrow.array(chunk_dates.astype('datetime64[D]'), type=pyarrow.date32())]
+            arrays += [pyarrow.array(chunk_values[:, i]) for i in range(len(columns))]
+            writer.write_batch(pyarrow.record_batch(arrays, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def gzip_stream(blocks, level=6):
+    """Compress a byte stream on the fly into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(dates, values, columns, cols, lo, hi, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Return a byte generator exporting rows [lo, hi) of the chosen columns"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'arrow' and pyarrow is None:
+        raise ValueError('Arrow export requires pyarrow to be installed')
+
+    chunks = iter_chunks(dates, values, cols, lo, hi, chunk_rows)
+    encoder = {'ndjson': encode_ndjson, 'csv': encode_csv, 'arrow': encode_arrow}[fmt]
+    return encoder(chunks, list(columns))
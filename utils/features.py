@@ -0,0 +1,161 @@
+"""
+Vectorized feature engineering shared by prediction and training
+"""
+
+import numpy as np
+import pandas as pd
+
+# Features that depend on earlier rows rather than on the row itself
+STOCK_HISTORY_FEATURES = ['Close_Lag1', 'Close_Lag2', 'Volume_Lag1', 'MA_5', 'MA_10']
+
+# Full stock model feature set, in the order used by the training notebook
+STOCK_FEATURES = ['Open', 'High', 'Low', 'Volume', 'Day', 'Month', 'Year', 'DayOfWeek', 'Quarter',
+                  'Price_Range', 'Price_Change', 'Price_Change_Pct'] + STOCK_HISTORY_FEATURES
+
+# Features derived from the day's Close, which is the stock model's target. A
+# prediction request has no Close, so serving builds them as if Close == Open.
+CLOSE_FEATURES = ['Price_Change', 'Price_Change_Pct']
+
+
+def load_stock_history(path):
+    """Load the OHLCV history used by the stock model, sorted by date"""
+    df = pd.read_csv(path)
+    if 'Unnamed: 0' in df.columns:
+        df = df.drop('Unnamed: 0', axis=1)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.sort_values('Date').reset_index(drop=True)
+
+
+def add_stock_features(data, close_known=True):
+    """Add the stock model's engineered columns to an OHLCV frame
+
+    Mirrors the notebook's feature engineering column by column; rows are
+    expected to be sorted by date. With ``close_known=False`` the
+    CLOSE_FEATURES are built the way serving builds them, without the day's
+    Close; lags and moving averages only use earlier Closes either way.
+    """
+    data = data.copy()
+    data['Day'] = data['Date'].dt.day
+    data['Month'] = data['Date'].dt.month
+    data['Year'] = data['Date'].dt.year
+    data['DayOfWeek'] = data['Date'].dt.dayofweek
+    data['Quarter'] = data['Date'].dt.quarter
+
+    data['Price_Range'] = data['High'] - data['Low']
+    close = data['Close'] if close_known else data['Open']
+    data['Price_Change'] = close - data['Open']
+    data['Price_Change_Pct'] = (data['Price_Change'] / data['Open']) * 100
+
+    data['MA_5'] = data['Close'].rolling(window=5).mean()
+    data['MA_10'] = data['Close'].rolling(window=10).mean()
+    data['Close_Lag1'] = data['Close'].shift(1)
+    data['Close_Lag2'] = data['Close'].shift(2)
+    data['Volume_Lag1'] = data['Volume'].shift(1)
+    return data
+
+
+class StockFeatureTable:
+    """History-dependent stock features indexed by date
+
+    Built once from the historical series. A date that is in the history
+    gets exactly the lag/moving-average values the model was trained on;
+    any other date gets the values implied by the rows strictly before it.
+    """
+
+    def __init__(self, history):
+        rows = add_stock_features(history)
+        self.dates = rows['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+        # Features of each historical row, as used in training
+        self.current = rows[STOCK_HISTORY_FEATURES].to_numpy(dtype=np.float64)
+
+        # Features of a new date that directly follows each historical row
+        close = rows['Close'].to_numpy(dtype=np.float64)
+        self.following = np.column_stack([
+            close,
+            rows['Close_Lag1'].to_numpy(dtype=np.float64),
+            rows['Volume'].to_numpy(dtype=np.float64),
+            rows['MA_5'].to_numpy(dtype=np.float64),
+            rows['MA_10'].to_numpy(dtype=np.float64)
+        ])
+
+    def to_block(self, prefix='stock_features'):
+        """Return (arrays, meta) holding the table, for a shared data block"""
+        arrays = {f'{prefix}/dates': self.dates, f'{prefix}/current': self.current,
+                  f'{prefix}/following': self.following}
+        return arrays, {}
+
+    @classmethod
+    def from_block(cls, block, prefix='stock_features'):
+        """Rebuild a table whose arrays are read-only views into a shared block"""
+        table = cls.__new__(cls)
+        table.dates = block[f'{prefix}/dates']
+        table.current = block[f'{prefix}/current']
+        table.following = block[f'{prefix}/following']
+        return table
+
+    def positions(self, dates):
+        """Return (insert positions, exact-match mask) for an array of dates"""
+        ns = pd.to_datetime(np.asarray(dates)).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        pos = np.searchsorted(self.dates, ns, side='left')
+        clipped = np.minimum(pos, len(self.dates) - 1)
+        exact = (pos < len(self.dates)) & (self.dates[clipped] == ns)
+        return pos, exact
+
+    def lookup(self, dates):
+        """Return an (n, len(STOCK_HISTORY_FEATURES)) matrix for the dates
+
+        Rows with no earlier history are NaN.
+        """
+        pos, exact = self.positions(dates)
+        clipped = np.minimum(pos, len(self.dates) - 1)
+        result = np.where(exact[:, None], self.current[clipped], self.following[np.maximum(pos - 1, 0)])
+        result[(pos == 0) & ~exact] = np.nan
+        return result
+
+
+# Gold-in-USD history features used by the Ridge model
+USD_LAGS = [1, 3, 7, 14, 30]
+USD_MA_WINDOWS = [3, 7, 14, 30]
+
+
+def shift(values, lag):
+    """Shift a 1-D array forward by ``lag`` rows, padding with NaN"""
+    shifted = np.full(len(values), np.nan)
+    if lag < len(values):
+        shifted[lag:] = values[:len(values) - lag]
+    return shifted
+
+
+def moving_average(values, window):
+    """Trailing simple moving average via cumulative sums, NaN until full"""
+    result = np.full(len(values), np.nan)
+    if window <= len(values):
+        sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def usd_history_features(usd):
+    """Return {name: array} of the USD lag and moving-average features"""
+    usd = np.asarray(usd, dtype=np.float64)
+    features = {f'USD_lag_{lag}': shift(usd, lag) for lag in USD_LAGS}
+    features.update({f'USD_MA_{w}': moving_average(usd, w) for w in USD_MA_WINDOWS})
+    return features
+
+
+def ridge_feature_matrix(dates, values, columns, feature_names):
+    """Build the Ridge model's (X, y, dates) from the daily price matrix
+
+    Rows whose lag/moving-average features are not yet defined are dropped,
+    as in the training notebook.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    index = {col: i for i, col in enumerate(columns)}
+    usd = values[:, index['USD']]
+    derived = usd_history_features(usd)
+
+    X = np.column_stack([derived[name] if name in derived else values[:, index[name]]
+                         for name in feature_names])
+    valid = ~np.isnan(X).any(axis=1)
+    return X[valid], usd[valid], np.asarray(dates)[valid]
@@ -0,0 +1,177 @@
+"""
+Recursive multi-step forecasts of the gold price from the Ridge model
+
+The model scores one day from the other currencies' gold prices on that
+day and from USD lags and moving averages. A forecast step fills those
+inputs from a per-scenario ring buffer of the most recent USD prices. The
+other currencies follow USD at the last observed exchange rates, times any
+scenario shift. The predicted price is then pushed into the buffer. Every
+scenario advances together as one (scenarios, features) matrix per step.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+FORECAST_MAX_HORIZON = 90
+FORECAST_MAX_SCENARIOS = 64
+
+# Forecast responses kept per (data version, model version, request)
+FORECAST_CACHE_SIZE = 64
+
+_LAG = re.compile(r'USD_lag_(\d+)$')
+_MA = re.compile(r'USD_MA_(\d+)$')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class ForecastState:
+    """Seed of a forecast: the latest USD prices and each column's rate against USD"""
+
+    def __init__(self, dates, values, columns, history):
+        values = np.asarray(values, dtype=np.float64)
+        self.columns = list(columns)
+        usd = self.columns.index('USD')
+        if len(values) < history:
+            raise ValueError(f"At least {history} daily rows are needed to forecast")
+        self.history = values[-history:, usd].copy()
+        # Gold in a currency divided by gold in USD is that currency's USD exchange rate
+        self.rates = values[-1] / values[-1, usd]
+        self.last_date = np.datetime64(int(dates[-1]), 'ns').astype('datetime64[D]')
+
+
+class ForecastPlan:
+    """Where each of a kernel's features comes from during a forecast"""
+
+    def __init__(self, feature_names, columns):
+        self.currencies, self.lags, self.windows = [], [], []
+        for i, name in enumerate(feature_names):
+            lag, window = _LAG.match(name), _MA.match(name)
+            if name in columns:
+                self.currencies.append((i, columns.index(name)))
+            elif lag:
+                self.lags.append((i, int(lag.group(1))))
+            elif window:
+                self.windows.append((i, int(window.group(1))))
+            else:
+                raise ValueError(f"Cannot forecast feature {name}")
+        self.history = max([lag for _, lag in self.lags] + [w for _, w in self.windows] + [1])
+
+
+def parse_horizons(value):
+    """Return sorted horizons from an int, a list or a comma-separated string"""
+    if isinstance(value, str):
+        value = value.split(',')
+    horizons = sorted({int(h) for h in np.atleast_1d(value)})
+    if not horizons or horizons[0] < 1 or horizons[-1] > FORECAST_MAX_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {FORECAST_MAX_HORIZON} days")
+    return horizons
+
+
+def scenario_shifts(scenarios, columns):
+    """Return an (S, columns) matrix of exchange-rate multipliers
+
+    Each scenario's ``fx`` maps a currency to the factor its USD rate is
+    multiplied by for the whole horizon; USD itself cannot be shifted.
+    """
+    if not 1 <= len(scenarios) <= FORECAST_MAX_SCENARIOS:
+        raise ValueError(f"Provide between 1 and {FORECAST_MAX_SCENARIOS} scenarios")
+    shifts = np.ones((len(scenarios), len(columns)))
+    for s, scenario in enumerate(scenarios):
+        for currency, factor in (scenario.get('fx') or {}).items():
+            if currency not in columns or currency == 'USD':
+                raise ValueError(f"Unknown currency in fx: {currency}")
+            factor = float(factor)
+            if not np.isfinite(factor) or factor <= 0:
+                raise ValueError('fx factors must be positive')
+            shifts[s, columns.index(currency)] = factor
+    return shifts
+
+
+def run_forecast(kernel, state, horizon, shifts, plan=None):
+    """Roll the kernel forward ``horizon`` days for every scenario
+
+    Returns (USD paths of shape (S, horizon), rates of shape (S, columns)).
+    """
+    plan = plan or ForecastPlan(kernel.feature_names, state.columns)
+    n = len(shifts)
+    size = len(state.history)
+    rates = state.rates * shifts
+
+    # Ring buffer of recent USD prices per scenario; the newest sits just before ``pos``
+    buffer = np.tile(state.history[-size:], (n, 1))
+    pos = 0
+    sums = {w: buffer[:, size - w:].sum(axis=1) for _, w in plan.windows}
+
+    cur_features = np.array([i for i, _ in plan.currencies], dtype=int)
+    cur_columns = np.array([c for _, c in plan.currencies], dtype=int)
+    X = np.empty((n, len(kernel.feature_names)))
+    paths = np.empty((n, horizon))
+    for step in range(horizon):
+        newest = buffer[:, (pos - 1) % size]
+        X[:, cur_features] = rates[:, cur_columns] * newest[:, None]
+        for i, lag in plan.lags:
+            X[:, i] = buffer[:, (pos - lag) % size]
+        for i, w in plan.windows:
+            X[:, i] = sums[w] / w
+
+        predicted = kernel.predict(X)
+        for w in sums:
+            sums[w] += predicted - buffer[:, (pos - w) % size]
+        buffer[:, pos] = predicted
+        pos = (pos + 1) % size
+        paths[:, step] = predicted
+    return paths, rates
+
+
+def forecast_dates(last_date, horizon):
+    """Business days following the last observed date, as in Daily.csv"""
+    return np.busday_offset(last_date, np.arange(1, horizon + 1), roll='forward')
+
+
+def cached_forecast(key, build):
+    """Return the cached forecast for a key, building it on a miss"""
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    result = build()
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > FORECAST_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def build_forecast(kernel, dates, values, columns, horizons, scenarios, currencies):
+    """Return the JSON-ready forecast for the requested horizons and scenarios"""
+    plan = ForecastPlan(kernel.feature_names, columns)
+    state = ForecastState(dates, values, columns, plan.history)
+    shifts = scenario_shifts(scenarios, columns)
+    horizon = horizons[-1]
+    paths, rates = run_forecast(kernel, state, horizon, shifts, plan)
+
+    cols = [columns.index(c) for c in currencies]
+    # (S, currencies, horizon) paths in every requested currency
+    converted = paths[:, None, :] * rates[:, cols, None]
+    results = []
+    for s, scenario in enumerate(scenarios):
+        series = {c: np.round(converted[s, k], 2).tolist() for k, c in enumerate(currencies)}
+        results.append({
+            'name': scenario.get('name', f'scenario_{s}'),
+            'fx': scenario.get('fx') or {},
+            'paths': series,
+            'at_horizon': {str(h): {c: series[c][h - 1] for c in currencies} for h in horizons}
+        })
+    return {
+        'last_date': str(state.last_date),
+        'dates': [str(d) for d in forecast_dates(state.last_date, horizon)],
+        'horizons': horizons,
+        'currencies': currencies,
+        'scenarios': results
+    }
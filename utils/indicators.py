@@ -0,0 +1,145 @@
+"""
+Technical indicators over every currency column of the daily prices
+
+Each kernel works on a whole (rows, columns) matrix at once: moving
+averages and RSI from cumulative sums, rolling standard deviations from
+strided window views, and exponential averages from a single linear
+filter pass. Definitions follow the training notebook, so ``USD_MA_7`` or
+``USD_RSI`` here are exactly the features the Ridge model was fit on.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+LAGS = (1, 3, 7, 14, 30)
+MA_WINDOWS = (3, 7, 14, 20, 30)
+VOLATILITY_WINDOWS = (7, 30)
+EMA_SPANS = (12, 26)
+RSI_WINDOW = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2
+MACD_SIGNAL_SPAN = 9
+
+
+def lag(values, k):
+    """Shift rows forward by ``k``, padding with NaN"""
+    result = np.full(values.shape, np.nan)
+    if k < len(values):
+        result[k:] = values[:len(values) - k]
+    return result
+
+
+def diff(values):
+    return values - lag(values, 1)
+
+
+def pct_change(values):
+    previous = lag(values, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - previous) / previous
+
+
+def sma(values, window):
+    """Trailing simple moving average of every column, NaN until full"""
+    result = np.full(values.shape, np.nan)
+    if window <= len(values):
+        sums = np.zeros((len(values) + 1,) + values.shape[1:])
+        np.cumsum(values, axis=0, out=sums[1:])
+        result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def rolling_std(values, window):
+    """Trailing sample standard deviation over strided windows
+
+    Prices such as VND reach 1e7, where a sum-of-squares formula would
+    cancel catastrophically, so each window is reduced directly.
+    """
+    result = np.full(values.shape, np.nan)
+    if window <= len(values):
+        result[window - 1:] = sliding_window_view(values, window, axis=0).std(axis=-1, ddof=1)
+    return result
+
+
+def ema(values, span):
+    """Recursive exponential moving average seeded with the first row (adjust=False)"""
+    alpha = 2 / (span + 1)
+    if len(values) == 0:
+        return np.array(values, dtype=np.float64)
+    result, _ = lfilter([alpha], [1, alpha - 1], values, axis=0, zi=((1 - alpha) * values[:1]))
+    return result
+
+
+def rsi(values, window=RSI_WINDOW):
+    """Relative strength index from simple averages of gains and losses"""
+    delta = diff(values)
+    gain = sma(np.where(delta > 0, delta, 0.0), window)
+    loss = sma(np.where(delta < 0, -delta, 0.0), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def _macd(values):
+    line = ema(values, 12) - ema(values, 26)
+    return line, ema(line, MACD_SIGNAL_SPAN)
+
+
+# Indicator kind -> function of the (rows, columns) price matrix
+KINDS = {}
+KINDS.update({f'lag_{k}': (lambda v, k=k: lag(v, k)) for k in LAGS})
+KINDS.update({f'MA_{w}': (lambda v, w=w: sma(v, w)) for w in MA_WINDOWS})
+KINDS.update({f'EMA_{s}': (lambda v, s=s: ema(v, s)) for s in EMA_SPANS})
+KINDS.update({f'volatility_{w}': (lambda v, w=w: rolling_std(v, w)) for w in VOLATILITY_WINDOWS})
+KINDS.update({
+    'pct_change': pct_change,
+    'price_change': diff,
+    'RSI': rsi,
+    'BB_upper': lambda v: sma(v, BOLLINGER_WINDOW) + BOLLINGER_WIDTH * rolling_std(v, BOLLINGER_WINDOW),
+    'BB_lower': lambda v: sma(v, BOLLINGER_WINDOW) - BOLLINGER_WIDTH * rolling_std(v, BOLLINGER_WINDOW),
+    'MACD': lambda v: _macd(v)[0],
+    'MACD_signal': lambda v: _macd(v)[1],
+    'MACD_hist': lambda v: np.subtract(*_macd(v))
+})
+
+
+class IndicatorTable:
+    """Indicators of one dataset version, named ``<currency>_<kind>``
+
+    Every kind is computed once, up front, as a full (rows, columns)
+    matrix; the latest row is read from those same matrices. The
+    recursive EMA and MACD kinds depend on the whole history, so only
+    computing a tail would not give the same values.
+    """
+
+    def __init__(self, dates, values, columns, version=None):
+        self.version = version
+        self.dates = dates
+        self.values = np.asarray(values, dtype=np.float64)
+        self.columns = list(columns)
+        self._col_index = {col: i for i, col in enumerate(self.columns)}
+        self._series = {kind: compute(self.values) for kind, compute in KINDS.items()}
+
+        self._latest = dict(zip(self.columns, self.values[-1].tolist()))
+        for kind, matrix in self._series.items():
+            last = matrix[-1].tolist()
+            self._latest.update({f'{col}_{kind}': value for col, value in zip(self.columns, last)})
+
+    def latest(self):
+        """Return {name: value} of every price and indicator on the last row"""
+        return dict(self._latest)
+
+    def series(self, kind):
+        """Return the (rows, columns) matrix of one indicator kind"""
+        try:
+            return self._series[kind]
+        except KeyError:
+            raise KeyError(f"Unknown indicator: {kind}") from None
+
+    def get(self, currency, kind, lo=0, hi=None):
+        """Return one currency's indicator over rows [lo, hi)"""
+        try:
+            col = self._col_index[currency]
+        except KeyError:
+            raise KeyError(f"Unknown currency: {currency}") from None
+        return self.series(kind)[lo:hi, col]
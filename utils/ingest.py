@@ -0,0 +1,120 @@
+"""
+Append new daily prices to Daily.csv without a full reload
+
+    python -m utils.ingest new_prices.csv
+    python -m utils.ingest - < new_prices.csv
+
+The rows are appended in the file's own format. The binary snapshot is then
+extended in place, and running servers pick the rows up on their next poll.
+"""
+
+import argparse
+import fcntl
+import math
+import os
+import sys
+
+import pandas as pd
+
+from .data_cache import DATE_FORMAT, ensure_snapshot
+from .instrumentation import configure_logging
+
+DAILY_PATH = 'Daily.csv'
+
+
+def format_value(value):
+    """Format one price the way Daily.csv stores it"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return '#N/A'
+    text = f'{float(value):,}'
+    return f'"{text}"' if ',' in text else text
+
+
+def read_header_and_last_date(f):
+    """Return (columns, last date) of an open price CSV"""
+    f.seek(0)
+    columns = f.readline().decode('utf-8').strip().split(',')[1:]
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(max(0, size - 4096))
+    last_line = f.read().decode('utf-8').strip().splitlines()[-1]
+    return columns, pd.to_datetime(last_line.split(',', 1)[0], format=DATE_FORMAT)
+
+
+def normalize_rows(rows, columns, last_date):
+    """Validate rows and return them as formatted CSV lines
+
+    Every row needs a Date later than the file's last one, dates must
+    increase, and only known currency columns are accepted. Missing prices
+    are written as #N/A and forward-filled on load.
+    """
+    frame = pd.DataFrame(list(rows) if not isinstance(rows, pd.DataFrame) else rows)
+    if len(frame) == 0:
+        raise ValueError('No rows to append')
+    if 'Date' not in frame.columns:
+        raise ValueError('Every row needs a Date')
+    unknown = [col for col in frame.columns if col != 'Date' and col not in columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(map(str, unknown))}")
+
+    dates = pd.to_datetime(frame['Date'], errors='coerce')
+    if dates.isna().any():
+        raise ValueError('Invalid Date in appended rows')
+    previous = pd.concat([pd.Series([last_date]), dates], ignore_index=True)
+    if (previous.diff().iloc[1:] <= pd.Timedelta(0)).any():
+        raise ValueError(f"Dates must increase and come after {last_date:%Y-%m-%d}")
+
+    values = frame.reindex(columns=columns).apply(pd.to_numeric, errors='coerce')
+    lines = []
+    for date, row in zip(dates, values.itertuples(index=False)):
+        # m/d/Y without zero padding, as in the shipped file
+        lines.append(','.join([f'{date.month}/{date.day}/{date.year}'] + [format_value(v) for v in row]))
+    return lines
+
+
+def append_daily_rows(rows, csv_path=DAILY_PATH, cache_dir=None):
+    """Append rows to a daily price CSV; returns the number of rows written
+
+    The file is locked for the duration, so concurrent ingestions cannot
+    interleave. With ``cache_dir`` the binary snapshot is extended too.
+    """
+    with open(csv_path, 'rb+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            columns, last_date = read_header_and_last_date(f)
+            lines = normalize_rows(rows, columns, last_date)
+
+            f.seek(-1, os.SEEK_END)
+            prefix = b'' if f.read(1) == b'\n' else b'\n'
+            f.seek(0, os.SEEK_END)
+            f.write(prefix + ''.join(line + '\n' for line in lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    if cache_dir is not None:
+        ensure_snapshot(csv_path, cache_dir)
+    return len(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append new daily gold prices')
+    parser.add_argument('input', help="CSV with a Date column and currency columns ('-' for stdin)")
+    parser.add_argument('--data', default=DAILY_PATH, help='daily price CSV to append to')
+    parser.add_argument('--cache-dir', default=os.environ.get('CACHE_FOLDER', 'cache'), help='snapshot directory')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    rows = pd.read_csv(sys.stdin if args.input == '-' else args.input, thousands=',', na_values=['#N/A'])
+    try:
+        count = append_daily_rows(rows, args.data, args.cache_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Appended {count} rows to {args.data}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Split-conformal prediction intervals from walk-forward backtest residuals
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .instrumentation import get_logger
+
+# Coverage levels precomputed for every model
+INTERVAL_LEVELS = (0.5, 0.8, 0.9, 0.95, 0.99)
+DEFAULT_LEVEL = 0.95
+
+# Calibrated half-widths below this relative size mean the calibration data
+# did not match serving (e.g. a leaked target), so the fixed band is used
+MIN_RELATIVE_WIDTH = 1e-4
+
+# Training target -> model key of its entry in the backtest results
+BACKTEST_KEYS = {'ridge': 'ridge_regression', 'stock': 'linear_regression'}
+
+logger = get_logger('intervals')
+
+
+def conformal_quantiles(y_true, y_pred, levels=INTERVAL_LEVELS):
+    """Return the relative-error conformal quantile for each coverage level
+
+    Scores are |y - ŷ| / |ŷ| on held-out predictions; the quantile at level
+    ``a`` is the ceil((n + 1) a)-th smallest score, which gives at least
+    ``a`` coverage on exchangeable data. Ranks are computed in integers on
+    levels in basis points, so (n + 1) a landing just above an integer in
+    floating point cannot push a rank one too high.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    scores = np.sort(np.abs(y_true - y_pred) / np.abs(y_pred))
+    n = len(scores)
+    basis_points = np.rint(np.asarray(levels, dtype=np.float64) * 10000).astype(np.int64)
+    ranks = np.minimum(-(-(n + 1) * basis_points // 10000), n) - 1
+    return scores[ranks]
+
+
+class IntervalTable:
+    """Precomputed relative half-widths per coverage level"""
+
+    def __init__(self, levels, quantiles, method='split_conformal_relative', samples=None):
+        self.levels = [float(level) for level in levels]
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self.method = method
+        self.samples = samples
+        self._by_level = dict(zip(self.levels, self.quantiles.tolist()))
+
+    @classmethod
+    def from_results(cls, entry):
+        """Build a table from the ``intervals`` block of a backtest result"""
+        return cls(entry['levels'], entry['quantiles'], entry.get('method', 'split_conformal_relative'),
+                   entry.get('samples'))
+
+    @classmethod
+    def fixed(cls, width=0.02):
+        """The legacy ±2% band, used when no backtest results are available"""
+        return cls([DEFAULT_LEVEL], [width], method='fixed')
+
+    @property
+    def degenerate(self):
+        return not np.all(self.quantiles >= MIN_RELATIVE_WIDTH)
+
+    def check_level(self, level):
+        """Return ``level`` as a float, raising ValueError unless it is a precomputed level"""
+        try:
+            level = float(level)
+        except (TypeError, ValueError):
+            level = None
+        if level not in self._by_level:
+            raise ValueError(f"level must be one of {', '.join(str(l) for l in self.levels)}")
+        return level
+
+    def bounds(self, predictions, level=DEFAULT_LEVEL):
+        """Return (lower, upper) for scalar or array predictions"""
+        half = self._by_level[self.check_level(level)] * np.abs(predictions)
+        return predictions - half, predictions + half
+
+    def to_dict(self):
+        return {'method': self.method, 'levels': self.levels, 'quantiles': self.quantiles.tolist(),
+                'samples': self.samples}
+
+
+def interval_table(entry, name='model'):
+    """Build a table from an ``intervals`` block, or the fixed band when the
+    block is missing or its widths are degenerate"""
+    if not entry:
+        return IntervalTable.fixed()
+    table = IntervalTable.from_results(entry)
+    if table.degenerate:
+        logger.warning("Calibrated intervals of the %s are narrower than %g; using the fixed band",
+                       name, MIN_RELATIVE_WIDTH)
+        return IntervalTable.fixed()
+    return table
+
+
+def load_interval_table(model_key, path=None):
+    """Return the interval table saved with a model's backtest, or the fixed band"""
+    from .backtest import RESULTS_PATH, load_results
+
+    try:
+        results = load_results(path or RESULTS_PATH)
+    except (OSError, ValueError) as e:
+        logger.warning("Error reading interval tables: %s", e)
+        results = None
+    entry = (results or {}).get('models', {}).get(model_key, {}).get('intervals')
+    return interval_table(entry, model_key)
+
+
+def load_version_intervals(version_dir, target):
+    """Return the interval table of one target of a model version
+
+    Versions written by the training pipeline carry their calibration in
+    their manifest; the legacy artifacts, which have none, use the backtest
+    results.
+    """
+    try:
+        with open(os.path.join(version_dir, 'manifest.json'), 'r') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return load_interval_table(BACKTEST_KEYS[target])
+    entry = manifest.get('targets', {}).get(target, {}).get('intervals')
+    return interval_table(entry, f"{target} model of version {manifest.get('version')}")
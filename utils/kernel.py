@@ -0,0 +1,109 @@
+"""
+Pure-NumPy scoring kernels for the linear models
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import get_logger
+
+PROBE_ROWS = 32
+
+logger = get_logger('kernel')
+
+
+class LinearKernel:
+    """A linear model reduced to one weight vector and an intercept
+
+    When a StandardScaler precedes the model its mean and scale are folded
+    into the weights, so scoring is a single dot product on raw features.
+    """
+
+    def __init__(self, weights, intercept, feature_names):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def from_estimator(cls, model, feature_names, scaler=None):
+        """Fold an optional scaler into a fitted linear estimator"""
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        intercept = float(np.ravel(model.intercept_)[0])
+        if scaler is not None:
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(coef)
+            coef = coef / scale
+            intercept -= float(np.dot(coef, mean))
+        return cls(coef, intercept, feature_names)
+
+    @classmethod
+    def load(cls, path, feature_names):
+        """Load a kernel saved as [weights..., intercept]"""
+        packed = np.load(path)
+        if len(packed) != len(feature_names) + 1:
+            raise ValueError(f"{path} does not match {len(feature_names)} features")
+        return cls(packed[:-1], packed[-1], feature_names)
+
+    def save(self, path):
+        """Save the kernel atomically as a single float64 vector"""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.append(self.weights, self.intercept))
+        os.replace(tmp_path, path)
+
+    def predict(self, X):
+        """Score a (rows, features) matrix or a single feature vector"""
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.intercept
+
+    def vector(self, features):
+        """Order a feature dict into the kernel's input vector"""
+        return np.fromiter((features[name] for name in self.feature_names),
+                           dtype=np.float64, count=len(self.feature_names))
+
+
+def reference_predict(model, X, feature_names, scaler=None):
+    """Score through the original sklearn path"""
+    X = pd.DataFrame(X, columns=feature_names)
+    if scaler is not None:
+        X = pd.DataFrame(scaler.transform(X), columns=feature_names)
+    if not hasattr(model, 'feature_names_in_'):
+        X = X.to_numpy()
+    return model.predict(X)
+
+
+def check_equivalence(kernel, model, feature_names, scaler=None, rtol=1e-9, atol=1e-6):
+    """Raise AssertionError unless the kernel reproduces the sklearn path"""
+    rng = np.random.default_rng(0)
+    if scaler is not None and scaler.mean_ is not None:
+        centre, spread = scaler.mean_, scaler.scale_
+    else:
+        centre, spread = np.full(len(feature_names), 1000.0), np.full(len(feature_names), 100.0)
+    X = centre + spread * rng.standard_normal((PROBE_ROWS, len(feature_names)))
+
+    expected = reference_predict(model, X, feature_names, scaler)
+    actual = kernel.predict(X)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        worst = float(np.max(np.abs(actual - expected)))
+        raise AssertionError(f"Kernel deviates from sklearn by up to {worst:.3g}")
+
+
+def load_linear_kernel(kernel_path, model, feature_names, scaler=None):
+    """Load (or fold and save) a kernel, verified against the sklearn model
+
+    A stored kernel that no longer matches the pickled model is rebuilt.
+    """
+    if os.path.exists(kernel_path):
+        try:
+            kernel = LinearKernel.load(kernel_path, feature_names)
+            check_equivalence(kernel, model, feature_names, scaler)
+            return kernel
+        except (AssertionError, ValueError) as e:
+            logger.warning("Rebuilding stale kernel %s: %s", kernel_path, e)
+
+    kernel = LinearKernel.from_estimator(model, feature_names, scaler)
+    check_equivalence(kernel, model, feature_names, scaler)
+    kernel.save(kernel_path)
+    return kernel
+
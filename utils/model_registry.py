@@ -0,0 +1,261 @@
+"""
+Versioned model registry with background hot-reload and rollback
+
+``python -m utils.training`` publishes each version to
+models/versions/<version>/ and replaces models/manifest.json last. The
+registry polls that manifest, loads a new version off the request path,
+checks it on canary inputs and then swaps it in with a single reference
+assignment, so a request always sees one complete version.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from .batcher import MicroBatcher
+from .instrumentation import get_logger
+from .intervals import load_version_intervals
+from .kernel import load_linear_kernel
+from .predictor import GoldStockPredictor
+
+MANIFEST_NAME = 'manifest.json'
+
+# Version reported for the fixed artifacts shipped in models/ without a manifest
+LEGACY_VERSION = 'legacy'
+
+# Largest relative change in a canary prediction accepted from a new version
+CANARY_TOLERANCE = 0.25
+
+logger = get_logger('model_registry')
+
+
+class ModelSet:
+    """Every model served by the app, loaded from one artifact directory"""
+
+    def __init__(self, version, path, feature_table=None, batching=None):
+        self.version = version
+        self.path = path
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+
+        # The Ridge model was fit on unscaled features, so no scaler is folded in
+        self.ridge_model = joblib.load(os.path.join(path, 'gold_price_prediction_ridge_regression.pkl'))
+        self.ridge_scaler = joblib.load(os.path.join(path, 'scaler_ridge_regression.pkl'))
+        self.ridge_features = joblib.load(os.path.join(path, 'features_ridge_regression.pkl'))
+        self.ridge_kernel = load_linear_kernel(os.path.join(path, 'kernel_ridge_regression.npy'),
+                                               self.ridge_model, self.ridge_features)
+        self.ridge_intervals = load_version_intervals(path, 'ridge')
+
+        self.predictor = GoldStockPredictor(path, feature_table=feature_table)
+        if self.predictor.model is None:
+            raise ValueError(f"Stock model could not be loaded from {path}")
+
+        # Optional micro-batching of concurrent single predictions: {'max_batch', 'max_wait'}
+        self.ridge_batcher = None
+        if batching:
+            self.ridge_batcher = MicroBatcher(self.ridge_kernel.predict, 'ridge', **batching)
+            self.predictor.enable_batching(**batching)
+
+    def predict_ridge(self, features):
+        """Score one Ridge feature dict"""
+        vector = self.ridge_kernel.vector(features)
+        if self.ridge_batcher is not None:
+            return self.ridge_batcher.submit(vector)
+        return float(self.ridge_kernel.predict(vector))
+
+    def info(self):
+        return {'version': self.version, 'path': self.path, 'loaded_at': self.loaded_at}
+
+
+def read_manifest(models_dir):
+    """Return the published manifest, or None when there is none"""
+    try:
+        with open(os.path.join(models_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def verify_manifest(manifest, version_dir):
+    """Raise ValueError when a file listed in the manifest is missing or altered"""
+    for target, entry in manifest.get('targets', {}).items():
+        for spec in entry.get('files', {}).values():
+            path = os.path.join(version_dir, spec['name'])
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if digest != spec['sha256']:
+                raise ValueError(f"Checksum mismatch for {target} artifact {spec['name']}")
+
+
+def canary_predictions(model_set, ridge_canary=None):
+    """Score the canary inputs: the latest stock history row and a Ridge feature row"""
+    predictions = {}
+    table = model_set.predictor.feature_table
+    if table is not None and len(table.dates):
+        # Close_Lag1 of the row after the last one is the last Close
+        last_close = float(table.following[-1, 0])
+        date = np.datetime64(int(table.dates[-1]), 'ns').astype('datetime64[D]')
+        row = {'Open': last_close, 'High': last_close * 1.005, 'Low': last_close * 0.995,
+               'Volume': float(table.following[-1, 2]), 'Date': str(date + 1)}
+        result = model_set.predictor.predict(row)
+        if result['status'] != 'success':
+            raise ValueError(f"Stock canary failed: {result['error']}")
+        predictions['stock'] = result['predicted_price']
+    if ridge_canary is not None:
+        predictions['ridge'] = model_set.predict_ridge(ridge_canary)
+    return predictions
+
+
+def validate_model_set(model_set, incumbent=None, ridge_canary=None, tolerance=CANARY_TOLERANCE):
+    """Raise ValueError unless the canary predictions are finite, positive and
+    within ``tolerance`` of the incumbent's predictions on the same inputs"""
+    candidate = canary_predictions(model_set, ridge_canary)
+    baseline = canary_predictions(incumbent, ridge_canary) if incumbent is not None else {}
+    for name, value in candidate.items():
+        if not np.isfinite(value) or value <= 0:
+            raise ValueError(f"{name} canary prediction is {value}")
+        previous = baseline.get(name)
+        if previous and abs(value - previous) > tolerance * abs(previous):
+            raise ValueError(f"{name} canary prediction moved from {previous:.2f} to {value:.2f}")
+    return candidate
+
+
+class ModelRegistry:
+    """Holds the active ModelSet plus the previous ones kept for rollback
+
+    ``active`` is replaced by a single assignment, so a request that reads
+    it once keeps a consistent set of models for its whole duration even
+    if a swap happens meanwhile. ``feature_table`` seeds the stock history
+    table of the first version, e.g. from a shared data block; later
+    versions reuse their predecessor's. ``batching`` is passed to every
+    ModelSet.
+    """
+
+    def __init__(self, models_dir='models', poll_interval=10.0, keep=2, ridge_canary=None, feature_table=None,
+                 batching=None):
+        self.models_dir = models_dir
+        self.poll_interval = poll_interval
+        self.ridge_canary = ridge_canary
+        self.feature_table = feature_table
+        self.batching = batching
+        self.active = None
+        self.previous = deque(maxlen=keep)
+        self.last_error = None
+        self.last_checked = None
+        self._seen = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def version(self):
+        active = self.active
+        return active.version if active is not None else None
+
+    def _manifest_key(self):
+        try:
+            return os.stat(os.path.join(self.models_dir, MANIFEST_NAME)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, manifest):
+        """Build and validate the ModelSet described by a manifest (or the legacy files)"""
+        if manifest is None:
+            version, path = LEGACY_VERSION, self.models_dir
+        else:
+            version = manifest['version']
+            path = os.path.join(self.models_dir, manifest['path'])
+            verify_manifest(manifest, path)
+
+        incumbent = self.active
+        feature_table = incumbent.predictor.feature_table if incumbent is not None else self.feature_table
+        model_set = ModelSet(version, path, feature_table, self.batching)
+        canary = self.ridge_canary() if self.ridge_canary is not None else None
+        validate_model_set(model_set, incumbent, canary)
+        return model_set
+
+    def _swap(self, model_set):
+        if self.active is not None:
+            self.previous.append(self.active)
+        self.active = model_set
+        logger.info("Serving model version %s", model_set.version)
+
+    def load(self):
+        """Load whatever is currently published; returns True when it is being served"""
+        with self._lock:
+            key = self._manifest_key()
+            try:
+                model_set = self._load(read_manifest(self.models_dir))
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Error loading models: %s", e)
+                return False
+            finally:
+                self._seen = key
+            self._swap(model_set)
+            self.last_error = None
+            return True
+
+    def refresh(self):
+        """Load and swap in a newly published version; returns True on a swap
+
+        A version that fails validation is not retried until the manifest
+        changes again, and a rollback is not undone by the next poll.
+        """
+        self.last_checked = time.time()
+        key = self._manifest_key()
+        if key == self._seen:
+            return False
+        manifest = read_manifest(self.models_dir)
+        if manifest is not None and manifest['version'] == self.version:
+            self._seen = key
+            return False
+        return self.load()
+
+    def rollback(self):
+        """Swap back to the most recent previous version held in memory"""
+        with self._lock:
+            if not self.previous:
+                raise LookupError('No previous model version is loaded')
+            model_set = self.previous.pop()
+            logger.warning("Rolling back from model version %s to %s", self.version, model_set.version)
+            self.active = model_set
+            return model_set
+
+    def watch(self):
+        """Poll the manifest in a daemon thread; idempotent"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(target=self._poll, name='model-registry', daemon=True)
+            self._thread.start()
+            return True
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Error checking for new models: %s", e)
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        active = self.active
+        return {
+            'active': active.info() if active is not None else None,
+            'previous': [model_set.info() for model_set in reversed(self.previous)],
+            'watching': self._thread is not None,
+            'poll_interval': self.poll_interval,
+            'last_checked': datetime.fromtimestamp(self.last_checked).isoformat(timespec='seconds')
+            if self.last_checked else None,
+            'last_error': self.last_error
+        }
@@ -4,15 +4,32 @@ import numpy as np
 from datetime import datetime
 import os
 
+from .features import STOCK_HISTORY_FEATURES, StockFeatureTable, load_stock_history
+from .kernel import load_linear_kernel
+from .intervals import DEFAULT_LEVEL, load_version_intervals
+from .instrumentation import StageTimer, get_logger
+from .batcher import MicroBatcher
+
+logger = get_logger('predictor')
+
+
 class GoldStockPredictor:
-    def __init__(self):
-        """Initialize the predictor with trained model and scaler"""
-        self.model_path = 'models/best_model_linear_regression.pkl'
-        self.scaler_path = 'models/feature_scaler.pkl'
-        self.feature_names_path = 'models/feature_names.txt'
+    def __init__(self, models_dir='models', feature_table=None):
+        """Initialize the predictor with trained model, scaler and the intervals stored with them"""
+        self.model_path = os.path.join(models_dir, 'best_model_linear_regression.pkl')
+        self.scaler_path = os.path.join(models_dir, 'feature_scaler.pkl')
+        self.feature_names_path = os.path.join(models_dir, 'feature_names.txt')
+        self.kernel_path = os.path.join(models_dir, 'kernel_linear_regression.npy')
+        self.history_path = 'dataset/goldstock v1.csv'
         
-        # Load model and scaler
+        # Load model and scaler; the history table can be shared between model versions
         self.load_model()
+        self.intervals = load_version_intervals(models_dir, 'stock')
+        self.batcher = None
+        if feature_table is None:
+            self.load_history()
+        else:
+            self.feature_table = feature_table
     
     def load_model(self):
         """Load the trained model and scaler"""
@@ -24,12 +41,41 @@ class GoldStockPredictor:
             with open(self.feature_names_path, 'r') as f:
                 self.feature_names = [line.strip() for line in f.readlines()]
             
-            print("✅ Model and scaler loaded successfully!")
+            logger.info("Model and scaler loaded successfully")
         except Exception as e:
-            print(f"⚠️  Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             self.model = None
             self.scaler = None
             self.feature_names = []
+        
+        self.load_kernel()
+    
+    def load_kernel(self):
+        """Fold the scaler into the model as a verified NumPy kernel"""
+        self.kernel = None
+        if self.model is None:
+            return
+        try:
+            self.kernel = load_linear_kernel(self.kernel_path, self.model, self.feature_names, self.scaler)
+            logger.info("Scoring kernel verified against the sklearn model")
+        except Exception as e:
+            logger.warning("Falling back to sklearn scoring: %s", e)
+    
+    def load_history(self):
+        """Build the date-indexed lag/moving-average table from the price history"""
+        try:
+            self.feature_table = StockFeatureTable(load_stock_history(self.history_path))
+            logger.info("Price history loaded successfully")
+        except Exception as e:
+            logger.error("Error loading price history: %s", e)
+            self.feature_table = None
+    
+    def history_features(self, date):
+        """Look up the history-dependent features for a date"""
+        if self.feature_table is None:
+            return dict.fromkeys(STOCK_HISTORY_FEATURES, np.nan)
+        values = self.feature_table.lookup([date])[0]
+        return dict(zip(STOCK_HISTORY_FEATURES, values.tolist()))
     
     def engineer_features(self, data):
         """Create engineered features from input data"""
@@ -60,14 +106,18 @@ class GoldStockPredictor:
         price_change = data.get('Close', open_price) - open_price
         price_change_pct = (price_change / open_price) * 100 if open_price != 0 else 0
         
-        # For lag features, use Open price as approximation if not provided
-        close_lag1 = data.get('Close_Lag1', open_price * 0.99)
-        close_lag2 = data.get('Close_Lag2', open_price * 0.98)
-        volume_lag1 = data.get('Volume_Lag1', volume * 0.95)
+        # Lag features and moving averages come from the price history unless provided
+        history = self.history_features(date)
+        close_lag1 = data.get('Close_Lag1', history['Close_Lag1'])
+        close_lag2 = data.get('Close_Lag2', history['Close_Lag2'])
+        volume_lag1 = data.get('Volume_Lag1', history['Volume_Lag1'])
+        ma_5 = data.get('MA_5', history['MA_5'])
+        ma_10 = data.get('MA_10', history['MA_10'])
         
-        # Calculate moving averages (approximate if not provided)
-        ma_5 = data.get('MA_5', open_price)
-        ma_10 = data.get('MA_10', open_price)
+        missing = [name for name, value in zip(STOCK_HISTORY_FEATURES, [close_lag1, close_lag2, volume_lag1, ma_5, ma_10])
+                   if pd.isna(value)]
+        if missing:
+            raise ValueError(f"Not enough price history before {date:%Y-%m-%d}; provide {', '.join(missing)}")
         
         # Create feature dictionary
         features = {
@@ -92,29 +142,47 @@ class GoldStockPredictor:
         
         return features
     
-    def predict(self, input_data):
+    def enable_batching(self, max_batch, max_wait):
+        """Route single predictions through a micro-batcher"""
+        self.batcher = MicroBatcher(self.score, 'stock', max_batch=max_batch, max_wait=max_wait)
+    
+    def score(self, X):
+        """Score a (rows, features) matrix in feature_names order"""
+        if self.kernel is not None:
+            return self.kernel.predict(X)
+        return self.model.predict(self.scaler.transform(pd.DataFrame(X, columns=self.feature_names)))
+    
+    def predict(self, input_data, level=DEFAULT_LEVEL):
         """Make prediction on input data"""
         try:
-            # Engineer features
-            features = self.engineer_features(input_data)
-            
-            # Create DataFrame with correct feature order
-            feature_df = pd.DataFrame([features])
-            feature_df = feature_df[self.feature_names]
-            
-            # Scale features
-            features_scaled = self.scaler.transform(feature_df)
-            
-            # Make prediction
-            prediction = self.model.predict(features_scaled)[0]
-            
-            # Calculate confidence metrics
-            confidence = self.calculate_confidence(features, prediction)
+            with StageTimer('GoldStockPredictor.predict') as timer:
+                # Engineer features
+                with timer.stage('features'):
+                    features = self.engineer_features(input_data)
+                
+                # Make prediction; concurrent requests share one matrix call when batching
+                with timer.stage('scale'):
+                    vector = np.fromiter((features[name] for name in self.feature_names),
+                                         dtype=np.float64, count=len(self.feature_names))
+                with timer.stage('predict'):
+                    if self.batcher is not None:
+                        prediction = self.batcher.submit(vector)
+                    else:
+                        prediction = float(self.score(vector[None, :])[0])
+                
+                # Prediction interval from the precomputed conformal quantiles
+                lower, upper = self.intervals.bounds(prediction, level)
             
             # Prepare result
             result = {
                 'predicted_price': round(prediction, 2),
-                'confidence': confidence,
+                'confidence': round(level * 100),
+                'prediction_interval': {
+                    'lower': round(float(lower), 2),
+                    'upper': round(float(upper), 2),
+                    'level': level,
+                    'method': self.intervals.method
+                },
                 'input_features': features,
                 'prediction_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'model_name': 'Linear Regression',
@@ -129,28 +197,123 @@ class GoldStockPredictor:
                 'error': str(e)
             }
     
-    def calculate_confidence(self, features, prediction):
-        """Calculate prediction confidence score"""
-        # Simple confidence calculation based on feature ranges
-        # In production, you might use prediction intervals or ensemble methods
-        
-        open_price = features['Open']
-        price_range = features['Price_Range']
-        
-        # Calculate relative price range
-        relative_range = (price_range / open_price) * 100 if open_price != 0 else 0
-        
-        # Higher confidence for smaller relative ranges
-        if relative_range < 1:
-            confidence = 95
-        elif relative_range < 2:
-            confidence = 90
-        elif relative_range < 3:
-            confidence = 85
+    def engineer_features_batch(self, data):
+        """Create engineered features for many rows at once
+        
+        Returns the feature frame and a Series holding an error message for
+        each row that cannot be scored (NaN for valid rows).
+        """
+        data = pd.DataFrame(data).reset_index(drop=True)
+        n = len(data)
+        errors = pd.Series(np.nan, index=data.index, dtype=object)
+        
+        # Required price columns, coerced column-wise
+        features = pd.DataFrame(index=data.index)
+        for col in ['Open', 'High', 'Low', 'Volume']:
+            if col in data.columns:
+                features[col] = pd.to_numeric(data[col], errors='coerce')
+            else:
+                features[col] = np.nan
+        bad_prices = features[['Open', 'High', 'Low', 'Volume']].isna().any(axis=1)
+        errors[bad_prices] = 'Open, High, Low and Volume must be numeric'
+        
+        # Date parts, using today for rows without a date
+        if 'Date' in data.columns:
+            dates = pd.to_datetime(data['Date'], errors='coerce')
+            bad_dates = dates.isna() & data['Date'].notna()
+            errors[bad_dates & errors.isna()] = 'Invalid Date'
+            dates = dates.fillna(pd.Timestamp(datetime.now().date()))
         else:
-            confidence = 80
+            dates = pd.Series(pd.Timestamp(datetime.now().date()), index=data.index)
+        features['Day'] = dates.dt.day
+        features['Month'] = dates.dt.month
+        features['Year'] = dates.dt.year
+        features['DayOfWeek'] = dates.dt.dayofweek
+        features['Quarter'] = dates.dt.quarter
         
-        return confidence
+        # Technical indicators
+        close = pd.to_numeric(data['Close'], errors='coerce') if 'Close' in data.columns else features['Open']
+        close = close.fillna(features['Open'])
+        features['Price_Range'] = features['High'] - features['Low']
+        features['Price_Change'] = close - features['Open']
+        open_price = features['Open'].where(features['Open'] != 0)
+        features['Price_Change_Pct'] = (features['Price_Change'] / open_price * 100).fillna(0)
+        
+        # History-dependent features, overridden by any values the caller supplied
+        if self.feature_table is not None:
+            history = self.feature_table.lookup(dates.to_numpy())
+        else:
+            history = np.full((n, len(STOCK_HISTORY_FEATURES)), np.nan)
+        for i, col in enumerate(STOCK_HISTORY_FEATURES):
+            features[col] = history[:, i]
+            if col in data.columns:
+                provided = pd.to_numeric(data[col], errors='coerce')
+                features[col] = provided.fillna(features[col])
+        no_history = features[STOCK_HISTORY_FEATURES].isna().any(axis=1)
+        errors[no_history & errors.isna()] = 'Not enough price history before this date'
+        
+        return features, errors
+    
+    def score_frame(self, rows, level=DEFAULT_LEVEL):
+        """Score many rows with one scale and one predict call
+        
+        Returns a frame with status, predicted_price, lower, upper and error
+        columns, one row per input row. Rows that cannot be scored have NaN
+        prices and an error message.
+        """
+        self.intervals.check_level(level)
+        features, errors = self.engineer_features_batch(rows)
+        valid = errors.isna().to_numpy()
+        
+        predictions = np.full(len(features), np.nan)
+        if valid.any():
+            predictions[valid] = self.score(features.loc[valid, self.feature_names].to_numpy(dtype=np.float64))
+        lower, upper = self.intervals.bounds(predictions, level)
+        
+        return pd.DataFrame({
+            'status': np.where(valid, 'success', 'error'),
+            'predicted_price': predictions.round(2),
+            'lower': lower.round(2),
+            'upper': upper.round(2),
+            'error': errors.where(~valid, None).to_numpy()
+        })
+    
+    def predict_batch(self, rows, level=DEFAULT_LEVEL):
+        """Make predictions for many rows with one scale and one predict call"""
+        if self.model is None:
+            return {'status': 'error', 'error': 'Model not loaded'}
+        
+        try:
+            scored = self.score_frame(rows, level)
+            valid = (scored['status'] == 'success').to_numpy()
+            
+            results = []
+            for i, (ok, prediction, low, high, error) in enumerate(zip(
+                    valid.tolist(), scored['predicted_price'].tolist(), scored['lower'].tolist(),
+                    scored['upper'].tolist(), scored['error'].tolist())):
+                if ok:
+                    results.append({'row': i, 'status': 'success', 'predicted_price': prediction,
+                                    'lower': low, 'upper': high})
+                else:
+                    results.append({'row': i, 'status': 'error', 'error': error})
+            
+            return {
+                'status': 'success',
+                'count': len(results),
+                'succeeded': int(valid.sum()),
+                'failed': int((~valid).sum()),
+                'predictions': results,
+                'confidence': round(level * 100),
+                'interval_method': self.intervals.method,
+                'prediction_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'model_name': 'Linear Regression'
+            }
+        
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
     
     def get_model_info(self):
         """Get information about the loaded model"""
@@ -0,0 +1,111 @@
+"""
+LRU response cache with strong ETags for the read-only analytics APIs
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+
+class ResponseCache:
+    """Caches successful responses keyed on path, query and dataset version
+
+    Entries for an older dataset version can never be hit again, and
+    ``clear`` drops them eagerly when the data is reloaded.
+    """
+
+    def __init__(self, version_func, max_entries=256, max_age=60):
+        self.version_func = version_func
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self):
+        args = tuple(sorted(request.args.items(multi=True)))
+        return request.path, args, self.version_func()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+
+    def _respond(self, entry):
+        body, mimetype, etag = entry
+        response = make_response(body)
+        response.mimetype = mimetype
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
+
+    def cached(self, view):
+        """Decorator serving a view from the cache, with 304 on a matching ETag"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = self._key()
+            entry = self._get(key)
+            if entry is not None:
+                return self._respond(entry)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or key[2] is None:
+                return response
+
+            body = response.get_data()
+            entry = (body, response.mimetype, hashlib.sha1(body).hexdigest())
+            self._put(key, entry)
+            return self._respond(entry)
+
+        return wrapper
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def payload_response(payload, mimetype='application/json', max_age=60):
+    """Serve a pre-serialized payload, compressed when the client accepts it
+
+    ``payload`` needs ``body``, ``gzip``, ``brotli`` (None when brotli is not
+    installed) and ``etag`` attributes; nothing is encoded or compressed per
+    request. Brotli is preferred over gzip.
+    """
+    if payload.brotli is not None and 'br' in request.accept_encodings:
+        body, encoding = payload.brotli, 'br'
+    elif 'gzip' in request.accept_encodings:
+        body, encoding = payload.gzip, 'gzip'
+    else:
+        body, encoding = payload.body, None
+    response = make_response(body)
+    response.mimetype = mimetype
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(payload.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
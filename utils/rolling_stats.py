@@ -0,0 +1,188 @@
+"""
+Incremental rolling statistics over the daily price columns
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+DEFAULT_WINDOWS = (7, 30, 90, 365)
+
+# Longest window that can be requested, in rows
+MAX_WINDOW = 3650
+
+# Windows beyond the defaults are built on first use; at most this many are kept
+MAX_EXTRA_WINDOWS = 16
+
+
+class RingBuffer:
+    """Fixed-capacity row buffer holding the most recent rows"""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.rows = np.empty((capacity, width))
+        self.count = 0
+
+    def push(self, row):
+        self.rows[self.count % self.capacity] = row
+        self.count += 1
+
+    def last(self, n):
+        """Return the last ``n`` rows, oldest first"""
+        n = min(n, self.count, self.capacity)
+        end = self.count % self.capacity
+        idx = (np.arange(end - n, end)) % self.capacity
+        return self.rows[idx]
+
+    def at(self, age):
+        """Return the row ``age`` rows before the newest (0 is the newest)"""
+        return self.rows[(self.count - 1 - age) % self.capacity]
+
+
+class RollingWindow:
+    """Sum, sum of squares, min and max of the last ``size`` rows of every column
+
+    Sums are kept relative to a per-column reference value to avoid
+    cancellation in the variance, and are recomputed exactly from the
+    window every ``size`` updates so rounding cannot accumulate. Min and
+    max come from monotonic deques of (row number, value) per column.
+    """
+
+    def __init__(self, size, recent, first_index):
+        self.size = size
+        width = recent.shape[1]
+        self.buffer = RingBuffer(size, width)
+        self.reference = recent[-1].copy() if len(recent) else np.zeros(width)
+        self.total = np.zeros(width)
+        self.total_sq = np.zeros(width)
+        self.minima = [deque() for _ in range(width)]
+        self.maxima = [deque() for _ in range(width)]
+        self.index = first_index
+        self.updates = 0
+        for row in recent[-size:]:
+            self.push(row)
+        self._resum()
+
+    def _resum(self):
+        window = self.buffer.last(self.size) - self.reference
+        self.total = window.sum(axis=0)
+        self.total_sq = (window ** 2).sum(axis=0)
+        self.updates = 0
+
+    def push(self, row):
+        """Slide the window forward by one row in O(columns)"""
+        shifted = row - self.reference
+        if self.buffer.count >= self.size:
+            leaving = self.buffer.at(self.size - 1) - self.reference
+            self.total -= leaving
+            self.total_sq -= leaving ** 2
+        self.total += shifted
+        self.total_sq += shifted ** 2
+        self.buffer.push(row)
+
+        expired = self.index - self.size
+        for col, value in enumerate(row.tolist()):
+            for queue, keep in ((self.minima[col], value.__gt__), (self.maxima[col], value.__lt__)):
+                while queue and not keep(queue[-1][1]):
+                    queue.pop()
+                queue.append((self.index, value))
+                if queue[0][0] <= expired:
+                    queue.popleft()
+        self.index += 1
+
+        self.updates += 1
+        if self.updates >= self.size:
+            self._resum()
+
+    def stats(self, col):
+        """Return the window statistics of one column"""
+        n = min(self.buffer.count, self.size)
+        if n == 0:
+            return None
+        mean = self.total[col] / n
+        variance = (self.total_sq[col] - self.total[col] ** 2 / n) / (n - 1) if n > 1 else float('nan')
+        first = self.buffer.at(n - 1)[col]
+        last = self.buffer.at(0)[col]
+        return {
+            'count': n,
+            'mean': float(mean + self.reference[col]),
+            'std': float(np.sqrt(max(variance, 0.0))) if n > 1 else None,
+            'min': float(self.minima[col][0][1]),
+            'max': float(self.maxima[col][0][1]),
+            'change': float(last - first),
+            'change_pct': float((last - first) / first * 100) if first else None
+        }
+
+
+class RollingStats:
+    """Rolling statistics for every column over several windows
+
+    Only the most recent ``MAX_WINDOW`` rows are retained. Appending a row
+    costs O(columns) per window and a query O(1), whatever the window size.
+    """
+
+    def __init__(self, values, columns, windows=DEFAULT_WINDOWS, max_window=MAX_WINDOW):
+        self.columns = list(columns)
+        self.max_window = max_window
+        self._col_index = {col: i for i, col in enumerate(self.columns)}
+        self._lock = threading.Lock()
+
+        values = np.asarray(values, dtype=np.float64)
+        self.rows = len(values)
+        self.history = RingBuffer(max_window, len(self.columns))
+        for row in values[-max_window:]:
+            self.history.push(row)
+
+        self.default_windows = tuple(sorted({self.check_window(w) for w in windows}))
+        self._windows = {}
+        for w in self.default_windows:
+            self._windows[w] = self._build(w)
+
+    def _build(self, size):
+        recent = self.history.last(size)
+        return RollingWindow(size, recent, self.rows - len(recent))
+
+    def check_window(self, window):
+        window = int(window)
+        if not 2 <= window <= self.max_window:
+            raise ValueError(f"Window must be between 2 and {self.max_window} rows")
+        return window
+
+    def column_index(self, currency):
+        try:
+            return self._col_index[currency]
+        except KeyError:
+            raise KeyError(f"Unknown currency: {currency}") from None
+
+    def window(self, size):
+        """Return the tracker for a window, building it from recent rows on first use"""
+        size = self.check_window(size)
+        tracker = self._windows.get(size)
+        if tracker is None:
+            with self._lock:
+                tracker = self._windows.get(size)
+                if tracker is None:
+                    extra = [w for w in self._windows if w not in self.default_windows]
+                    if len(extra) >= MAX_EXTRA_WINDOWS:
+                        del self._windows[extra[0]]
+                    tracker = self._windows[size] = self._build(size)
+        return tracker
+
+    def extend(self, values):
+        """Append new rows to every tracked window"""
+        with self._lock:
+            for row in np.asarray(values, dtype=np.float64):
+                self.history.push(row)
+                for tracker in self._windows.values():
+                    tracker.push(row)
+                self.rows += 1
+        return self
+
+    def latest(self, currency, age=0):
+        """Return a column's value ``age`` rows before the newest"""
+        return float(self.history.at(age)[self.column_index(currency)])
+
+    def stats(self, currency, window):
+        """Return count, mean, std, min, max and change of a column over a window"""
+        return self.window(window).stats(self.column_index(currency))
@@ -0,0 +1,134 @@
+"""
+Datasets loaded once and shared read-only between worker processes
+
+A block is a single file: a magic string, a JSON header describing every
+array, then the raw array bytes at 64-byte aligned offsets. Each process
+maps the file read-only and gets NumPy views straight onto the mapping, so
+however many workers attach, the data sits in the page cache once.
+"""
+
+import glob
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .correlation import CorrelationTable
+from .features import StockFeatureTable
+from .timeseries_store import TimeSeriesStore
+
+BLOCK_MAGIC = b'GOLDBLK1'
+BLOCK_ALIGN = 64
+
+# Sub-directory of the cache folder holding published blocks
+SHARED_DIR = 'shared'
+
+
+def _aligned(offset):
+    return -(-offset // BLOCK_ALIGN) * BLOCK_ALIGN
+
+
+def write_block(path, arrays, meta=None):
+    """Write named arrays and JSON metadata to a block file atomically"""
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        order = 'F' if array.flags.f_contiguous and not array.flags.c_contiguous else 'C'
+        specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'order': order, 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({'arrays': specs, 'meta': meta or {}}).encode('utf-8')
+    data_start = _aligned(len(BLOCK_MAGIC) + 8 + len(header))
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(BLOCK_MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in arrays.items():
+            spec = specs[name]
+            f.seek(data_start + spec['offset'])
+            f.write(np.asarray(array).tobytes(order=spec['order']))
+        # Pad to the last aligned offset so empty trailing arrays stay in bounds
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ColumnBlock:
+    """Read-only NumPy views onto a block file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(BLOCK_MAGIC)] != BLOCK_MAGIC:
+            raise ValueError(f"{path} is not a shared data block")
+        (length,) = struct.unpack_from('<Q', self._mmap, len(BLOCK_MAGIC))
+        start = len(BLOCK_MAGIC) + 8
+        header = json.loads(self._mmap[start:start + length].decode('utf-8'))
+        self._specs = header['arrays']
+        self._data_start = _aligned(start + length)
+        self.meta = header['meta']
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __getitem__(self, name):
+        spec = self._specs[name]
+        return np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=self._mmap,
+                          offset=self._data_start + spec['offset'], order=spec['order'])
+
+
+def frame_to_block(df, prefix):
+    """Return (arrays, meta) for a DataFrame of numeric and datetime columns"""
+    arrays = {f'{prefix}/{col}': df[col].to_numpy() for col in df.columns}
+    return arrays, {'columns': list(df.columns)}
+
+
+def frame_from_block(block, prefix):
+    meta = block.meta[prefix]
+    return pd.DataFrame({col: block[f'{prefix}/{col}'] for col in meta['columns']}, copy=False)
+
+
+def publish_datasets(cache_dir, store, correlation_table, stock_history):
+    """Write the loaded datasets to a block named after the data version
+
+    Returns the block path. Blocks from earlier versions are removed; any
+    process still mapping one keeps its view until it unmaps it.
+    """
+    arrays, meta = {}, {}
+    parts = {
+        'store': store.to_block('store'),
+        'correlation': correlation_table.to_block('correlation'),
+        'stock_history': frame_to_block(stock_history, 'stock_history'),
+        'stock_features': StockFeatureTable(stock_history).to_block('stock_features')
+    }
+    for prefix, (part_arrays, part_meta) in parts.items():
+        arrays.update(part_arrays)
+        meta[prefix] = part_meta
+
+    shared_dir = os.path.join(cache_dir, SHARED_DIR)
+    os.makedirs(shared_dir, exist_ok=True)
+    path = write_block(os.path.join(shared_dir, f'data-{store.version}.blk'), arrays, meta)
+    for stale in glob.glob(os.path.join(shared_dir, 'data-*.blk')):
+        if stale != path:
+            os.remove(stale)
+    return path
+
+
+def attach_datasets(path, cache_dir):
+    """Return the datasets of a published block as read-only views
+
+    The result holds ``store``, ``correlation_table``, ``stock_history`` and
+    ``feature_table``. Appended rows are applied on top by copying only the
+    arrays that change.
+    """
+    block = ColumnBlock(path)
+    return {
+        'store': TimeSeriesStore.from_block(block, cache_dir, 'store'),
+        'correlation_table': CorrelationTable.from_block(block, 'correlation'),
+        'stock_history': frame_from_block(block, 'stock_history'),
+        'feature_table': StockFeatureTable.from_block(block, 'stock_features')
+    }
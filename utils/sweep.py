@@ -0,0 +1,130 @@
+"""
+Vectorized what-if sweeps over the Ridge model's feature space
+"""
+
+import math
+
+import numpy as np
+
+# Upper bound on scored rows per sweep (grid points x noise samples)
+MAX_SWEEP_ROWS = 200000
+
+MODES = ('set', 'scale', 'shift')
+
+
+def axis_length(spec):
+    """Return the number of values an axis spec expands to, without building them"""
+    if 'values' in spec:
+        return np.size(spec['values'])
+    if 'start' in spec and 'stop' in spec:
+        start, stop = float(spec['start']), float(spec['stop'])
+        if not (np.isfinite(start) and np.isfinite(stop)):
+            raise ValueError('start and stop must be finite')
+        if 'num' in spec:
+            return int(spec['num'])
+        step = float(spec.get('step', 1))
+        if not (np.isfinite(step) and step > 0):
+            raise ValueError('step must be positive')
+        # Same length as np.arange(start, stop + step / 2, step)
+        return math.ceil((stop - start + step / 2) / step)
+    raise ValueError("Each axis needs 'values' or 'start'/'stop' with 'num' or 'step'")
+
+
+def axis_values(spec):
+    """Return the values of one axis from ``values`` or a start/stop range
+
+    The length is checked against MAX_SWEEP_ROWS before anything is allocated.
+    """
+    n = axis_length(spec)
+    if not 0 < n <= MAX_SWEEP_ROWS:
+        raise ValueError(f"Axis of {n} values must have between 1 and {MAX_SWEEP_ROWS}")
+    if 'values' in spec:
+        values = np.asarray(spec['values'], dtype=np.float64).ravel()
+    elif 'num' in spec:
+        values = np.linspace(float(spec['start']), float(spec['stop']), n)
+    else:
+        step = float(spec.get('step', 1))
+        values = np.arange(float(spec['start']), float(spec['stop']) + step / 2, step)[:n]
+    if not np.isfinite(values).all():
+        raise ValueError('Axis values must be finite')
+    return values
+
+
+def axis_columns(name, feature_names):
+    """Return the feature columns an axis acts on
+
+    A feature name targets that column; ``USD`` (when it is not itself a
+    feature) targets every USD lag and moving-average feature at once.
+    """
+    if name in feature_names:
+        return [feature_names.index(name)]
+    group = [i for i, feature in enumerate(feature_names) if feature.startswith(f'{name}_')]
+    if not group:
+        raise ValueError(f"Unknown feature: {name}")
+    return group
+
+
+def expand_grid(base, feature_names, axes):
+    """Broadcast a base vector across every axis into a grid of feature rows
+
+    Returns (X with shape grid_shape + (n_features,), axis values list).
+    """
+    values = [axis_values(axis) for axis in axes]
+    shape = tuple(len(v) for v in values)
+    if np.prod(shape, dtype=np.float64) > MAX_SWEEP_ROWS:
+        raise ValueError(f"Sweep grid of {int(np.prod(shape, dtype=np.float64))} points exceeds the limit of {MAX_SWEEP_ROWS}")
+    X = np.broadcast_to(base, shape + (len(base),)).copy()
+    for dim, (axis, v) in enumerate(zip(axes, values)):
+        mode = axis.get('mode', 'set')
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        cols = axis_columns(axis['name'], feature_names)
+        v = v.reshape((1,) * dim + (len(v),) + (1,) * (len(shape) - dim - 1) + (1,))
+        if mode == 'set':
+            X[..., cols] = v
+        elif mode == 'scale':
+            X[..., cols] *= v
+        else:
+            X[..., cols] += v
+    return X, values
+
+
+def run_sweep(kernel, base_features, axes, noise=None, rng=None):
+    """Score a grid of scenarios in one vectorized pass
+
+    With ``noise``, each grid point is scored ``samples`` times under
+    independent relative Gaussian shocks with standard deviation
+    ``volatility`` (one or several levels, which become an extra axis),
+    applied to the columns named by ``apply_to`` (default ``USD``). The
+    result then summarizes every grid point over its samples.
+    """
+    if not axes:
+        raise ValueError('Provide at least one axis')
+    X, values = expand_grid(kernel.vector(base_features), kernel.feature_names, axes)
+    shape = X.shape[:-1]
+
+    if not noise:
+        predictions = kernel.predict(X.reshape(-1, X.shape[-1])).reshape(shape)
+        return {'axes': values, 'shape': shape, 'predictions': predictions}
+
+    vol = axis_values({'values': noise.get('volatility', 0.01)})
+    samples = int(noise.get('samples', 100))
+    cols = axis_columns(noise.get('apply_to', 'USD'), kernel.feature_names)
+    rows = X[..., 0].size * len(vol) * samples
+    if samples < 1 or rows > MAX_SWEEP_ROWS:
+        raise ValueError(f"Sweep of {rows} rows must be between 1 and {MAX_SWEEP_ROWS}")
+
+    # Grid x volatility x samples, with shocks scaled per volatility level
+    rng = rng if rng is not None else np.random.default_rng(noise.get('seed'))
+    X = np.broadcast_to(X[..., None, None, :], shape + (len(vol), samples, X.shape[-1])).copy()
+    X[..., cols] *= 1 + rng.standard_normal(X.shape[:-1] + (len(cols),)) * vol[:, None, None]
+    scored = kernel.predict(X.reshape(-1, X.shape[-1])).reshape(shape + (len(vol), samples))
+    return {
+        'axes': values + [vol],
+        'shape': shape + (len(vol),),
+        'samples': samples,
+        'mean': scored.mean(axis=-1),
+        'std': scored.std(axis=-1),
+        'p05': np.percentile(scored, 5, axis=-1),
+        'p95': np.percentile(scored, 95, axis=-1)
+    }
@@ -0,0 +1,314 @@
+"""
+Indexed multi-resolution store for the gold price datasets
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import load_snapshot, tail_digest
+from .instrumentation import get_logger
+
+DATA_DIRS = ('.', 'dataset')
+
+# resolution -> (file name, period, aggregation used when deriving from daily)
+RESOLUTIONS = {
+    'daily': ('Daily.csv', None, None),
+    'weekly': ('Weekly_EoP.csv', 'week', 'last'),
+    'monthly_avg': ('Monthly_Avg.csv', 'month', 'mean'),
+    'monthly_eop': ('Monthly_EoP.csv', 'month', 'last'),
+    'quarterly_avg': ('Quarterly_Avg.csv', 'quarter', 'mean'),
+    'quarterly_eop': ('Quarterly_EoP.csv', 'quarter', 'last'),
+    'yearly_avg': ('Yearly_Avg.csv', 'year', 'mean'),
+    'yearly_eop': ('Yearly_EoP.csv', 'year', 'last')
+}
+
+logger = get_logger('timeseries_store')
+
+
+def to_timestamp_ns(value):
+    """Convert a date-like value to int64 nanoseconds, passing None through"""
+    if value is None or value == '':
+        return None
+    return pd.Timestamp(value).value
+
+
+def period_keys(dates, period):
+    """Return a monotonic int64 period key for each int64 nanosecond date"""
+    days = dates.astype('datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    if period == 'week':
+        # 1970-01-01 is a Thursday; weeks run Saturday to Friday
+        return (days - 2) // 7
+    months = dates.astype('datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+    if period == 'month':
+        return months
+    if period == 'quarter':
+        return months // 3
+    if period == 'year':
+        return months // 12
+    raise ValueError(f"Unknown period: {period}")
+
+
+def period_start_ns(key, period):
+    """Return the first instant of a period key as int64 nanoseconds"""
+    if period == 'week':
+        start = np.datetime64(int(key) * 7 + 2, 'D')
+    else:
+        start = np.datetime64(int(key) * {'month': 1, 'quarter': 3, 'year': 12}[period], 'M')
+    return int(start.astype('datetime64[ns]').astype(np.int64))
+
+
+def aggregate_periods(dates, values, period, how):
+    """Collapse sorted daily rows into one row per period
+
+    Each period is labelled with its last observed date, matching the
+    end-of-period CSVs shipped with the repo.
+    """
+    keys = period_keys(dates, period)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+    if how == 'last':
+        aggregated = values[ends]
+    elif how == 'mean':
+        counts = (ends - starts + 1)[:, None]
+        aggregated = np.add.reduceat(values, starts, axis=0) / counts
+    else:
+        raise ValueError(f"Unknown aggregation: {how}")
+
+    return np.asarray(dates[ends]), np.asfortranarray(aggregated)
+
+
+class TimeSeriesStore:
+    """All price resolutions keyed by name, each with a sorted date index"""
+
+    def __init__(self, cache_dir, data_dirs=DATA_DIRS):
+        self.cache_dir = cache_dir
+        self.data_dirs = data_dirs
+        self.sources = {}
+        self.version = None
+        self._digests = {}
+        self._daily_stat = None
+        self._fixed = {}
+        self._dates = {}
+        self._values = {}
+        self._columns = {}
+
+    def find_file(self, file_name):
+        """Return the first existing path for a dataset file, or None"""
+        for data_dir in self.data_dirs:
+            path = os.path.join(data_dir, file_name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def load(self):
+        """Load every resolution, deriving missing ones from daily data
+
+        The store is rebuilt from nothing and swapped in at the end, so a
+        reload after the daily file was rewritten re-derives every coarser
+        resolution and readers never see a partly loaded store.
+        """
+        fresh = type(self)(self.cache_dir, self.data_dirs)
+        fresh._load()
+        self.__dict__.update(fresh.__dict__)
+        return self
+
+    def _load(self):
+        for resolution, (file_name, period, how) in RESOLUTIONS.items():
+            path = self.find_file(file_name)
+            if path is not None:
+                dates, values, meta = load_snapshot(path, self.cache_dir)
+                self._set(resolution, dates, values, meta['columns'], path)
+                self._digests[resolution] = meta['sha256']
+                self._fixed[resolution] = len(dates)
+                if period is None:
+                    self._daily_stat = (meta['size'], meta['mtime_ns'], meta['tail_sha256'])
+            elif period is None:
+                raise FileNotFoundError(f"{file_name} not found in {self.data_dirs}")
+
+        for resolution, (file_name, period, how) in RESOLUTIONS.items():
+            if resolution not in self._dates:
+                dates, values = aggregate_periods(
+                    self._dates['daily'], self._values['daily'], period, how)
+                self._set(resolution, dates, values, self._columns['daily'], 'derived')
+                self._fixed[resolution] = 0
+                logger.info("Derived %s data from daily prices", resolution)
+            elif period is not None:
+                # Daily rows appended after a coarser file ends extend it with derived periods
+                self._extend_aggregate(resolution, period, how)
+
+        self.version = self._compute_version()
+
+    def refresh(self):
+        """Pick up rows appended to the daily CSV since it was loaded
+
+        Returns the index of the first new daily row, 0 after a full reload
+        (the file was rewritten rather than appended to), or None when
+        nothing changed. Appends touch only the new rows and the last
+        period of each coarser resolution.
+        """
+        path = self.sources['daily']
+        stat = os.stat(path)
+        size, mtime_ns, tail = self._daily_stat
+        if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+            return None
+
+        # Only bytes added after an unchanged tail count as an append, as for the snapshot itself
+        appended = stat.st_size >= size and tail_digest(path, size) == tail
+        old_dates = self._dates['daily']
+        dates, values, meta = load_snapshot(path, self.cache_dir)
+        start = len(old_dates)
+        if (not appended or len(dates) < start or dates[start - 1] != old_dates[start - 1]
+                or meta['columns'] != self.currencies()):
+            self.load()
+            return 0
+
+        self._set('daily', dates, values, meta['columns'], path)
+        self._digests['daily'] = meta['sha256']
+        self._daily_stat = (meta['size'], meta['mtime_ns'], meta['tail_sha256'])
+        if len(dates) > start:
+            for resolution, (file_name, period, how) in RESOLUTIONS.items():
+                if period is not None:
+                    self._extend_aggregate(resolution, period, how)
+        self.version = self._compute_version()
+        return start
+
+    def _extend_aggregate(self, resolution, period, how):
+        """Re-aggregate the last derived period and append any new ones
+
+        Rows loaded from a file are kept as they are; derived rows start
+        with the first period after the file's last one.
+        """
+        dates, values = self._dates[resolution], self._values[resolution]
+        fixed = self._fixed[resolution]
+        keep = len(dates) - 1 if len(dates) > fixed else len(dates)
+        if keep < len(dates):
+            start_ns = period_start_ns(period_keys(dates[keep:keep + 1], period)[0], period)
+        else:
+            start_ns = period_start_ns(period_keys(dates[-1:], period)[0] + 1, period)
+
+        daily_dates, daily_values = self._dates['daily'], self._values['daily']
+        lo = int(np.searchsorted(daily_dates, start_ns, side='left'))
+        if lo == len(daily_dates):
+            return
+        columns = list(self._columns[resolution])
+        cols = [self._columns['daily'][col] for col in columns if col in self._columns['daily']]
+        if len(cols) != len(columns):
+            return
+
+        new_dates, new_values = aggregate_periods(
+            daily_dates[lo:], np.asarray(daily_values[lo:])[:, cols], period, how)
+        self._set(resolution, np.concatenate((dates[:keep], new_dates)),
+                  np.asfortranarray(np.vstack([values[:keep], new_values])), columns, self.sources[resolution])
+
+    def to_block(self, prefix='store'):
+        """Return (arrays, meta) holding every resolution, for a shared data block"""
+        arrays, resolutions = {}, {}
+        for resolution in self._dates:
+            arrays[f'{prefix}/{resolution}/dates'] = self._dates[resolution]
+            arrays[f'{prefix}/{resolution}/values'] = self._values[resolution]
+            resolutions[resolution] = {
+                'columns': list(self._columns[resolution]),
+                'source': self.sources[resolution],
+                'digest': self._digests.get(resolution),
+                'fixed': self._fixed[resolution]
+            }
+        meta = {'version': self.version, 'daily_stat': list(self._daily_stat), 'resolutions': resolutions}
+        return arrays, meta
+
+    @classmethod
+    def from_block(cls, block, cache_dir, prefix='store', data_dirs=DATA_DIRS):
+        """Rebuild a store whose arrays are read-only views into a shared block
+
+        ``refresh`` still works: changed resolutions get new private arrays.
+        """
+        meta = block.meta[prefix]
+        store = cls(cache_dir, data_dirs)
+        for resolution, info in meta['resolutions'].items():
+            store._set(resolution, block[f'{prefix}/{resolution}/dates'], block[f'{prefix}/{resolution}/values'],
+                       info['columns'], info['source'])
+            if info['digest'] is not None:
+                store._digests[resolution] = info['digest']
+            store._fixed[resolution] = info['fixed']
+        store._daily_stat = tuple(meta['daily_stat'])
+        store.version = meta['version']
+        return store
+
+    def _compute_version(self):
+        """Identify the loaded data by the content digests of its sources"""
+        digest = hashlib.sha1()
+        for resolution in RESOLUTIONS:
+            digest.update(f"{resolution}:{self._digests.get(resolution, 'derived')};".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _set(self, resolution, dates, values, columns, source):
+        self._dates[resolution] = dates
+        self._values[resolution] = values
+        self._columns[resolution] = {col: i for i, col in enumerate(columns)}
+        self.sources[resolution] = source
+
+    @property
+    def resolutions(self):
+        return list(self._dates)
+
+    def currencies(self, resolution='daily'):
+        """Return the currency columns available at a resolution"""
+        return list(self._columns[self._check_resolution(resolution)])
+
+    def _check_resolution(self, resolution):
+        if resolution not in self._dates:
+            raise KeyError(f"Unknown resolution: {resolution}")
+        return resolution
+
+    def _column_index(self, resolution, currency):
+        try:
+            return self._columns[resolution][currency]
+        except KeyError:
+            raise KeyError(f"Unknown currency: {currency}") from None
+
+    def bounds(self, resolution, start=None, end=None):
+        """Return the [lo, hi) row range for an inclusive date window"""
+        dates = self._dates[self._check_resolution(resolution)]
+        start_ns = to_timestamp_ns(start)
+        end_ns = to_timestamp_ns(end)
+        lo = 0 if start_ns is None else int(np.searchsorted(dates, start_ns, side='left'))
+        hi = len(dates) if end_ns is None else int(np.searchsorted(dates, end_ns, side='right'))
+        return lo, max(lo, hi)
+
+    def dates(self, resolution='daily', start=None, end=None):
+        """Return the datetime64 index for a date window"""
+        lo, hi = self.bounds(resolution, start, end)
+        return np.asarray(self._dates[resolution][lo:hi]).view('datetime64[ns]')
+
+    def get(self, resolution, currency, start=None, end=None):
+        """Return (dates, values) for one currency inside an inclusive window
+
+        The window is located by binary search on the sorted date index, so
+        the cost does not depend on how much history the store holds.
+        """
+        lo, hi = self.bounds(resolution, start, end)
+        col = self._column_index(resolution, currency)
+        dates = np.asarray(self._dates[resolution][lo:hi]).view('datetime64[ns]')
+        return dates, self._values[resolution][lo:hi, col]
+
+    def get_many(self, resolution, currencies, start=None, end=None):
+        """Return (dates, matrix) for several currencies inside a window"""
+        lo, hi = self.bounds(resolution, start, end)
+        cols = [self._column_index(resolution, currency) for currency in currencies]
+        dates = np.asarray(self._dates[resolution][lo:hi]).view('datetime64[ns]')
+        return dates, self._values[resolution][lo:hi][:, cols]
+
+    def arrays(self, resolution='daily'):
+        """Return the raw (int64 dates, values matrix, columns) of a resolution"""
+        resolution = self._check_resolution(resolution)
+        return self._dates[resolution], self._values[resolution], list(self._columns[resolution])
+
+    def frame(self, resolution='daily'):
+        """Return a resolution as a DataFrame with a leading Date column"""
+        resolution = self._check_resolution(resolution)
+        df = pd.DataFrame(self._values[resolution], columns=list(self._columns[resolution]), copy=False)
+        df.insert(0, 'Date', pd.to_datetime(np.asarray(self._dates[resolution]), unit='ns'))
+        return df
@@ -0,0 +1,296 @@
+"""
+Training pipeline for the gold price models, extracted from the notebooks
+
+Features are rebuilt from the CSVs with the same vectorized transforms the
+app uses, every candidate model/alpha is searched in parallel with
+time-series cross-validation, and the winning artifacts are written
+atomically together with a version manifest.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import joblib
+import pandas as pd
+
+from .backtest import regression_metrics, ridge_dataset, stock_dataset
+from .features import CLOSE_FEATURES, STOCK_FEATURES
+from .instrumentation import configure_logging
+from .intervals import BACKTEST_KEYS, INTERVAL_LEVELS, conformal_quantiles, load_interval_table
+
+MODELS_DIR = 'models'
+MANIFEST_NAME = 'manifest.json'
+ALPHAS = [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0]
+
+# Default Ridge feature set, used when no previous feature list exists
+RIDGE_FEATURES = ['EUR', 'GBP', 'CAD', 'INR', 'CNY', 'SAR', 'AED', 'THB', 'VND', 'KRW', 'AUD',
+                  'USD_lag_1', 'USD_lag_3', 'USD_lag_7', 'USD_lag_14', 'USD_lag_30',
+                  'USD_MA_3', 'USD_MA_7', 'USD_MA_14', 'USD_MA_30']
+
+# target -> artifact file names, matching the paths the app loads
+TARGETS = {
+    'ridge': {
+        'model': 'gold_price_prediction_ridge_regression.pkl',
+        'scaler': 'scaler_ridge_regression.pkl',
+        'features': 'features_ridge_regression.pkl',
+        'comparison': 'model_comparison_ridge.csv',
+        'scaled': False
+    },
+    'stock': {
+        'model': 'best_model_linear_regression.pkl',
+        'scaler': 'feature_scaler.pkl',
+        'features': 'feature_names.txt',
+        'comparison': 'model_comparison_stock.csv',
+        'scaled': True
+    }
+}
+
+
+def candidate_grids():
+    """Return {model name: (estimator, param grid)} for the linear families"""
+    from sklearn.linear_model import Lasso, LinearRegression, Ridge
+
+    return {
+        'Linear Regression': (LinearRegression(), {}),
+        'Ridge Regression': (Ridge(), {'alpha': ALPHAS}),
+        'Lasso Regression': (Lasso(max_iter=50000), {'alpha': ALPHAS})
+    }
+
+
+def search_models(X_train, y_train, X_test, y_test, n_splits=5, n_jobs=-1):
+    """Grid-search every candidate with time-series CV across all cores
+
+    Returns the fitted best estimator per model and a comparison frame with
+    the columns ``utils.visualizer.create_visualizations`` expects, ranked
+    by cross-validated score. The holdout never takes part in selection,
+    so its Test_* columns stay an unbiased report of the chosen model.
+    """
+    from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+
+    cv = TimeSeriesSplit(n_splits=n_splits)
+    fitted = {}
+    rows = []
+    for name, (estimator, grid) in candidate_grids().items():
+        search = GridSearchCV(estimator, grid or [{}], cv=cv, scoring='r2', n_jobs=n_jobs)
+        search.fit(X_train, y_train)
+        best = search.best_estimator_
+        fitted[name] = best
+
+        train = regression_metrics(y_train, best.predict(X_train))
+        test = regression_metrics(y_test, best.predict(X_test))
+        rows.append({
+            'Model': name,
+            'Params': json.dumps(search.best_params_),
+            'Train_R2': train['r2'],
+            'Test_R2': test['r2'],
+            'Train_RMSE': train['rmse'],
+            'Test_RMSE': test['rmse'],
+            'Train_MAE': train['mae'],
+            'Test_MAE': test['mae'],
+            'CV_Score_Mean': search.best_score_,
+            'CV_Score_Std': float(search.cv_results_['std_test_score'][search.best_index_])
+        })
+
+    comparison = pd.DataFrame(rows).sort_values('CV_Score_Mean', ascending=False).reset_index(drop=True)
+    return fitted, comparison
+
+
+def _atomic_dump(obj, path):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _atomic_write_text(text, path):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def train_target(target, n_splits=5, n_jobs=-1, test_fraction=0.2, cache_dir='cache', models_dir=MODELS_DIR):
+    """Train one target and return (artifacts dict, comparison frame, summary)
+
+    The Ridge feature list is read from ``models_dir`` when it has one.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    spec = TARGETS[target]
+    if target == 'ridge':
+        features_path = os.path.join(models_dir, spec['features'])
+        feature_names = joblib.load(features_path) if os.path.exists(features_path) else RIDGE_FEATURES
+        X, y, _ = ridge_dataset(cache_dir, feature_names)
+    else:
+        # Close-derived features are constant without the day's Close, so they are left out
+        feature_names = [name for name in STOCK_FEATURES if name not in CLOSE_FEATURES]
+        X, y, _ = stock_dataset(feature_names=feature_names)
+
+    # Time-ordered holdout; the scaler only ever sees training rows
+    split = int(len(y) * (1 - test_fraction))
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+    scaler = StandardScaler().fit(X_train)
+    if spec['scaled']:
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    fitted, comparison = search_models(X_train, y_train, X_test, y_test, n_splits, n_jobs)
+    best_name = comparison.iloc[0]['Model']
+
+    # The holdout took no part in selection, so it also calibrates this version's intervals
+    intervals = {
+        'method': 'split_conformal_relative',
+        'levels': list(INTERVAL_LEVELS),
+        'quantiles': conformal_quantiles(y_test, fitted[best_name].predict(X_test)).tolist(),
+        'samples': int(len(y_test))
+    }
+    summary = {
+        'model_name': best_name,
+        'params': json.loads(comparison.iloc[0]['Params']),
+        'cv_r2': float(comparison.iloc[0]['CV_Score_Mean']),
+        'test_r2': float(comparison.iloc[0]['Test_R2']),
+        'test_rmse': float(comparison.iloc[0]['Test_RMSE']),
+        'test_mae': float(comparison.iloc[0]['Test_MAE']),
+        'training_samples': int(split),
+        'test_samples': int(len(y) - split),
+        'feature_names': list(feature_names),
+        'intervals': intervals
+    }
+    artifacts = {'model': fitted[best_name], 'scaler': scaler, 'features': list(feature_names)}
+    return artifacts, comparison, summary
+
+
+def _link_or_copy(source, destination):
+    """Hard-link an artifact into a version directory, copying across file systems
+
+    Artifacts are only ever replaced by rename, never rewritten in place,
+    so a shared inode cannot change under either version.
+    """
+    tmp_path = f'{destination}.{os.getpid()}.tmp'
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def carry_over(target, models_dir, version_dir):
+    """Copy a target that was not retrained from the current version into a new one
+
+    The current version is the one named by the published manifest, or the
+    fixed paths in ``models_dir`` when there is none. Returns the manifest
+    entry for the target, with checksums of the carried files.
+    """
+    spec = TARGETS[target]
+    manifest_path = os.path.join(models_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            current = json.load(f)
+        source_dir = os.path.join(models_dir, current['path'])
+        entry = dict(current['targets'].get(target, {}), carried_from=current['version'])
+    else:
+        source_dir = models_dir
+        entry = {'carried_from': 'legacy', 'intervals': load_interval_table(BACKTEST_KEYS[target]).to_dict()}
+
+    files = {}
+    for key in ('model', 'scaler', 'features', 'comparison'):
+        source = os.path.join(source_dir, spec[key])
+        if not os.path.exists(source):
+            if key == 'comparison':
+                continue
+            raise FileNotFoundError(f"Cannot carry the {target} model into the new version: {source} is missing")
+        destination = os.path.join(version_dir, spec[key])
+        if os.path.abspath(source) != os.path.abspath(destination):
+            _link_or_copy(source, destination)
+        files[key] = {'name': spec[key], 'sha256': _sha256(destination)}
+    entry['files'] = files
+    return entry
+
+
+def write_version(results, models_dir=MODELS_DIR, version=None, publish=True):
+    """Write artifacts under models/versions/<version>/ and update the manifest
+
+    Every file is written to a temporary name and renamed into place, and
+    the manifest is replaced last, so readers never observe a partial set.
+    Targets missing from ``results`` are carried over from the current
+    version, so every version directory can be loaded on its own. With
+    ``publish`` the new artifacts are also copied to the fixed paths that
+    the app loads at start-up.
+    """
+    version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+    version_dir = os.path.join(models_dir, 'versions', version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    manifest = {'version': version, 'created': datetime.now().isoformat(timespec='seconds'),
+                'path': os.path.relpath(version_dir, models_dir), 'targets': {}}
+    for target in TARGETS:
+        if target not in results:
+            manifest['targets'][target] = carry_over(target, models_dir, version_dir)
+    for target, (artifacts, comparison, summary) in results.items():
+        spec = TARGETS[target]
+        paths = {key: os.path.join(version_dir, spec[key]) for key in ('model', 'scaler', 'features', 'comparison')}
+        _atomic_dump(artifacts['model'], paths['model'])
+        _atomic_dump(artifacts['scaler'], paths['scaler'])
+        if spec['features'].endswith('.txt'):
+            _atomic_write_text(''.join(f'{name}\n' for name in artifacts['features']), paths['features'])
+        else:
+            _atomic_dump(artifacts['features'], paths['features'])
+        _atomic_write_text(comparison.to_csv(index=False), paths['comparison'])
+
+        manifest['targets'][target] = dict(summary, files={
+            key: {'name': os.path.basename(path), 'sha256': _sha256(path)} for key, path in paths.items()
+        })
+
+        if publish:
+            for key in ('model', 'scaler', 'features'):
+                tmp_path = os.path.join(models_dir, f'{spec[key]}.{os.getpid()}.tmp')
+                shutil.copyfile(paths[key], tmp_path)
+                os.replace(tmp_path, os.path.join(models_dir, spec[key]))
+
+    _atomic_write_text(json.dumps(manifest, indent=2), os.path.join(version_dir, MANIFEST_NAME))
+    _atomic_write_text(json.dumps(manifest, indent=2), os.path.join(models_dir, MANIFEST_NAME))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Retrain the gold price models')
+    parser.add_argument('--target', choices=['all'] + list(TARGETS), default='all')
+    parser.add_argument('--splits', type=int, default=5, help='time-series CV folds')
+    parser.add_argument('--jobs', type=int, default=-1, help='parallel jobs for the search (-1: all cores)')
+    parser.add_argument('--test-fraction', type=float, default=0.2, help='time-ordered holdout fraction')
+    parser.add_argument('--models-dir', default=MODELS_DIR, help='artifact directory')
+    parser.add_argument('--no-publish', action='store_true',
+                        help='only write the versioned artifacts, not the fixed paths the app loads')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    started = time.perf_counter()
+    targets = list(TARGETS) if args.target == 'all' else [args.target]
+    results = {}
+    for target in targets:
+        print(f"Training {target} models...")
+        results[target] = train_target(target, args.splits, args.jobs, args.test_fraction,
+                                       models_dir=args.models_dir)
+        comparison = results[target][1]
+        print(comparison.drop(columns=['Params']).to_string(index=False))
+
+    manifest = write_version(results, args.models_dir, publish=not args.no_publish)
+    for target in results:
+        entry = manifest['targets'][target]
+        print(f"{target}: {entry['model_name']} {entry['params']} test RMSE {entry['test_rmse']:.2f}")
+    for target in manifest['targets'].keys() - results.keys():
+        print(f"{target}: carried over from version {manifest['targets'][target]['carried_from']}")
+    print(f"Version {manifest['version']} written in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+if __name__ == '__main__':
+    main()
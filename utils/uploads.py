@@ -0,0 +1,221 @@
+"""
+Chunked scoring of uploaded OHLCV CSV files
+
+An upload is first copied to disk in fixed-size blocks, then read back with
+``pandas.read_csv(chunksize=...)`` and scored one chunk at a time through
+``GoldStockPredictor.score_frame``. Memory therefore depends on the chunk
+size, not on the size of the file. Results are either streamed back as they
+are produced or written to a result file behind a job ID that can be polled.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import get_logger
+
+# Rows parsed and scored per chunk
+UPLOAD_CHUNK_ROWS = 10000
+
+# Bytes copied per read while spooling an upload to disk
+UPLOAD_COPY_BLOCK = 1024 * 1024
+
+# Finished jobs and their result files are removed after this many seconds
+UPLOAD_JOB_TTL = 24 * 60 * 60
+
+UPLOAD_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+REQUIRED_COLUMNS = ('Open', 'High', 'Low', 'Volume')
+
+_JOB_ID = re.compile(r'[0-9a-f]{32}$')
+
+logger = get_logger('uploads')
+
+
+def spool_upload(stream, folder, block_size=UPLOAD_COPY_BLOCK):
+    """Copy an upload stream to a new file in ``folder`` and return its path"""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f'{uuid.uuid4().hex}.csv')
+    try:
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(stream, f, block_size)
+    except BaseException:
+        # Including a 413 raised part way through an oversized body
+        os.remove(path)
+        raise
+    return path
+
+
+def check_columns(path):
+    """Raise ValueError unless the CSV header has every required price column"""
+    try:
+        columns = pd.read_csv(path, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        raise ValueError('The uploaded file is empty') from None
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+
+def score_csv(predictor, path, level, chunk_rows=UPLOAD_CHUNK_ROWS):
+    """Return an iterator of result frames, one per chunk of the CSV at ``path``
+
+    Each frame starts with the input's row number (and Date, when the file
+    has one) followed by the columns of ``score_frame``. The first chunk is
+    parsed and scored before this returns, so a file that cannot be parsed
+    from the start raises ValueError while an error status can still be
+    sent. A parse error in a later chunk ends the results with one error
+    row at the row number where parsing stopped.
+    """
+    reader = pd.read_csv(path, chunksize=chunk_rows)
+    try:
+        first = _score_chunk(predictor, next(reader), level, 0)
+    except StopIteration:
+        reader.close()
+        raise ValueError('The uploaded file has no rows') from None
+    except BaseException:
+        reader.close()
+        raise
+    return _score_rest(predictor, reader, level, first)
+
+
+def _score_chunk(predictor, chunk, level, offset):
+    result = predictor.score_frame(chunk, level)
+    result.insert(0, 'row', np.arange(offset, offset + len(chunk)))
+    if 'Date' in chunk.columns:
+        result.insert(1, 'Date', chunk['Date'].to_numpy())
+    return result
+
+
+def _score_rest(predictor, reader, level, first):
+    offset = len(first)
+    yield first
+    try:
+        for chunk in reader:
+            result = _score_chunk(predictor, chunk, level, offset)
+            offset += len(chunk)
+            yield result
+    except ValueError as e:
+        # Includes pandas' ParserError; the response has started, so the error becomes the last record
+        logger.warning("Upload parsing stopped at row %d: %s", offset, e)
+        error = pd.DataFrame({'row': [offset], 'status': ['error'], 'error': [f'Could not parse the file: {e}']})
+        yield error.reindex(columns=first.columns)
+    finally:
+        reader.close()
+
+
+def encode_results(frames, fmt):
+    """Yield CSV or NDJSON bytes for a sequence of result frames"""
+    for i, frame in enumerate(frames):
+        if fmt == 'csv':
+            yield frame.to_csv(header=(i == 0), index=False, lineterminator='\n').encode('utf-8')
+        else:
+            text = frame.to_json(orient='records', lines=True)
+            yield (text if text.endswith('\n') else text + '\n').encode('utf-8')
+
+
+class UploadJobs:
+    """Background scoring jobs whose state lives in files
+
+    ``<id>.json`` holds the status and ``<id>.<format>`` the results, so any
+    worker process sharing the folder can answer a poll for any job.
+    """
+
+    def __init__(self, folder, ttl=UPLOAD_JOB_TTL):
+        self.folder = folder
+        self.ttl = ttl
+
+    def _path(self, job_id, ext):
+        return os.path.join(self.folder, f'{job_id}.{ext}')
+
+    def _write_status(self, job_id, status):
+        path = self._path(job_id, 'json')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, path)
+
+    def status(self, job_id):
+        """Return a job's status dict, or None for an unknown ID"""
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id, 'json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def result_path(self, job_id):
+        """Return the result file of a finished job, or None"""
+        status = self.status(job_id)
+        if status is None or status['status'] != 'done':
+            return None
+        return self._path(job_id, status['format'])
+
+    def submit(self, predictor, upload_path, level, fmt, **info):
+        """Start scoring a spooled upload in a background thread and return the job ID
+
+        The upload file is removed once the job finishes. Extra keyword
+        arguments are stored in the status as they are.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        self.prune()
+        job_id = uuid.uuid4().hex
+        status = dict(info, job_id=job_id, status='queued', format=fmt, level=level, rows=0,
+                      succeeded=0, failed=0, created=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        self._write_status(job_id, status)
+        threading.Thread(target=self._run, args=(job_id, status, predictor, upload_path, level, fmt),
+                         name=f'upload-{job_id[:8]}', daemon=True).start()
+        return job_id
+
+    def _run(self, job_id, status, predictor, upload_path, level, fmt):
+        result_path = self._path(job_id, fmt)
+        tmp_path = f'{result_path}.tmp'
+        status['status'] = 'running'
+        self._write_status(job_id, status)
+
+        def tally(frames):
+            for frame in frames:
+                succeeded = int((frame['status'] == 'success').sum())
+                status.update(rows=status['rows'] + len(frame), succeeded=status['succeeded'] + succeeded,
+                              failed=status['failed'] + len(frame) - succeeded)
+                yield frame
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                for block in encode_results(tally(score_csv(predictor, upload_path, level)), fmt):
+                    f.write(block)
+                    self._write_status(job_id, status)
+            os.replace(tmp_path, result_path)
+            status['status'] = 'done'
+        except Exception as e:
+            logger.warning("Upload job %s failed: %s", job_id, e)
+            status.update(status='error', error=str(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            os.remove(upload_path)
+        status['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._write_status(job_id, status)
+
+    def prune(self):
+        """Remove job files older than the TTL"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -1,11 +1,142 @@
 import plotly.graph_objs as go
-import plotly.express as px
 import pandas as pd
+import numpy as np
+import gzip
+import hashlib
 import json
+import threading
 import plotly
+from collections import OrderedDict
+
+from .instrumentation import get_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - payloads are served with gzip only
+    brotli = None
+
+logger = get_logger('visualizer')
+
+# Imported once per process (at start-up through the app's Initializer), so each fallback is reported once
+if orjson is None:
+    logger.warning("orjson is not installed; chart figures are serialized with PlotlyJSONEncoder")
+if brotli is None:
+    logger.warning("brotli is not installed; chart payloads are served with gzip only")
+
+# Brotli quality for chart payloads; they are compressed once per rendered chart
+BROTLI_QUALITY = 9
+
+# Rendered chart payloads kept in memory, keyed by chart kind and input digest or data version
+CHART_CACHE_SIZE = 64
+
+_chart_cache = OrderedDict()
+_chart_lock = threading.Lock()
+
+
+class ChartPayload:
+    """One figure serialized once, with gzip and brotli copies and a strong ETag"""
+
+    def __init__(self, body):
+        self.body = body
+        self.gzip = gzip.compress(body, compresslevel=6, mtime=0)
+        self.brotli = brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.text = body.decode('utf-8')
+
+
+def _json_default(obj):
+    """Fallback for the values orjson cannot encode natively"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'M':
+            return np.datetime_as_string(obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def figure_json(fig):
+    """Serialize a figure to JSON bytes, with NumPy arrays on orjson's native path"""
+    if orjson is None:
+        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8')
+    return orjson.dumps(fig.to_plotly_json(), option=orjson.OPT_SERIALIZE_NUMPY, default=_json_default)
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame: values, index, column names and dtypes"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _memoized(key, build):
+    """Return the cached payloads for a key, rendering ``build()`` on a miss"""
+    with _chart_lock:
+        payloads = _chart_cache.get(key)
+        if payloads is not None:
+            _chart_cache.move_to_end(key)
+            return payloads
+
+    payloads = {name: ChartPayload(figure_json(fig)) for name, fig in build().items()}
+    with _chart_lock:
+        _chart_cache[key] = payloads
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return payloads
+
+
+def clear_chart_cache():
+    """Drop every memoized chart payload"""
+    with _chart_lock:
+        _chart_cache.clear()
+
+
+def render_comparison_charts(model_comparison_df):
+    """Return {chart name: ChartPayload} for a model comparison frame"""
+    return _memoized(('comparison', frame_digest(model_comparison_df)),
+                     lambda: build_comparison_figures(model_comparison_df))
+
+
+def render_price_chart(historical_data, version=None, start=None, end=None):
+    """Return the ChartPayload of the price candlestick chart
+
+    Only rows dated within [start, end] are drawn. With ``version``, which
+    names the loaded data, the payload is cached under (version, start,
+    end) and a hit never touches the frame. Without it the frame's content
+    hash is the key.
+    """
+    def build():
+        df = pd.DataFrame(historical_data)
+        df['Date'] = pd.to_datetime(df['Date'])
+        if start is not None:
+            df = df[df['Date'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['Date'] <= pd.Timestamp(end)]
+        return build_price_figure(df)
+
+    source = version if version is not None else frame_digest(pd.DataFrame(historical_data))
+    return _memoized(('price', source, start, end), build)['price_chart']
+
 
 def create_visualizations(model_comparison_df):
     """Create interactive visualizations using Plotly"""
+    return {name: payload.text for name, payload in render_comparison_charts(model_comparison_df).items()}
+
+
+def create_price_visualization(historical_data):
+    """Create price trend visualization"""
+    return render_price_chart(historical_data).text
+
+
+def build_comparison_figures(model_comparison_df):
+    """Build the model comparison figures"""
     
     plots = {}
     
@@ -43,7 +174,7 @@ def create_visualizations(model_comparison_df):
         legend=dict(x=0.7, y=1)
     )
     
-    plots['r2_comparison'] = json.dumps(fig_r2, cls=plotly.utils.PlotlyJSONEncoder)
+    plots['r2_comparison'] = fig_r2
     
     # 2. RMSE Comparison
     fig_rmse = go.Figure()
@@ -67,7 +198,7 @@ def create_visualizations(model_comparison_df):
         font=dict(size=12)
     )
     
-    plots['rmse_comparison'] = json.dumps(fig_rmse, cls=plotly.utils.PlotlyJSONEncoder)
+    plots['rmse_comparison'] = fig_rmse
     
     # 3. MAE Comparison
     fig_mae = go.Figure()
@@ -91,7 +222,7 @@ def create_visualizations(model_comparison_df):
         font=dict(size=12)
     )
     
-    plots['mae_comparison'] = json.dumps(fig_mae, cls=plotly.utils.PlotlyJSONEncoder)
+    plots['mae_comparison'] = fig_mae
     
     # 4. Cross-Validation Scores
     fig_cv = go.Figure()
@@ -120,7 +251,7 @@ def create_visualizations(model_comparison_df):
         font=dict(size=12)
     )
     
-    plots['cv_comparison'] = json.dumps(fig_cv, cls=plotly.utils.PlotlyJSONEncoder)
+    plots['cv_comparison'] = fig_cv
     
     # 5. Radar Chart for Top 5 Models
     top_5 = model_comparison_df.head(5)
@@ -151,15 +282,12 @@ def create_visualizations(model_comparison_df):
         showlegend=True
     )
     
-    plots['radar_chart'] = json.dumps(fig_radar, cls=plotly.utils.PlotlyJSONEncoder)
+    plots['radar_chart'] = fig_radar
     
     return plots
 
-def create_price_visualization(historical_data):
-    """Create price trend visualization"""
-    
-    df = pd.DataFrame(historical_data)
-    df['Date'] = pd.to_datetime(df['Date'])
+def build_price_figure(df):
+    """Build the price candlestick figure"""
     
     fig = go.Figure()
     
@@ -182,4 +310,4 @@ def create_price_visualization(historical_data):
         xaxis_rangeslider_visible=False
     )
     
-    return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return {'price_chart': fig}